@@ -0,0 +1,70 @@
+"""
+Time the built in digest engine against the gitingest CLI.
+
+Usage: python benchmarks/bench_digest.py [--files N] [--file-bytes BYTES] [--root DIR]
+
+A synthetic project of `--files` files is generated into a scratch
+directory (or `--root`, which is reused if it exists) and both engines
+digest it with the excludes `ctx` uses. gitingest stops at 10,000 files,
+so the number of files each one put in its digest is reported next to
+its wall time.
+"""
+
+import argparse
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generators  # noqa: E402
+from ctxflow.digest import CTX_EXCLUDES, build_digest  # noqa: E402
+
+
+def digested_files(path: Path) -> int:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return sum(1 for line in f if re.match(r"(FILE|SYMLINK): ", line))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50_000, help="files in the synthetic project")
+    parser.add_argument("--file-bytes", type=int, default=1024, help="mean size of a file")
+    parser.add_argument("--root", type=Path, default=None, help="project to digest, generated if missing")
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix="ctxflow-digest-"))
+    project: Path = args.root or scratch / "project"
+    if not project.exists():
+        start = time.perf_counter()
+        generators.source_tree(project, args.files, file_bytes=args.file_bytes)
+        print(f"generated {args.files} files in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'engine':<10} {'seconds':>9} {'files':>8}")
+    native = scratch / "native.txt"
+    start = time.perf_counter()
+    stats = build_digest(project, native)
+    print(f"{'ctxflow':<10} {time.perf_counter() - start:>9.2f} {stats.files:>8}")
+
+    if shutil.which("gitingest") is None:
+        print(f"{'gitingest':<10} {'not installed':>18}")
+    else:
+        output = scratch / "gitingest.txt"
+        cmd = ["gitingest", str(project), "--output", str(output)]
+        for pattern in CTX_EXCLUDES:
+            cmd += ["-e", pattern]
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        elapsed = time.perf_counter() - start
+        print(f"{'gitingest':<10} {elapsed:>9.2f} {digested_files(output) if output.exists() else 0:>8}")
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Replay synthetic hook payloads through the Claude hooks and time them.
+
+Usage: python benchmarks/bench_hooks.py [--events N] [--mode inproc|subprocess|both]
+                                        [--hooks pre_tool_use,post_tool_use,stop]
+                                        [--update-baseline] [--tolerance 0.25]
+
+In-process mode imports each hook once and feeds it the encoded payload
+(`process_raw()` where the hook has it, else parse + `process()`, or
+`main()` for stop), which measures the hot path the hook daemon runs.
+Subprocess mode runs the hook script once per event, the way Claude
+invokes it without the daemon, so it is capped at `--subprocess-events`.
+Stop events replay one long session whose transcript grows by
+`--turn-lines` lines before every event.
+
+Every run happens in a scratch directory with HOME pointing into it, so
+logs, metrics and the session index never touch the real ones, and
+without TTS/LLM API keys so nothing leaves the machine.
+
+Results are compared against benchmarks/baselines.json: a p95 latency or
+a throughput more than `--tolerance` worse than the baseline is reported
+as a regression and the script exits with status 1.
+"""
+
+import argparse
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+HOOKS_DIR = ROOT / "ctxflow" / "claude" / "hooks"
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generators  # noqa: E402
+from ctxflow.claude.hooks.utils.metrics import percentile  # noqa: E402
+
+HOOKS: List[str] = ["pre_tool_use", "post_tool_use", "stop"]
+SECRET_ENV: List[str] = ["ELEVENLABS_API_KEY", "ANTHROPIC_API_KEY", "OPENAI_API_KEY"]
+HOOK_ARGS: Dict[str, List[str]] = {"stop": ["--chat"]}
+
+Result = Dict[str, Any]
+
+
+def payloads(hook: str, count: int, work: Path, args: argparse.Namespace) -> Iterator[bytes]:
+    if hook == "pre_tool_use":
+        events: Iterator[Dict[str, Any]] = generators.pre_tool_use_events(count, args.seed)
+    elif hook == "post_tool_use":
+        events = generators.post_tool_use_events(count, args.seed, args.response_bytes)
+    else:
+        transcript: Path = work / f"transcript-{len(list(work.glob('transcript-*')))}.jsonl"
+        events = generators.stop_events(count, transcript, args.seed, args.turn_lines)
+    for event in events:
+        yield json.dumps(event).encode()
+
+
+def summarize(hook: str, mode: str, latencies: List[float], wall: float) -> Result:
+    latencies.sort()
+    return {
+        "hook": hook,
+        "mode": mode,
+        "events": len(latencies),
+        "events_per_s": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def run_inproc(hook: str, count: int, work: Path, args: argparse.Namespace) -> Result:
+    if str(HOOKS_DIR) not in sys.path:
+        sys.path.insert(0, str(HOOKS_DIR))
+    module: ModuleType = importlib.import_module(hook)
+    latencies: List[float] = []
+    wall: float = 0.0
+    for raw in payloads(hook, count, work, args):
+        # timed from the raw bytes, as the hook daemon hands them over
+        if hasattr(module, "process_raw"):
+            start = time.perf_counter()
+            module.process_raw(raw)
+        elif hasattr(module, "process"):
+            start = time.perf_counter()
+            module.process(json.loads(raw))
+        else:
+            stdin, argv = sys.stdin, sys.argv
+            sys.stdin = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8")
+            sys.argv = [f"{hook}.py"] + HOOK_ARGS.get(hook, [])
+            start = time.perf_counter()
+            try:
+                module.main()
+            except SystemExit:
+                pass
+            finally:
+                sys.stdin, sys.argv = stdin, argv
+        elapsed: float = time.perf_counter() - start
+        wall += elapsed
+        latencies.append(elapsed * 1000)
+    return summarize(hook, "inproc", latencies, wall)
+
+
+def run_subprocess(hook: str, count: int, work: Path, args: argparse.Namespace,
+                   env: Dict[str, str]) -> Result:
+    command: List[str] = [sys.executable, str(HOOKS_DIR / f"{hook}.py")] + HOOK_ARGS.get(hook, [])
+    latencies: List[float] = []
+    wall: float = 0.0
+    for raw in payloads(hook, count, work, args):
+        start = time.perf_counter()
+        subprocess.run(command, input=raw, cwd=work, env=env, capture_output=True)
+        elapsed: float = time.perf_counter() - start
+        wall += elapsed
+        latencies.append(elapsed * 1000)
+    return summarize(hook, "subprocess", latencies, wall)
+
+
+def compare(results: List[Result], baselines: Dict[str, Result], tolerance: float) -> List[str]:
+    """ Human readable regressions against the stored baselines. """
+    regressions: List[str] = []
+    for result in results:
+        key: str = f"{result['hook']}/{result['mode']}"
+        base: Optional[Result] = baselines.get(key)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {result['p95_ms']:.3f}ms vs baseline {base['p95_ms']:.3f}ms")
+        if result["events_per_s"] < base["events_per_s"] / (1 + tolerance):
+            regressions.append(
+                f"{key}: {result['events_per_s']:.1f} events/s vs baseline {base['events_per_s']:.1f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=10_000, help="events replayed per hook in-process")
+    parser.add_argument("--subprocess-events", type=int, default=100, help="events replayed per hook as subprocesses")
+    parser.add_argument("--stop-events", type=int, default=200, help="Stop events (turns) replayed per mode")
+    parser.add_argument("--mode", choices=["inproc", "subprocess", "both"], default="both")
+    parser.add_argument("--hooks", default=",".join(HOOKS), help="comma separated hooks to replay")
+    parser.add_argument("--response-bytes", type=int, default=4096, help="typical PostToolUse response size")
+    parser.add_argument("--turn-lines", type=int, default=20, help="transcript lines added per Stop")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINES)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    modes: List[str] = ["inproc", "subprocess"] if args.mode == "both" else [args.mode]
+    hooks: List[str] = [h for h in args.hooks.split(",") if h]
+    results: List[Result] = []
+
+    with tempfile.TemporaryDirectory(prefix="ctxflow-bench-") as tmp:
+        work: Path = Path(tmp)
+        env: Dict[str, str] = {k: v for k, v in os.environ.items() if k not in SECRET_ENV}
+        env["HOME"] = str(work)
+        # no announcements, even where an offline TTS engine is installed
+        (work / ".ctxflow").mkdir()
+        (work / ".ctxflow" / "settings.json").write_text(json.dumps({"tts": {"backend": "off"}}))
+        saved_env: Dict[str, str] = dict(os.environ)
+        saved_cwd: str = os.getcwd()
+        os.environ.clear()
+        os.environ.update(env)
+        os.chdir(work)
+        try:
+            for mode in modes:
+                for hook in hooks:
+                    if hook == "stop":
+                        count: int = args.stop_events
+                    else:
+                        count = args.events if mode == "inproc" else args.subprocess_events
+                    if mode == "subprocess":
+                        count = min(count, args.subprocess_events)
+                        results.append(run_subprocess(hook, count, work, args, env))
+                    else:
+                        results.append(run_inproc(hook, count, work, args))
+        finally:
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+    baselines: Dict[str, Result] = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'hook':<14} {'mode':<11} {'events':>7} {'events/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for r in results:
+            print(f"{r['hook']:<14} {r['mode']:<11} {r['events']:>7} {r['events_per_s']:>10.1f} "
+                  f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+
+    if args.update_baseline:
+        for r in results:
+            baselines[f"{r['hook']}/{r['mode']}"] = r
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+
+    regressions: List[str] = compare(results, baselines, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
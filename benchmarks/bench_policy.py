@@ -0,0 +1,114 @@
+"""
+Benchmark the pre tool use policy engine against the legacy regex checks.
+
+Usage: python benchmarks/bench_policy.py [--legacy-max BYTES]
+
+Commands are sized from 10 bytes to several MB in three shapes: a heredoc
+inside a quoted command substitution (how agents pass commit messages), a
+bare heredoc (how they write generated files) and one long line of
+commands. The legacy checks are quadratic on these inputs, so by default
+they are only timed up to 100 KB.
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ctxflow.claude.hooks.utils.policy import load_policy  # noqa: E402
+
+POLICY = load_policy(ROOT / "ctxflow" / "claude" / "hooks" / "policy_rules.json")
+SIZES: List[int] = [10, 1_000, 100_000, 1_000_000, 4_000_000]
+
+
+def legacy_check(command: str) -> bool:
+    """ The regex checks pre_tool_use.py ran before the policy engine. """
+    env_patterns = [
+        r'\b\.env\b(?!\.sample)',
+        r'cat\s+.*\.env\b(?!\.sample)',
+        r'echo\s+.*>\s*\.env\b(?!\.sample)',
+        r'touch\s+.*\.env\b(?!\.sample)',
+        r'cp\s+.*\.env\b(?!\.sample)',
+        r'mv\s+.*\.env\b(?!\.sample)',
+    ]
+    for pattern in env_patterns:
+        if re.search(pattern, command):
+            return True
+    normalized = ' '.join(command.lower().split())
+    patterns = [
+        r'\brm\s+.*-[a-z]*r[a-z]*f',
+        r'\brm\s+.*-[a-z]*f[a-z]*r',
+        r'\brm\s+--recursive\s+--force',
+        r'\brm\s+--force\s+--recursive',
+        r'\brm\s+.*-[a-z]*r',
+        r'\brm\s+-r\s+.*-f',
+        r'\brm\s+-f\s+.*-r',
+    ]
+    return any(re.search(p, normalized) for p in patterns)
+
+
+def engine_check(command: str) -> bool:
+    return POLICY.check("Bash", {"command": command}) is not None
+
+
+def heredoc_command(size: int) -> str:
+    line = "- rm the old cache dir and cat the results into the summary\n"
+    body = (line * (size // len(line) + 1))[:size]
+    return f"git commit -m \"$(cat <<'EOF'\n{body}\nEOF\n)\""
+
+
+def bare_heredoc_command(size: int) -> str:
+    line = "rm -rf would be bad here but this is only file content .env\n"
+    body = (line * (size // len(line) + 1))[:size]
+    return f"cat <<EOF > notes.md\n{body}\nEOF\nls -la"
+
+
+def long_line_command(size: int) -> str:
+    chunk = "rm cache/file.txt && echo done; "
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def timeit(fn: Callable[[str], Any], command: str, budget: float = 1.0) -> float:
+    """ Median wall time of `fn(command)` in milliseconds. """
+    runs: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(runs) < 3 or (time.perf_counter() < deadline and len(runs) < 50):
+        start = time.perf_counter()
+        fn(command)
+        runs.append((time.perf_counter() - start) * 1000)
+        if runs[-1] > budget * 1000:
+            break
+    return statistics.median(runs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="largest command size to time the legacy regexes on")
+    args = parser.parse_args()
+
+    shapes: Dict[str, Callable[[int], str]] = {
+        "$(heredoc)": heredoc_command,
+        "heredoc": bare_heredoc_command,
+        "long line": long_line_command,
+    }
+    print(f"{'shape':<11} {'bytes':>10} {'legacy ms':>12} {'engine ms':>12}")
+    for shape, build in shapes.items():
+        for size in SIZES:
+            command = build(size)
+            engine = timeit(engine_check, command)
+            if size <= args.legacy_max:
+                legacy = f"{timeit(legacy_check, command):.3f}"
+            else:
+                legacy = "skipped"
+            print(f"{shape:<11} {len(command):>10} {legacy:>12} {engine:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Synthetic Claude hook payloads for the benchmarks.
+
+Everything is driven by a seeded ``random.Random`` so a replay with the
+same seed sends byte-identical events. Payloads follow the shape Claude
+sends to the hooks: a session envelope plus `tool_name`/`tool_input`
+for PreToolUse and additionally `tool_response` for PostToolUse.
+"""
+
+import json
+import random
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+WORDS: List[str] = (
+    "the agent reads config files then edits handlers adds tests and runs the "
+    "suite again until everything passes including lint type checks and docs"
+).split()
+
+COMMANDS: List[str] = [
+    "ls -la",
+    "git status --short",
+    "python -m pytest -q tests/",
+    "rg -n 'def main' ctxflow/",
+    "cat pyproject.toml | head -40",
+    "git diff --stat HEAD~1",
+    "npm run build && npm test",
+    "find . -name '*.py' -newer setup.py | xargs wc -l",
+    "git commit -m \"$(cat <<'EOF'\nRefactor the loader\n\nSplit parsing from IO.\nEOF\n)\"",
+]
+
+Event = Dict[str, Any]
+
+
+_pool_rng: random.Random = random.Random(0)
+LINES: List[str] = [" ".join(_pool_rng.choice(WORDS) for _ in range(_pool_rng.randint(4, 14)))
+                    for _ in range(1024)]
+
+
+def _text(rng: random.Random, size: int) -> str:
+    """ Exactly `size` characters of newline separated prose. """
+    out: List[str] = []
+    length: int = 0
+    while length < size:
+        line: str = LINES[rng.getrandbits(10)]
+        out.append(line)
+        length += len(line) + 1
+    return "\n".join(out)[:size]
+
+
+def _path(rng: random.Random) -> str:
+    parts: List[str] = [rng.choice(["src", "ctxflow", "tests", "lib"]),
+                        rng.choice(["core", "utils", "hooks", "cli"])]
+    return "/work/project/" + "/".join(parts) + f"/{rng.choice(WORDS)}_{rng.randint(0, 99)}.py"
+
+
+def envelope(session_id: str, event_name: str) -> Event:
+    return {
+        "session_id": session_id,
+        "transcript_path": f"/home/dev/.claude/projects/work-project/{session_id}.jsonl",
+        "cwd": "/work/project",
+        "hook_event_name": event_name,
+    }
+
+
+def bash_input(rng: random.Random) -> Event:
+    return {"command": rng.choice(COMMANDS), "description": "run a project command"}
+
+
+def read_input(rng: random.Random) -> Event:
+    return {"file_path": _path(rng), "offset": rng.randint(0, 400), "limit": 200}
+
+
+def edit_input(rng: random.Random) -> Event:
+    return {"file_path": _path(rng), "old_string": _text(rng, rng.randint(40, 400)),
+            "new_string": _text(rng, rng.randint(40, 400))}
+
+
+def multiedit_input(rng: random.Random) -> Event:
+    return {"file_path": _path(rng), "edits": [
+        {"old_string": _text(rng, rng.randint(40, 200)),
+         "new_string": _text(rng, rng.randint(40, 200))}
+        for _ in range(rng.randint(2, 8))]}
+
+
+TOOL_INPUTS: Dict[str, Callable[[random.Random], Event]] = {
+    "Bash": bash_input,
+    "Read": read_input,
+    "Edit": edit_input,
+    "MultiEdit": multiedit_input,
+}
+
+
+def tool_response(rng: random.Random, tool: str, tool_input: Event, size: int) -> Event:
+    """ A PostToolUse `tool_response` carrying about `size` characters. """
+    if tool == "Bash":
+        return {"stdout": _text(rng, size), "stderr": "", "interrupted": False}
+    if tool == "Read":
+        return {"type": "text", "file": {"filePath": tool_input["file_path"],
+                                         "content": _text(rng, size)}}
+    return {"filePath": tool_input["file_path"], "success": True,
+            "structuredPatch": _text(rng, size)}
+
+
+def pre_tool_use_events(count: int, seed: int = 0, session_id: Optional[str] = None) -> Iterator[Event]:
+    """ PreToolUse payloads cycling through the benchmarked tools. """
+    rng: random.Random = random.Random(seed)
+    sid: str = session_id or str(uuid.UUID(int=rng.getrandbits(128)))
+    tools: List[str] = list(TOOL_INPUTS)
+    for _ in range(count):
+        tool: str = rng.choice(tools)
+        yield {**envelope(sid, "PreToolUse"), "tool_name": tool,
+               "tool_input": TOOL_INPUTS[tool](rng)}
+
+
+def post_tool_use_events(count: int, seed: int = 0, response_bytes: int = 4096,
+                         session_id: Optional[str] = None) -> Iterator[Event]:
+    """
+    PostToolUse payloads; one in ten carries a response 64 times larger
+    than `response_bytes`, like a big file read or a noisy build.
+    """
+    rng: random.Random = random.Random(seed)
+    for event in pre_tool_use_events(count, seed, session_id):
+        size: int = response_bytes * (64 if rng.random() < 0.1 else 1)
+        yield {**event, "hook_event_name": "PostToolUse",
+               "tool_response": tool_response(rng, event["tool_name"], event["tool_input"], size)}
+
+
+def transcript_entries(count: int, seed: int = 0, session_id: str = "bench") -> Iterator[Event]:
+    """ Alternating user/assistant transcript lines as Claude writes them. """
+    rng: random.Random = random.Random(seed)
+    for i in range(count):
+        role: str = "user" if i % 2 == 0 else "assistant"
+        yield {"type": role, "sessionId": session_id, "uuid": str(uuid.UUID(int=rng.getrandbits(128))),
+               "timestamp": f"2025-01-01T00:{(i // 60) % 60:02d}:{i % 60:02d}Z",
+               "message": {"role": role, "content": _text(rng, rng.randint(80, 2000))}}
+
+
+def append_transcript(path: Path, entries: Iterator[Event]) -> int:
+    """ Append transcript lines to `path`; returns the bytes written. """
+    data: bytes = b"".join(json.dumps(e).encode() + b"\n" for e in entries)
+    with open(path, "ab") as f:
+        f.write(data)
+    return len(data)
+
+
+def stop_events(count: int, transcript: Path, seed: int = 0, lines_per_turn: int = 20,
+                session_id: str = "bench") -> Iterator[Event]:
+    """
+    Stop payloads for one long session. Before each event is yielded the
+    transcript grows by `lines_per_turn` lines, as it would during a turn.
+    """
+    for turn in range(count):
+        append_transcript(transcript, transcript_entries(lines_per_turn, seed + turn, session_id))
+        yield {**envelope(session_id, "Stop"), "transcript_path": str(transcript),
+               "stop_hook_active": False}
+
+
+def source_tree(root: Path, files: int, seed: int = 0, file_bytes: int = 1024) -> int:
+    """
+    A project of `files` source files under `root`: packages nested a few
+    levels deep, plus what a digest has to skip (a .gitignore'd build dir,
+    node_modules, images). Returns the number of files written.
+    """
+    rng: random.Random = random.Random(seed)
+    written: int = 0
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".gitignore").write_text("generated/\n*.cache\n!keep.cache\n")
+    for i in range(files):
+        if i % 10 == 9:
+            kind: str = rng.choice(["node_modules/pkg", "generated", "assets"])
+            directory: Path = root / kind / f"d{i % 97}"
+        else:
+            directory = root / rng.choice(["src", "lib", "tests"]) / f"pkg{i % 50}" / f"mod{i % 7}"
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix: str = ".png" if "assets" in directory.parts else rng.choice([".py", ".js", ".md", ".cache"])
+        (directory / f"{rng.choice(WORDS)}_{i}{suffix}").write_text(_text(rng, rng.randint(1, 2 * file_bytes)))
+        written += 1
+    return written
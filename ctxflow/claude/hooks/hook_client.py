@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Thin hook command: forwards the payload to the hook daemon, or runs the
+hook in this process when the daemon is not running.
+
+Usage: python3 .claude/hooks/hook_client.py <hook name> [hook args...]
+"""
+
+import importlib
+import io
+import sys
+
+from utils.hookd import send_request
+
+FAIL = 1
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print("Usage: hook_client.py <hook name> [hook args...]", file=sys.stderr)
+        sys.exit(FAIL)
+
+    hook: str = sys.argv[1]
+    argv: list = sys.argv[2:]
+    payload: bytes = sys.stdin.buffer.read()
+
+    response = send_request(hook, payload, argv)
+    if response is not None:
+        code, stdout, stderr = response
+        if stdout:
+            sys.stdout.write(stdout)
+        if stderr:
+            sys.stderr.write(stderr)
+        sys.exit(code)
+
+    # no daemon, or arguments it cannot take: behave exactly like
+    # `uv run .claude/hooks/<hook>.py`
+    sys.argv = [hook + ".py"] + argv
+    sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+    importlib.import_module(hook).main()
+
+
+if __name__ == '__main__':
+    main()
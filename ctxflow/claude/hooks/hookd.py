@@ -0,0 +1,34 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+import argparse
+import sys
+from pathlib import Path
+
+from utils.hookd import IDLE_TIMEOUT, serve, stop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ctxflow hook daemon")
+    parser.add_argument('--project', default=None,
+                        help='Project root the hooks run for (default: cwd)')
+    parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT,
+                        help='Exit after this many idle seconds, 0 to never exit')
+    parser.add_argument('--stop', action='store_true',
+                        help='Stop the daemon serving the project')
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.stop:
+        sys.exit(0 if stop(args.project) else 1)
+
+    sys.exit(serve(
+        project_dir=args.project,
+        hooks_dir=str(Path(__file__).parent),
+        idle_timeout=args.idle_timeout,
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,46 +3,53 @@
 # requires-python = ">=3.8"
 # ///
 
-import json
-import os
 import sys
-from pathlib import Path
 from typing import Any
 
+from utils import STARTED_NS
+from utils.eventlog import append_event, append_payload
+from utils.metrics import HookTimer, phase
+
 
 SUCCEED = 0
 FAIL = 1
 BLOCK = 2
 
+# every tool call, Read, Grep, Glob and WebFetch included, is logged
+HOOK_TOOLS = None
 
-def main() -> None:
-    try:
-        input_data: dict[Any, ...] = json.load(sys.stdin)
-
-        log_dir: Path = Path.cwd() / 'logs'
-        log_dir.mkdir(parents=True, exist_ok=True)
-        log_path: Path = log_dir / 'post_tool_use.json'
 
-        if log_path.exists():
-            with open(log_path, 'r') as f:
-                try:
-                    log_data: list[Any] = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
+def process(input_data: dict[Any, ...]) -> tuple[int, str]:
+    """ Log one post tool use payload that was already decoded. """
+    with phase('log'):
+        append_event('post_tool_use', input_data)
+    return SUCCEED, ""
 
-        log_data.append(input_data)
 
-        with open(log_path, 'w') as f:
-            json.dump(log_data, f, indent=2)
+def process_raw(payload: bytes) -> tuple[int, str]:
+    """
+    Log a payload as it came in, without decoding it; large tool inputs
+    and responses go to the blob store. Shared with the hook daemon.
+    Raises ValueError for a payload that isn't a JSON object.
+    """
+    with phase('log'):
+        append_payload('post_tool_use', payload)
+    return SUCCEED, ""
 
-        sys.exit(SUCCEED)
 
-    except json.JSONDecodeError:
-        sys.exit(FAIL)
-    except Exception:
-        sys.exit(FAIL)
+def main() -> None:
+    with HookTimer('post_tool_use', started_ns=STARTED_NS):
+        try:
+            code, message = process_raw(sys.stdin.buffer.read())
+            if message:
+                sys.stderr.write(message)
+
+            sys.exit(code)
+
+        except ValueError:
+            sys.exit(FAIL)
+        except Exception:
+            sys.exit(FAIL)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,9 @@
+"""
+Shared helpers for the ctxflow Claude hooks.
+"""
+
+import time
+
+# when a hook script started loading the shared code; its HookTimer counts
+# from here and records the imports as their own phase
+STARTED_NS: int = time.perf_counter_ns()
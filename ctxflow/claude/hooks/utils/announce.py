@@ -0,0 +1,341 @@
+"""
+Spoken announcements for the Claude hooks, off the hook's critical path.
+
+Stop, SubagentStop and Notification used to generate a message (possibly
+with an LLM call) and synthesize and play it before exiting, so every turn
+waited on the network and the speakers. Now the hook only writes a small
+job file to `~/.ctxflow/announce/queue/` and makes sure a worker is
+running; the detached worker renders the message, runs TTS and plays it.
+
+The worker schedules rather than replays: it waits until the queue has
+been quiet for a debounce window (bounded by a maximum delay), merges the
+batch so ten SubagentStops become "10 subagents complete", drops
+announcements that waited past their staleness limit and speaks the rest
+in order. The windows come from the `announce` section of the settings.
+LLM-written completion messages come from `message_pool`, so rendering a
+message never waits on an LLM.
+
+The worker synthesizes in process with the backend `tts.backends`
+resolves (ElevenLabs, an offline local engine, ...), keeps one audio
+player open while it runs and streams audio to it as it is synthesized,
+so playback starts on the first chunk rather than after the whole clip
+was synthesized and a fresh ffplay was started. Every announcement is
+also recorded as a `tts:<backend>` run with its `first_audio` latency,
+which `tts.backend: "fastest"` uses to pick between backends.
+
+Only one worker runs at a time: it holds an flock on
+`~/.ctxflow/announce/worker.lock`, which the kernel releases if the worker
+dies, so a crash never leaves a stale lock behind. Jobs are written to a
+temporary name and renamed into the queue, so the worker never sees a
+half written job.
+
+Run the worker in the foreground with ``python -m utils.announce``.
+"""
+
+import fcntl
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from .detach import spawn_module
+from .message_pool import take_message
+from .metrics import HookTimer, iter_records, percentile, phase, record_phase
+from .settings import load_settings
+from .tts.phrases import (COMPLETION_MESSAGES, NOTIFICATION_MESSAGE, SUBAGENT_MESSAGE,
+                          engineer_name, personalize)
+from .tts.audio_cache import open_cache
+from .tts.backends import Backend, resolve_backend
+from .tts.player import Player, open_player
+from .tts.player import speak as speak_message
+
+# how long an idle worker waits for more jobs before exiting
+WORKER_IDLE: float = 2.0
+# how far back `backend_latencies` looks
+LATENCY_WINDOW: float = 7 * 24 * 3600
+# share of Stop announcements that use an LLM-written message from the pool
+LLM_RATE: float = 0.15
+
+Job = Dict[str, Any]
+
+# the worker's backend and player, kept for as long as the worker runs
+_backend: Optional[Backend] = None
+_player: Optional[Player] = None
+
+
+@dataclass
+class Schedule:
+    """ Debounce, staleness and coalescing rules for the worker. """
+
+    debounce: float = 0.75
+    max_delay: float = 3.0
+    stale_after: float = 30.0
+    coalesce: bool = True
+
+    @classmethod
+    def from_settings(cls) -> "Schedule":
+        rules: Dict[str, Any] = load_settings()["announce"]
+        return cls(
+            debounce=float(rules.get("debounce_ms", 750)) / 1000,
+            max_delay=float(rules.get("max_delay_ms", 3000)) / 1000,
+            stale_after=float(rules.get("stale_after_s", 30)),
+            coalesce=bool(rules.get("coalesce", True)),
+        )
+
+
+def announce_dir() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "announce"
+
+
+def queue_dir() -> Path:
+    return announce_dir() / "queue"
+
+
+def backend_latencies(window: float = LATENCY_WINDOW) -> Dict[str, float]:
+    """ Median seconds to first audio per backend over the last `window` seconds. """
+    samples: Dict[str, List[float]] = {}
+    for record in iter_records(since=time.time() - window):
+        hook: str = str(record.get("hook", ""))
+        first: Any = record.get("phases", {}).get("first_audio")
+        if hook.startswith("tts:") and first is not None and record.get("code") == 0:
+            samples.setdefault(hook[len("tts:"):], []).append(float(first) / 1000)
+    return {name: percentile(sorted(values), 50) for name, values in samples.items()}
+
+
+def enqueue(kind: str, message: Optional[str] = None, **fields: Any) -> Optional[Path]:
+    """
+    Queue an announcement and make sure a worker will pick it up. Returns
+    the job file, or None when no TTS backend is configured.
+    """
+    if resolve_backend() is None:
+        return None
+    job: Job = {"kind": kind, "message": message, "created": time.time(), **fields}
+    queue: Path = queue_dir()
+    queue.mkdir(parents=True, exist_ok=True)
+    name: str = f"{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+    tmp: Path = queue / f".{name}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(job, f)
+    path: Path = queue / name
+    os.replace(tmp, path)
+    if not worker_running():
+        spawn_module("announce")
+    return path
+
+
+def _open_lock() -> TextIO:
+    announce_dir().mkdir(parents=True, exist_ok=True)
+    return open(announce_dir() / "worker.lock", "a")
+
+
+def _try_lock(lock: TextIO) -> bool:
+    try:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def worker_running() -> bool:
+    """ Whether a worker currently holds the worker lock. """
+    with _open_lock() as lock:
+        if _try_lock(lock):
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+            return False
+        return True
+
+
+def pending_jobs() -> List[Path]:
+    """ Queued job files, oldest first. """
+    try:
+        return sorted(p for p in queue_dir().iterdir()
+                      if p.suffix == ".json" and not p.name.startswith("."))
+    except FileNotFoundError:
+        return []
+
+
+def take_jobs() -> List[Job]:
+    """ Remove every queued job from the queue and return them in order. """
+    jobs: List[Job] = []
+    for path in pending_jobs():
+        try:
+            with open(path, "r") as f:
+                job: Any = json.load(f)
+            path.unlink()
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            continue
+        if isinstance(job, dict):
+            jobs.append(job)
+    return jobs
+
+
+def collect_batch(schedule: Schedule) -> List[Job]:
+    """
+    Take queued jobs, then keep taking them until nothing new arrived for
+    the debounce window or the oldest job has waited `max_delay`.
+    """
+    jobs: List[Job] = take_jobs()
+    if not jobs:
+        return jobs
+    started: float = time.monotonic()
+    quiet_since: float = started
+    while True:
+        now: float = time.monotonic()
+        if now - quiet_since >= schedule.debounce or now - started >= schedule.max_delay:
+            return jobs
+        time.sleep(min(0.05, schedule.debounce))
+        arrived: List[Job] = take_jobs()
+        if arrived:
+            jobs.extend(arrived)
+            quiet_since = time.monotonic()
+
+
+def is_stale(job: Job, schedule: Schedule, now: Optional[float] = None) -> bool:
+    if schedule.stale_after <= 0:
+        return False
+    created: float = float(job.get("created", 0) or 0)
+    return (now if now is not None else time.time()) - created > schedule.stale_after
+
+
+def coalesce(jobs: List[Job], schedule: Schedule, now: Optional[float] = None) -> List[Job]:
+    """
+    Drop stale jobs and merge the rest: one job per kind for generated
+    messages, one per distinct text for explicit ones. Merged jobs keep the
+    position of their first member and carry a `count`.
+    """
+    current: float = now if now is not None else time.time()
+    merged: Dict[Any, Job] = {}
+    order: List[Any] = []
+    for job in jobs:
+        if is_stale(job, schedule, current):
+            continue
+        key: Any = (job.get("kind"), job.get("message")) if schedule.coalesce else len(order)
+        if key in merged:
+            merged[key]["count"] = merged[key].get("count", 1) + 1
+            merged[key]["created"] = max(merged[key].get("created", 0), job.get("created", 0))
+        else:
+            merged[key] = {**job, "count": job.get("count", 1)}
+            order.append(key)
+    return [merged[key] for key in order]
+
+
+def render_message(job: Job) -> str:
+    """ The text to speak for a job. """
+    if job.get("message"):
+        return str(job["message"])
+    kind: str = job.get("kind", "")
+    if kind == "stop":
+        message: Optional[str] = None
+        if random.random() <= LLM_RATE:
+            with phase("pool"):
+                message = take_message()
+        return message or random.choice(COMPLETION_MESSAGES)
+    if kind == "subagent_stop":
+        count: int = int(job.get("count", 1))
+        return SUBAGENT_MESSAGE if count == 1 else f"{count} subagents complete"
+    name: str = engineer_name()
+    if name and random.random() < 0.40:
+        return personalize(NOTIFICATION_MESSAGE, name)
+    return NOTIFICATION_MESSAGE
+
+
+def speak(message: str) -> bool:
+    """
+    Synthesize and play one message with the worker's backend and player,
+    or with freshly resolved ones outside the worker. Returns once the
+    audio has been handed to the player.
+    """
+    backend: Optional[Backend] = _backend or resolve_backend()
+    if backend is None:
+        return False
+    player: Player = _player or open_player()
+    try:
+        with phase("tts"), HookTimer(f"tts:{backend.name}", via="announce"):
+            with open_cache() as cache:
+                first: Optional[float] = speak_message(cache, backend, message, player)
+                if first is not None:
+                    record_phase("first_audio", first * 1000)
+                cache.evict()
+        # once for the backend's run above, once for the announcement's
+        if first is not None:
+            record_phase("first_audio", first * 1000)
+        return True
+    except Exception:
+        return False
+    finally:
+        if player is not _player:
+            player.close()
+
+
+def process_job(job: Job) -> None:
+    with HookTimer(str(job.get("kind", "announce")), via="announce") as timer:
+        timer.add("queue", max(time.time() - float(job.get("created", time.time())), 0.0) * 1000)
+        speak(render_message(job))
+
+
+def process_batch(jobs: List[Job], schedule: Schedule) -> int:
+    """ Speak a coalesced batch; returns how many announcements were made. """
+    spoken: int = 0
+    for job in coalesce(jobs, schedule):
+        # earlier announcements in the batch may have taken a while
+        if is_stale(job, schedule):
+            continue
+        process_job(job)
+        spoken += 1
+    return spoken
+
+
+def run_worker(idle: float = WORKER_IDLE, schedule: Optional[Schedule] = None) -> int:
+    """
+    Drain the queue batch by batch until it has been empty for `idle`
+    seconds; returns the number of announcements spoken. Returns
+    immediately if another worker is running.
+    """
+    global _backend, _player
+    rules: Schedule = schedule or Schedule.from_settings()
+    handled: int = 0
+    with _open_lock() as lock:
+        if not _try_lock(lock):
+            return handled
+        _backend = resolve_backend(latencies=backend_latencies())
+        _player = open_player()
+        try:
+            return _drain(lock, idle, rules)
+        finally:
+            if _player is not None:
+                _player.close()
+            _backend, _player = None, None
+
+
+def _drain(lock: TextIO, idle: float, rules: Schedule) -> int:
+    global _player
+    handled: int = 0
+    while True:
+        deadline: float = time.monotonic() + idle
+        while True:
+            jobs: List[Job] = collect_batch(rules)
+            handled += process_batch(jobs, rules)
+            if jobs:
+                deadline = time.monotonic() + idle
+            elif time.monotonic() >= deadline:
+                break
+            else:
+                time.sleep(0.1)
+        # finish playing before a new worker can start a player of its own
+        if _player is not None:
+            _player.close()
+        fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        # a job queued while we were giving up saw the lock held and
+        # did not start a worker; take it over rather than strand it
+        if not pending_jobs() or not _try_lock(lock):
+            return handled
+        _player = open_player()  # the last one was closed above
+
+
+if __name__ == "__main__":
+    run_worker()
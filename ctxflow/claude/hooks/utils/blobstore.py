@@ -0,0 +1,74 @@
+"""
+Content-addressed store for large hook payload values.
+
+Event records keep `{"$blob": "<sha256>", "bytes": <size>}` in place of a
+value that was moved out of line; the value itself, exactly as it was in
+the payload, lives in `logs/blobs/<first two hex digits>/<sha256>.json`.
+The same output logged again (the same file read ten times) hashes to
+the same name and is stored once.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+BLOB_KEY: str = "$blob"
+
+
+def blob_ref(digest: str, size: int) -> bytes:
+    """ The encoded reference that replaces a value in an event record. """
+    return b'{"' + BLOB_KEY.encode() + b'":"' + digest.encode("ascii") + b'","bytes":' + str(size).encode() + b"}"
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get(BLOB_KEY), str) and len(value) == 2
+
+
+class BlobStore:
+    """ Blobs under one directory, named by the sha256 of their content. """
+
+    def __init__(self, root: Path):
+        self.root: Path = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def put(self, data: bytes) -> str:
+        """ Store `data` unless a blob with the same content exists; returns its digest. """
+        digest: str = hashlib.sha256(data).hexdigest()
+        target: Path = self.path(digest)
+        if target.exists():
+            return digest
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # hookd threads storing the same value each write their own file
+        tmp: Path = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        except FileNotFoundError:
+            if not target.exists():
+                raise
+        finally:
+            tmp.unlink(missing_ok=True)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            return self.path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def resolve(self, value: Any) -> Any:
+        """ `value` with every blob reference in it replaced by the decoded blob. """
+        if is_blob_ref(value):
+            data: Optional[bytes] = self.get(value[BLOB_KEY])
+            return value if data is None else json.loads(data)
+        if isinstance(value, dict):
+            return {key: self.resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
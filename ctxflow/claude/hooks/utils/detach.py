@@ -0,0 +1,37 @@
+"""
+Start helper processes that outlive the hook which started them.
+
+Hooks block the agent until they exit, so slow follow-up work (log
+compression, announcements) runs in a detached child in its own session.
+The child runs one of the modules in this package with ``python -m``,
+whether the package is imported as `utils` (from the installed hook
+scripts) or as `ctxflow.claude.hooks.utils` (from the ctx CLI).
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def spawn_module(module: str, *args: str) -> Optional[subprocess.Popen]:
+    """
+    Run `python -m <this package>.<module> args...` detached from the
+    caller, with no stdio attached. Returns None if it could not start.
+    """
+    package: str = __package__ or "utils"
+    root: Path = Path(__file__).resolve().parents[package.count(".") + 1]
+    env: Dict[str, str] = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(root), env.get("PYTHONPATH")]))
+    try:
+        return subprocess.Popen(
+            [sys.executable, "-m", f"{package}.{module}", *args],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        return None
@@ -0,0 +1,106 @@
+"""
+Read the envelope of a hook payload without decoding the rest of it.
+
+A PostToolUse payload is a small envelope (`session_id`, `tool_name`,
+`cwd`, ...) around `tool_input` and `tool_response`, which can hold whole
+files or command outputs. Logging it does not need those bodies as Python
+objects: `members` finds where each top level value starts and ends by
+jumping from quote to quote and bracket to bracket with `bytes.find` and a
+regex, so a multi-MB string costs a few `memchr` calls instead of a decode
+and a re-encode. `peek` decodes just the values asked for.
+"""
+
+import json
+import re
+from typing import Any, Collection, Dict, Iterator, Tuple
+
+_WS = re.compile(rb"[ \t\r\n]*")
+_SCALAR = re.compile(rb"[^,}\]\s]+")
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+
+# (key, raw key bytes, value start, value end)
+Member = Tuple[str, bytes, int, int]
+
+
+def _skip_ws(raw: bytes, pos: int) -> int:
+    return _WS.match(raw, pos).end()  # type: ignore[union-attr]
+
+
+def _string_end(raw: bytes, pos: int) -> int:
+    """ End of the string whose opening quote is at `pos`. """
+    i: int = pos + 1
+    while True:
+        quote: int = raw.find(b'"', i)
+        if quote < 0:
+            raise ValueError("unterminated string")
+        escapes: int = 0
+        while raw[quote - 1 - escapes] == 0x5C:  # backslash
+            escapes += 1
+        if escapes % 2 == 0:
+            return quote + 1
+        i = quote + 1
+
+
+def _value_end(raw: bytes, pos: int) -> int:
+    """ End of the JSON value starting at `pos`. """
+    first: int = raw[pos] if pos < len(raw) else -1
+    if first == 0x22:  # "
+        return _string_end(raw, pos)
+    if first in (0x7B, 0x5B):  # { [
+        depth: int = 0
+        i: int = pos
+        while True:
+            match = _STRUCTURE.search(raw, i)
+            if match is None:
+                raise ValueError("unterminated container")
+            char: bytes = match.group()
+            if char == b'"':
+                i = _string_end(raw, match.start())
+                continue
+            depth += 1 if char in (b"{", b"[") else -1
+            i = match.end()
+            if depth == 0:
+                return i
+    scalar = _SCALAR.match(raw, pos)
+    if scalar is None:
+        raise ValueError(f"expected a value at byte {pos}")
+    return scalar.end()
+
+
+def members(raw: bytes) -> Iterator[Member]:
+    """ The top level members of a JSON object, in payload order. """
+    pos: int = _skip_ws(raw, 0)
+    if raw[pos:pos + 1] != b"{":
+        raise ValueError("payload is not a JSON object")
+    pos = _skip_ws(raw, pos + 1)
+    if raw[pos:pos + 1] == b"}":
+        return
+    while True:
+        if raw[pos:pos + 1] != b'"':
+            raise ValueError(f"expected a key at byte {pos}")
+        key_end: int = _string_end(raw, pos)
+        key_raw: bytes = raw[pos:key_end]
+        pos = _skip_ws(raw, key_end)
+        if raw[pos:pos + 1] != b":":
+            raise ValueError(f"expected ':' at byte {pos}")
+        start: int = _skip_ws(raw, pos + 1)
+        end: int = _value_end(raw, start)
+        yield json.loads(key_raw), key_raw, start, end
+        pos = _skip_ws(raw, end)
+        delimiter: bytes = raw[pos:pos + 1]
+        if delimiter == b"}":
+            return
+        if delimiter != b",":
+            raise ValueError(f"expected ',' or '}}' at byte {pos}")
+        pos = _skip_ws(raw, pos + 1)
+
+
+def peek(raw: bytes, keys: Collection[str]) -> Dict[str, Any]:
+    """ Decode only `keys` from a payload; stops once all of them are found. """
+    found: Dict[str, Any] = {}
+    for key, _, start, end in members(raw):
+        if key in keys:
+            found[key] = json.loads(raw[start:end])
+            if len(found) == len(keys):
+                break
+    return found
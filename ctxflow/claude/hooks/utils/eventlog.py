@@ -0,0 +1,551 @@
+"""
+Append-only JSONL event log shared by every Claude hook.
+
+Each event is serialized to a single line and written with one ``os.write``
+on a descriptor opened with ``O_APPEND``, so the cost of logging an event does
+not depend on how many events are already in the file and concurrent hook
+processes never clobber each other's lines.
+
+Logs are split into segments. ``logs/<hook>.jsonl`` is a symlink to the
+active segment ``logs/<hook>.<stamp>.jsonl``; once the active segment
+outgrows the size or age limit from the settings a new one is created and
+the symlink is swapped atomically. Sealed segments are gzipped, and pruned
+once past the retention period, by a detached maintenance process so the
+hook never waits on it. ``iter_hook_events`` reads across every segment,
+compressed or not.
+
+``append_payload`` logs a raw hook payload without decoding it: the
+record is spliced together from the payload bytes, and top level values
+of at least `logs.blob_min_bytes` are moved to the content-addressed blob
+store in ``logs/blobs`` and referenced by hash, so the log stays small and
+quick to scan.
+
+With `logs.central` set, every project writes to the same logs under
+``~/.ctxflow/events`` instead. Nothing changes for the writers: each
+record is still one ``O_APPEND`` write, so hooks from any number of
+projects and parallel subagents append to the shared segment without
+taking a lock, and rotation is serialized by the same flock. Records are
+small because large payload values go to the (then shared) blob store.
+
+Older versions of the hooks kept a JSON array per hook (``logs/<hook>.json``)
+that was read and rewritten on every event; ``migrate_legacy_log`` converts
+those files once, the first time a hook touches its log.
+
+Maintenance from the command line (from the hooks directory)::
+
+    python -m utils.eventlog migrate [LOG_DIR]
+    python -m utils.eventlog maintain LOG_DIR HOOK
+"""
+
+import calendar
+import fcntl
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .blobstore import BlobStore, blob_ref
+from .detach import spawn_module
+from .envelope import members
+from .settings import load_settings
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+LOG_SUFFIX: str = ".jsonl"
+LEGACY_SUFFIX: str = ".json"
+MIGRATED_SUFFIX: str = ".json.migrated"
+GZIP_SUFFIX: str = ".gz"
+
+# seconds a sealed segment is left alone before it is compressed, so that a
+# writer which raced the rotation has finished its append
+COMPRESS_GRACE: float = 5.0
+
+_OPEN_FLAGS: int = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+_STAMP_FORMAT: str = "%Y%m%dT%H%M%S"
+_STAMP: "re.Pattern[str]" = re.compile(r"^(\d{8}T\d{6})(\d{6})$")
+_open_logs: Dict[str, "EventLog"] = {}
+_open_logs_lock: threading.Lock = threading.Lock()
+
+
+def central_log_dir() -> Path:
+    """ The log directory every project shares when `logs.central` is on. """
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "events"
+
+
+def default_log_dir() -> Path:
+    """
+    Directory the hooks log into: `logs/` under the project root, or the
+    central directory when `logs.central` is set.
+    """
+    if load_settings()["logs"].get("central"):
+        return central_log_dir()
+    return Path.cwd() / "logs"
+
+
+def encode_event(event: Any) -> bytes:
+    """ Serialize an event to one newline terminated JSONL record. """
+    line: str = json.dumps(event, separators=(",", ":"), ensure_ascii=False)
+    return (line + "\n").encode("utf-8")
+
+
+@dataclass
+class RotationPolicy:
+    """ When to seal the active segment and what to do with sealed ones. """
+
+    max_bytes: int = 0
+    max_age: float = 0.0
+    retention: float = 0.0
+    compress: bool = True
+
+    @classmethod
+    def from_settings(cls) -> "RotationPolicy":
+        logs: Dict[str, Any] = load_settings()["logs"]
+        return cls(
+            max_bytes=int(logs.get("segment_max_bytes") or 0),
+            max_age=float(logs.get("segment_max_age_hours") or 0) * 3600,
+            retention=float(logs.get("retention_days") or 0) * 86400,
+            compress=bool(logs.get("compress", True)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or self.max_age > 0
+
+
+def _new_stamp(now: float) -> str:
+    return time.strftime(_STAMP_FORMAT, time.gmtime(now)) + f"{int(now * 1e6) % 1000000:06d}"
+
+
+def _stamp_time(stamp: str) -> Optional[float]:
+    m = _STAMP.match(stamp)
+    if m is None:
+        return None
+    return calendar.timegm(time.strptime(m.group(1), _STAMP_FORMAT)) + int(m.group(2)) / 1e6
+
+
+def _segment_stamp(path: Path, hook_name: str) -> Optional[str]:
+    """ The stamp of `<hook>.<stamp>.jsonl[.gz]`, or None for other files. """
+    name: str = path.name
+    if name.endswith(GZIP_SUFFIX):
+        name = name[:-len(GZIP_SUFFIX)]
+    prefix: str = hook_name + "."
+    if not name.startswith(prefix) or not name.endswith(LOG_SUFFIX):
+        return None
+    stamp: str = name[len(prefix):-len(LOG_SUFFIX)]
+    return stamp if _STAMP.match(stamp) else None
+
+
+class EventLog:
+    """
+    A single append-only JSONL log, optionally split into rotating segments.
+
+    The file descriptor is opened lazily and kept open, so a long-lived
+    process (e.g. the hook daemon) pays for ``open`` once per log. With a
+    rotation policy each append costs one extra ``fstat``/``stat`` pair to
+    notice size/age limits and rotations done by other processes. Appends
+    hold the log's thread lock from the rotation check through the write,
+    so no other thread can close or swap the descriptor mid-append.
+    """
+
+    def __init__(self, path: PathLike, rotation: Optional[RotationPolicy] = None):
+        self.path: Path = Path(path)
+        self.rotation: Optional[RotationPolicy] = rotation if rotation and rotation.enabled else None
+        self.hook_name: str = self.path.name[:-len(LOG_SUFFIX)] \
+            if self.path.name.endswith(LOG_SUFFIX) else self.path.stem
+        self._fd: Optional[int] = None
+        self._ino: int = 0
+        self._born: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def _open_locked(self) -> int:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.rotation is not None and not self.path.is_symlink():
+                self._rotate_locked(time.time())
+            self._fd = os.open(self.path, _OPEN_FLAGS, 0o644)
+            self._ino = os.fstat(self._fd).st_ino
+            self._born = 0.0
+            if self.rotation is not None:
+                stamp: Optional[str] = _segment_stamp(Path(os.readlink(self.path)), self.hook_name)
+                self._born = _stamp_time(stamp) if stamp else 0.0
+        return self._fd
+
+    def _reopen_locked(self) -> int:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        return self._open_locked()
+
+    def _lock_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".lock")
+
+    def _rotate_locked(self, now: float) -> None:
+        """
+        Start a new active segment. Serialized across processes with an
+        flock; whoever gets the lock second sees the fresh segment and
+        leaves it alone.
+        """
+        with open(self._lock_path(), "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                sealed: bool = False
+                if self.path.is_symlink():
+                    try:
+                        current: os.stat_result = os.stat(self.path)
+                    except FileNotFoundError:
+                        current = None  # type: ignore[assignment]
+                    if current is not None and (self._fd is None or current.st_ino != self._ino):
+                        return  # someone else already rotated
+                    sealed = current is not None
+                elif self.path.exists():
+                    sealed = True
+                    # adopt a plain (pre-rotation) log as the first sealed segment
+                    os.replace(self.path, self.path.with_name(
+                        f"{self.hook_name}.{_new_stamp(os.stat(self.path).st_mtime)}{LOG_SUFFIX}"))
+
+                segment: str = f"{self.hook_name}.{_new_stamp(now)}{LOG_SUFFIX}"
+                os.close(os.open(self.path.with_name(segment), _OPEN_FLAGS, 0o644))
+                tmp_link: Path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+                try:
+                    tmp_link.unlink()
+                except FileNotFoundError:
+                    pass
+                os.symlink(segment, tmp_link)
+                os.replace(tmp_link, self.path)
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        if sealed:
+            self._spawn_maintenance()
+
+    def _spawn_maintenance(self) -> None:
+        """ Compress/prune sealed segments in a detached process. """
+        policy: Optional[RotationPolicy] = self.rotation
+        if policy is None or not (policy.compress or policy.retention > 0):
+            return
+        spawn_module("eventlog", "maintain", str(self.path.parent.resolve()), self.hook_name)
+
+    def _check_rotation_locked(self, fd: int, incoming: int) -> int:
+        policy: RotationPolicy = self.rotation  # type: ignore[assignment]
+        try:
+            if os.stat(self.path).st_ino != self._ino:
+                fd = self._reopen_locked()  # another process rotated
+        except FileNotFoundError:
+            fd = self._reopen_locked()
+        size: int = os.fstat(fd).st_size
+        now: float = time.time()
+        too_big: bool = policy.max_bytes > 0 and size > 0 and size + incoming > policy.max_bytes
+        too_old: bool = policy.max_age > 0 and self._born > 0 and now - self._born > policy.max_age
+        if too_big or too_old:
+            self._rotate_locked(now)
+            fd = self._reopen_locked()
+        return fd
+
+    def append(self, event: Any) -> int:
+        """ Append one event; returns the number of bytes written. """
+        return self.append_raw(encode_event(event))
+
+    def append_raw(self, record: bytes) -> int:
+        """ Append an already encoded, newline terminated record. """
+        with self._lock:
+            fd: int = self._open_locked()
+            if self.rotation is not None:
+                fd = self._check_rotation_locked(fd, len(record))
+            written: int = os.write(fd, record)
+            # a short write only happens on a full disk or a signal; finish
+            # the line so the next record still starts on its own line
+            while written < len(record):
+                written += os.write(fd, record[written:])
+            return written
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def hook_log_path(hook_name: str, log_dir: Optional[PathLike] = None) -> Path:
+    """ Path of the JSONL log for a hook, e.g. `logs/pre_tool_use.jsonl`. """
+    base: Path = Path(log_dir) if log_dir is not None else default_log_dir()
+    return base / f"{hook_name}{LOG_SUFFIX}"
+
+
+def get_log(hook_name: str, log_dir: Optional[PathLike] = None) -> EventLog:
+    """
+    Return the (cached) event log for a hook, migrating a legacy JSON array
+    log for that hook first if one is still lying around. Rotation follows
+    the `logs` section of the settings.
+    """
+    path: Path = hook_log_path(hook_name, log_dir)
+    key: str = str(path)
+    log: Optional[EventLog] = _open_logs.get(key)
+    if log is None:
+        with _open_logs_lock:
+            log = _open_logs.get(key)
+            if log is None:
+                legacy: Path = path.with_suffix(LEGACY_SUFFIX)
+                if legacy.exists():
+                    migrate_legacy_log(legacy, path)
+                log = EventLog(path, RotationPolicy.from_settings())
+                _open_logs[key] = log
+    return log
+
+
+def append_event(hook_name: str, event: Any, log_dir: Optional[PathLike] = None) -> int:
+    """
+    Append one event to a hook's log. Hook payloads carry no timestamp,
+    so dict events are stamped with `logged_at` (epoch seconds).
+    """
+    if isinstance(event, dict) and "logged_at" not in event:
+        event = {**event, "logged_at": time.time()}
+    return get_log(hook_name, log_dir).append(event)
+
+
+def blob_store(log_dir: Optional[PathLike] = None) -> BlobStore:
+    """ Where `append_payload` moves large payload values. """
+    return BlobStore((Path(log_dir) if log_dir is not None else default_log_dir()) / "blobs")
+
+
+def encode_payload(payload: bytes, logged_at: float, store: Optional[BlobStore] = None,
+                   blob_min_bytes: int = 0) -> bytes:
+    """
+    Turn a raw JSON object payload into a JSONL record stamped with
+    `logged_at`, without decoding it. With a `store`, values of at least
+    `blob_min_bytes` are put in it and replaced by a reference.
+    """
+    fields: List[bytes] = []
+    stamped: bool = False
+    for key, key_raw, start, end in members(payload):
+        stamped = stamped or key == "logged_at"
+        value: bytes = payload[start:end]
+        if store is not None and 0 < blob_min_bytes <= end - start:
+            value = blob_ref(store.put(value), end - start)
+        elif b"\n" in value or b"\r" in value:
+            # raw newlines can only be whitespace between tokens
+            value = value.replace(b"\n", b" ").replace(b"\r", b" ")
+        fields.append(key_raw + b":" + value)
+    if not stamped:
+        fields.insert(0, b'"logged_at":' + repr(logged_at).encode())
+    return b"{" + b",".join(fields) + b"}\n"
+
+
+def append_payload(hook_name: str, payload: bytes, log_dir: Optional[PathLike] = None) -> int:
+    """
+    Append a raw hook payload (a JSON object) to a hook's log, moving its
+    large values out of line; raises ValueError for anything else.
+    """
+    blob_min_bytes: int = int(load_settings()["logs"].get("blob_min_bytes") or 0)
+    record: bytes = encode_payload(payload, time.time(), blob_store(log_dir), blob_min_bytes)
+    return get_log(hook_name, log_dir).append_raw(record)
+
+
+def close_logs() -> None:
+    """ Close every cached log descriptor. """
+    with _open_logs_lock:
+        for log in _open_logs.values():
+            log.close()
+        _open_logs.clear()
+
+
+def migrate_legacy_log(legacy_path: PathLike, log_path: Optional[PathLike] = None) -> int:
+    """
+    Convert a legacy `<hook>.json` array file into JSONL.
+
+    The events from the array become a sealed segment of their own, stamped
+    ahead of every existing segment, so the original ordering is kept and
+    no file another hook may be appending to is rewritten. The conversion
+    holds the log's segment flock, the one rotation takes, and checks
+    again under it that the legacy file is still there. The legacy file is
+    renamed to `<hook>.json.migrated` rather than deleted. Returns the
+    number of events migrated; a missing or already migrated file migrates
+    nothing.
+    """
+    legacy: Path = Path(legacy_path)
+    target: Path = Path(log_path) if log_path is not None else legacy.with_suffix(LOG_SUFFIX)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    hook_name: str = target.name[:-len(LOG_SUFFIX)] if target.name.endswith(LOG_SUFFIX) else target.stem
+
+    with open(target.with_name(target.name + ".lock"), "a") as lock:
+        # several hooks can start at once; only one of them migrates
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            try:
+                with open(legacy, "r") as f:
+                    born: float = os.fstat(f.fileno()).st_mtime
+                    events: Any = json.load(f)
+            except FileNotFoundError:
+                return 0  # migrated while we waited for the lock
+            except (json.JSONDecodeError, ValueError):
+                events = []
+                born = time.time()
+            if not isinstance(events, list):
+                events = [events]
+
+            # older than every segment, the pre-rotation plain log included
+            for segment in list_segments(hook_name, target.parent):
+                stamp: Optional[str] = _segment_stamp(segment, hook_name)
+                seen: Optional[float] = _stamp_time(stamp) if stamp else os.stat(segment).st_mtime
+                if seen is not None:
+                    born = min(born, seen - 1e-6)
+            segment_path: Path = target.with_name(f"{hook_name}.{_new_stamp(born)}{LOG_SUFFIX}")
+            tmp_path: Path = target.with_name(f".{segment_path.name}.tmp")
+            with open(tmp_path, "wb") as out:
+                for event in events:
+                    out.write(encode_event(event))
+            os.replace(tmp_path, segment_path)
+            os.replace(legacy, legacy.with_name(legacy.stem + MIGRATED_SUFFIX))
+            return len(events)
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def migrate_log_dir(log_dir: Optional[PathLike] = None) -> Dict[str, int]:
+    """ Migrate every legacy JSON array log in a log directory. """
+    base: Path = Path(log_dir) if log_dir is not None else default_log_dir()
+    migrated: Dict[str, int] = {}
+    if not base.is_dir():
+        return migrated
+    for legacy in sorted(base.glob(f"*{LEGACY_SUFFIX}")):
+        migrated[legacy.stem] = migrate_legacy_log(legacy)
+    return migrated
+
+
+def list_segments(hook_name: str, log_dir: Optional[PathLike] = None) -> List[Path]:
+    """
+    Every segment of a hook log, oldest first: sealed segments (plain or
+    gzipped), then the active one. A pre-rotation plain log counts as the
+    active segment.
+    """
+    path: Path = hook_log_path(hook_name, log_dir)
+    if not path.parent.is_dir():
+        return []
+    stamped: Dict[str, Path] = {}
+    for candidate in path.parent.glob(f"{hook_name}.*{LOG_SUFFIX}*"):
+        stamp: Optional[str] = _segment_stamp(candidate, hook_name)
+        if stamp is None:
+            continue
+        # mid-compression both files exist; the plain one is complete
+        if stamp not in stamped or not candidate.name.endswith(GZIP_SUFFIX):
+            stamped[stamp] = candidate
+    segments: List[Path] = [stamped[stamp] for stamp in sorted(stamped)]
+    if path.exists() and not path.is_symlink():
+        segments.append(path)
+    return segments
+
+
+def active_segment(hook_name: str, log_dir: Optional[PathLike] = None) -> Optional[Path]:
+    """ The segment currently written to, if the log exists. """
+    path: Path = hook_log_path(hook_name, log_dir)
+    if path.is_symlink():
+        return path.resolve()
+    return path if path.exists() else None
+
+
+def open_segment(path: PathLike) -> Any:
+    """ Open a (possibly gzipped) segment for binary reading. """
+    if str(path).endswith(GZIP_SUFFIX):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_events(path: PathLike, skip_invalid: bool = True) -> Iterator[Any]:
+    """
+    Stream events back from a JSONL log (or gzipped segment) one line at a
+    time.
+
+    A torn or otherwise undecodable line is skipped unless `skip_invalid`
+    is False, in which case the ``json.JSONDecodeError`` propagates.
+    """
+    try:
+        f = open_segment(path)
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                if not skip_invalid:
+                    raise
+
+
+def iter_hook_events(hook_name: str, log_dir: Optional[PathLike] = None) -> Iterator[Any]:
+    """ Stream the events logged by one hook across all of its segments. """
+    path: Path = hook_log_path(hook_name, log_dir)
+    legacy: Path = path.with_suffix(LEGACY_SUFFIX)
+    if legacy.exists():
+        migrate_legacy_log(legacy, path)
+    for segment in list_segments(hook_name, log_dir):
+        yield from iter_events(segment)
+
+
+def compress_segment(path: PathLike) -> Path:
+    """ Gzip a sealed segment next to itself and remove the original. """
+    source: Path = Path(path)
+    target: Path = source.with_name(source.name + GZIP_SUFFIX)
+    tmp: Path = source.with_name(f".{target.name}.tmp")
+    with open(source, "rb") as src, gzip.open(tmp, "wb") as dst:
+        while True:
+            block: bytes = src.read(1 << 20)
+            if not block:
+                break
+            dst.write(block)
+    os.replace(tmp, target)
+    source.unlink()
+    return target
+
+
+def maintain_segments(hook_name: str, log_dir: Optional[PathLike] = None,
+                      policy: Optional[RotationPolicy] = None,
+                      grace: float = COMPRESS_GRACE) -> None:
+    """ Compress sealed segments and drop the ones past retention. """
+    rules: RotationPolicy = policy or RotationPolicy.from_settings()
+    active: Optional[Path] = active_segment(hook_name, log_dir)
+    now: float = time.time()
+    for segment in list_segments(hook_name, log_dir):
+        if active is not None and segment.resolve() == active:
+            continue
+        try:
+            mtime: float = segment.stat().st_mtime
+        except FileNotFoundError:
+            continue  # another maintenance pass got to it first
+        if rules.retention > 0 and now - mtime > rules.retention:
+            segment.unlink()
+        elif rules.compress and not segment.name.endswith(GZIP_SUFFIX) and now - mtime > grace:
+            compress_segment(segment)
+
+
+def _main(argv: List[str]) -> None:
+    if argv[:1] == ["maintain"] and len(argv) == 3:
+        lock_path: Path = Path(argv[1]) / f".{argv[2]}.maintain.lock"
+        with open(lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # a maintenance pass is already running
+            time.sleep(COMPRESS_GRACE)
+            maintain_segments(argv[2], argv[1])
+    elif argv[:1] == ["migrate"]:
+        for name, count in migrate_log_dir(argv[1] if len(argv) > 1 else None).items():
+            print(f"{name}: {count} events migrated")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
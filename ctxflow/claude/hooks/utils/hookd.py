@@ -0,0 +1,266 @@
+"""
+Hook daemon: serves PreToolUse/PostToolUse hooks over a Unix socket.
+
+Claude Code runs a hook command for every tool call. Going through
+``uv run`` means environment resolution plus a fresh interpreter per call;
+the daemon keeps one interpreter alive per project with the hook modules
+imported (so their rules are compiled once) and their log files open.
+
+``hook_client.py`` is the command registered in ``settings.json``. It only
+imports the stdlib and this module, forwards stdin to the daemon and
+replays the daemon's exit code and output. When no daemon is listening the
+client runs the hook in its own process instead, so hooks never stop
+working because the daemon is down. A hook invoked with arguments also runs
+in the client: daemon threads share one ``sys.argv``, so the daemon could
+not hand each request its own flags.
+
+Wire format, one request per connection::
+
+    client -> {"hook": "<name>"}\\n<raw hook payload>  (then EOF)
+    daemon -> {"code": <int>, "stdout": "...", "stderr": "..."}\\n
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+
+SUCCEED = 0
+FAIL = 1
+
+# hooks that are cheap, synchronous and safe to run on daemon threads
+DAEMON_HOOKS: Tuple[str, ...] = ("pre_tool_use", "post_tool_use")
+
+CONNECT_TIMEOUT: float = 0.25
+REQUEST_TIMEOUT: float = 10.0
+IDLE_TIMEOUT: float = 60 * 60
+
+_RECV_SIZE: int = 1 << 16
+
+
+def run_dir() -> Path:
+    """ Directory holding daemon sockets and pid files. """
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "run"
+
+
+def _project_key(project_dir: str) -> str:
+    real: str = os.path.realpath(project_dir)
+    return hashlib.sha1(real.encode("utf-8")).hexdigest()[:16]
+
+
+def socket_path(project_dir: Optional[str] = None) -> Path:
+    """
+    Socket of the daemon serving a project. Keyed on a hash of the project
+    path, since Unix socket paths are limited to ~100 bytes.
+    """
+    return run_dir() / f"hookd-{_project_key(project_dir or os.getcwd())}.sock"
+
+
+def pid_path(project_dir: Optional[str] = None) -> Path:
+    return run_dir() / f"hookd-{_project_key(project_dir or os.getcwd())}.pid"
+
+
+def send_request(
+        hook: str,
+        payload: bytes,
+        argv: Optional[list] = None,
+        project_dir: Optional[str] = None,
+) -> Optional[Tuple[int, str, str]]:
+    """
+    Forward a hook payload to the daemon.
+    Returns (exit code, stdout, stderr), or None when no daemon answered, or
+    the hook has arguments, and the caller should run the hook itself.
+    """
+    if argv:
+        return None
+    path: Path = socket_path(project_dir)
+    if not path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(path))
+        sock.settimeout(REQUEST_TIMEOUT)
+        header: bytes = json.dumps({"hook": hook}).encode("utf-8")
+        sock.sendall(header + b"\n" + payload)
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks: list = []
+        while True:
+            chunk: bytes = sock.recv(_RECV_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        response: Dict[str, Any] = json.loads(b"".join(chunks))
+        return int(response["code"]), response.get("stdout", ""), response.get("stderr", "")
+    except (OSError, ValueError, KeyError):
+        return None
+    finally:
+        sock.close()
+
+
+def is_running(project_dir: Optional[str] = None) -> bool:
+    """ True when a daemon is accepting connections for the project. """
+    path: Path = socket_path(project_dir)
+    if not path.exists():
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+class _HookHandler(socketserver.StreamRequestHandler):
+    server: "HookServer"
+
+    def handle(self) -> None:
+        self.server.touch()
+        header: bytes = self.rfile.readline()
+        payload: bytes = self.rfile.read()
+        try:
+            request: Dict[str, Any] = json.loads(header)
+            if request.get("argv"):
+                raise ValueError("hook arguments are not supported, run the hook directly")
+            code, stderr = self.server.dispatch(request["hook"], payload)
+        except Exception as e:
+            code, stderr = FAIL, f"hookd: {type(e).__name__}: {e}\n"
+        response: bytes = json.dumps({"code": code, "stdout": "", "stderr": stderr}).encode("utf-8")
+        self.wfile.write(response + b"\n")
+
+
+class HookServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Threaded Unix socket server holding the imported hook modules. """
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, hooks_dir: Path):
+        self.hooks: Dict[str, ModuleType] = {}
+        self.last_request: float = time.monotonic()
+        if str(hooks_dir) not in sys.path:
+            sys.path.insert(0, str(hooks_dir))
+        for name in DAEMON_HOOKS:
+            if (hooks_dir / f"{name}.py").exists():
+                self.hooks[name] = importlib.import_module(name)
+        super().__init__(str(path), _HookHandler)
+
+    def touch(self) -> None:
+        self.last_request = time.monotonic()
+
+    def dispatch(self, hook: str, payload: bytes) -> Tuple[int, str]:
+        module: Optional[ModuleType] = self.hooks.get(hook)
+        if module is None:
+            return FAIL, f"hookd: hook {hook!r} is not served by the daemon\n"
+        # imported here so the thin client keeps to the stdlib
+        from .metrics import HookTimer, phase
+
+        with HookTimer(hook, via="daemon") as timer:
+            if hasattr(module, "process_raw"):
+                # the hook reads what it needs from the payload bytes itself
+                try:
+                    code, message = module.process_raw(payload)
+                except Exception:
+                    code, message = FAIL, ""
+                timer.code = code
+                return code, message
+            try:
+                with phase("parse"):
+                    input_data: Any = json.loads(payload)
+            except ValueError:
+                timer.code = FAIL
+                return FAIL, ""
+            try:
+                code, message = module.process(input_data)
+            except Exception:
+                # same contract as the scripts: unexpected errors never block a tool
+                code, message = FAIL, ""
+            timer.code = code
+            return code, message
+
+
+def serve(
+        project_dir: Optional[str] = None,
+        hooks_dir: Optional[str] = None,
+        idle_timeout: float = IDLE_TIMEOUT,
+) -> int:
+    """
+    Run the daemon for a project in the foreground until SIGTERM/SIGINT or
+    until no request arrived for `idle_timeout` seconds (0 disables it).
+    """
+    project: str = os.path.realpath(project_dir or os.getcwd())
+    hooks: Path = Path(hooks_dir) if hooks_dir else Path(project) / ".claude" / "hooks"
+    os.chdir(project)  # hooks log relative to the project root
+
+    if is_running(project):
+        return SUCCEED
+
+    path: Path = socket_path(project)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        path.unlink()  # stale socket from a daemon that died
+    except FileNotFoundError:
+        pass
+
+    server: HookServer = HookServer(path, hooks)
+    os.chmod(path, 0o600)
+    pid_file: Path = pid_path(project)
+    pid_file.write_text(str(os.getpid()))
+
+    def _shutdown(signum: int, frame: Any) -> None:
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    if idle_timeout > 0:
+        def _idle_watch() -> None:
+            while True:
+                time.sleep(min(idle_timeout, 30))
+                if time.monotonic() - server.last_request > idle_timeout:
+                    server.shutdown()
+                    return
+
+        threading.Thread(target=_idle_watch, daemon=True).start()
+
+    try:
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+        for stale in (path, pid_file):
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+        eventlog: Optional[ModuleType] = sys.modules.get("utils.eventlog")
+        if eventlog is not None:
+            eventlog.close_logs()
+    return SUCCEED
+
+
+def stop(project_dir: Optional[str] = None) -> bool:
+    """ Ask the daemon for a project to shut down; True if one was signalled. """
+    pid_file: Path = pid_path(project_dir)
+    try:
+        pid: int = int(pid_file.read_text().strip())
+    except (FileNotFoundError, ValueError):
+        return False
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pid_file.unlink()
+        return False
+    return True
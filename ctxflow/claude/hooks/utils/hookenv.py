@@ -0,0 +1,229 @@
+"""
+Prebuilt interpreters for the hook commands in `.claude/settings.json`.
+
+`uv run script.py` reads the script's inline `# /// script` metadata and
+resolves its dependencies before any hook code runs, on every event.
+`warm_project` builds one locked environment per distinct metadata block
+ahead of time, under `~/.ctxflow/hookenvs/<checksum>/`, and rewrites the
+hook commands to call that environment's interpreter directly. The
+checksum covers `requires-python` and the dependency list, so scripts
+with the same metadata share an environment and an environment is only
+rebuilt when a script's dependencies change.
+
+The commands as they were before warming are kept in
+`.claude/hookenv.json`; warming again starts from them, and
+`unwarm_project` puts them back.
+
+Environments are built with uv: `uv venv`, then `uv pip compile` to a
+lock file and `uv pip sync` from it.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# the reference regex from PEP 723
+_METADATA_RE = re.compile(
+    r"(?m)^# /// (?P<type>[a-zA-Z0-9-]+)$\s(?P<content>(^#(| .*)$\s)+)^# ///$")
+# `uv run [--script] path.py args` or `python3 path.py args`
+_COMMAND_RE = re.compile(
+    r"^(?P<launcher>uv run(?: --script)?|python3?)\s+(?P<script>\S+\.py)(?P<args>(?:\s.*)?)$")
+MARKER: str = ".ctxflow-env.json"
+STATE_FILE: str = "hookenv.json"
+
+Runner = Callable[..., "subprocess.CompletedProcess[Any]"]
+
+
+@dataclass(frozen=True)
+class EnvSpec:
+    """ What an environment is built from: a script's inline metadata. """
+
+    requires_python: Optional[str] = None
+    dependencies: Tuple[str, ...] = ()
+
+    @property
+    def key(self) -> str:
+        spec: str = json.dumps([self.requires_python, sorted(self.dependencies)], separators=(",", ":"))
+        return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class WarmReport:
+    built: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+    rewritten: int = 0
+    skipped: List[str] = field(default_factory=list)
+
+
+def _parse_toml(text: str) -> Dict[str, Any]:
+    try:
+        import tomllib
+        return tomllib.loads(text)
+    except ImportError:  # python < 3.11: the two keys the hooks use
+        data: Dict[str, Any] = {}
+        python: Optional[re.Match] = re.search(r'(?m)^requires-python\s*=\s*"([^"]*)"', text)
+        if python:
+            data["requires-python"] = python.group(1)
+        deps: Optional[re.Match] = re.search(r"(?ms)^dependencies\s*=\s*\[(.*?)\]", text)
+        if deps:
+            data["dependencies"] = re.findall(r'"([^"]+)"', deps.group(1))
+        return data
+
+
+def read_spec(script: Path) -> EnvSpec:
+    """ The `script` metadata block of a file; an empty spec without one. """
+    match: Optional[re.Match] = next(
+        (m for m in _METADATA_RE.finditer(script.read_text()) if m.group("type") == "script"), None)
+    if match is None:
+        return EnvSpec()
+    content: str = "".join(
+        line[2:] if line.startswith("# ") else line[1:]
+        for line in match.group("content").splitlines(keepends=True))
+    metadata: Dict[str, Any] = _parse_toml(content)
+    return EnvSpec(metadata.get("requires-python"), tuple(metadata.get("dependencies", [])))
+
+
+def envs_dir() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "hookenvs"
+
+
+def env_dir(spec: EnvSpec) -> Path:
+    return envs_dir() / spec.key
+
+
+def env_python(spec: EnvSpec) -> Path:
+    return env_dir(spec) / "bin" / "python"
+
+
+def is_built(spec: EnvSpec) -> bool:
+    """ Whether the environment finished building and still has its interpreter. """
+    try:
+        with open(env_dir(spec) / MARKER, "r") as f:
+            marker: Any = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(marker, dict) and marker.get("key") == spec.key and env_python(spec).exists()
+
+
+def _uv(run: Runner, *args: str, cwd: Optional[Path] = None) -> None:
+    run(["uv", *args], check=True, capture_output=True, cwd=cwd)
+
+
+def build_env(spec: EnvSpec, force: bool = False, run: Runner = subprocess.run) -> bool:
+    """
+    Build the environment for `spec` unless it is already built (or
+    `force`); returns whether it was built. Concurrent builds of one
+    environment wait for each other instead of building twice.
+    """
+    envs_dir().mkdir(parents=True, exist_ok=True)
+    with open(envs_dir() / f".{spec.key}.lock", "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        if not force and is_built(spec):
+            return False
+        target: Path = env_dir(spec)
+        shutil.rmtree(target, ignore_errors=True)
+        venv: List[str] = ["venv", str(target)]
+        if spec.requires_python:
+            venv += ["--python", spec.requires_python]
+        _uv(run, *venv)
+        if spec.dependencies:
+            (target / "requirements.in").write_text("\n".join(spec.dependencies) + "\n")
+            python: str = str(env_python(spec))
+            _uv(run, "pip", "compile", "requirements.in", "-o", "requirements.lock", "--python", python,
+                cwd=target)
+            _uv(run, "pip", "sync", "requirements.lock", "--python", python, cwd=target)
+        # written last: a half built environment has no marker and is rebuilt
+        with open(target / MARKER, "w") as f:
+            json.dump({"key": spec.key, "requires_python": spec.requires_python,
+                       "dependencies": list(spec.dependencies), "built": time.time()}, f)
+        return True
+
+
+def _hook_commands(settings: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    for groups in settings.get("hooks", {}).values():
+        for group in groups:
+            for hook in group.get("hooks", []):
+                if hook.get("type") == "command" and isinstance(hook.get("command"), str):
+                    yield hook
+
+
+def _load_state(claude_dir: Path) -> Dict[str, str]:
+    try:
+        with open(claude_dir / STATE_FILE, "r") as f:
+            state: Any = json.load(f)
+        return dict(state.get("commands", {}))
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _write_json(path: Path, data: Any) -> None:
+    tmp: Path = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=4)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def warm_project(project_dir: Path, force: bool = False, run: Runner = subprocess.run) -> WarmReport:
+    """
+    Build the environments the project's hook commands need and point the
+    commands at their interpreters.
+    """
+    claude_dir: Path = project_dir / ".claude"
+    settings_path: Path = claude_dir / "settings.json"
+    with open(settings_path, "r") as f:
+        settings: Dict[str, Any] = json.load(f)
+    originals: Dict[str, str] = _load_state(claude_dir)
+    report: WarmReport = WarmReport()
+    seen: Dict[str, bool] = {}
+
+    for hook in _hook_commands(settings):
+        original: str = originals.get(hook["command"], hook["command"])
+        match: Optional[re.Match] = _COMMAND_RE.match(original.strip())
+        script: Optional[Path] = project_dir / match.group("script") if match else None
+        if match is None or script is None or not script.is_file():
+            report.skipped.append(original)
+            continue
+        spec: EnvSpec = read_spec(script)
+        if spec.key not in seen:
+            seen[spec.key] = build_env(spec, force=force, run=run)
+            (report.built if seen[spec.key] else report.reused).append(spec.key)
+        warmed: str = f"{shlex.quote(str(env_python(spec)))} {match.group('script')}{match.group('args')}"
+        if warmed != hook["command"]:
+            report.rewritten += 1
+        originals[warmed] = original
+        hook["command"] = warmed
+
+    # forget commands that are no longer in the settings
+    current = {hook["command"] for hook in _hook_commands(settings)}
+    _write_json(claude_dir / STATE_FILE, {"commands": {k: v for k, v in originals.items() if k in current}})
+    _write_json(settings_path, settings)
+    return report
+
+
+def unwarm_project(project_dir: Path) -> int:
+    """ Restore the hook commands warming replaced; returns how many. """
+    claude_dir: Path = project_dir / ".claude"
+    originals: Dict[str, str] = _load_state(claude_dir)
+    if not originals:
+        return 0
+    settings_path: Path = claude_dir / "settings.json"
+    with open(settings_path, "r") as f:
+        settings: Dict[str, Any] = json.load(f)
+    restored: int = 0
+    for hook in _hook_commands(settings):
+        if hook["command"] in originals:
+            hook["command"] = originals[hook["command"]]
+            restored += 1
+    _write_json(settings_path, settings)
+    (claude_dir / STATE_FILE).unlink()
+    return restored
@@ -0,0 +1,433 @@
+"""
+SQLite index of hook events and session transcripts.
+
+The hooks append raw events to `logs/<hook>.jsonl`; this module ingests
+those logs and the Claude transcripts they point at into
+`~/.ctxflow/sessions.db` so past sessions can be listed and searched
+without grepping multi-MB files. Ingestion is incremental: the byte
+offset reached in every source file is stored next to the data and only
+lines appended since are read, inside the same transaction that inserts
+them.
+
+Nothing is ingested on the hook path: `ctx sessions` catches the index
+up with the logs, and with a session's transcript, right before it
+answers. The database runs in WAL mode so readers never wait on that.
+With `logs.central` set, every project's hooks log to
+`~/.ctxflow/events` and `ctx events` queries all of them at once.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .eventlog import GZIP_SUFFIX, default_log_dir, list_segments, open_segment
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+HOOK_LOGS: Tuple[str, ...] = (
+    "pre_tool_use", "post_tool_use", "notification", "stop", "subagent_stop")
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    cwd TEXT,
+    transcript_path TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    event_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions(last_seen);
+CREATE INDEX IF NOT EXISTS sessions_cwd ON sessions(cwd, last_seen);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    hook TEXT NOT NULL,
+    tool_name TEXT,
+    ts REAL NOT NULL,
+    payload TEXT NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS events_session ON events(session_id, ts);
+CREATE INDEX IF NOT EXISTS events_tool ON events(tool_name, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events(ts);
+
+CREATE TABLE IF NOT EXISTS transcript (
+    session_id TEXT NOT NULL,
+    line_no INTEGER NOT NULL,
+    type TEXT,
+    ts TEXT,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (session_id, line_no)
+);
+
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    lines INTEGER NOT NULL
+);
+"""
+
+
+def default_db_path() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "sessions.db"
+
+
+def _read_new_lines(path: Path, inode: int, offset: int) -> Tuple[int, int, List[bytes], bool]:
+    """
+    Read the complete lines appended to `path` after `offset`.
+    Returns (inode, new offset, lines, reset); a replaced or truncated
+    file is read again from the start and flagged with `reset`.
+    """
+    reset: bool = False
+    with open(path, "rb") as f:
+        stat: os.stat_result = os.fstat(f.fileno())
+        if stat.st_ino != inode or stat.st_size < offset:
+            reset = offset > 0
+            offset = 0
+        f.seek(offset)
+        data: bytes = f.read(max(stat.st_size - offset, 0))
+    complete: int = data.rfind(b"\n") + 1
+    lines: List[bytes] = [line for line in data[:complete].splitlines() if line.strip()]
+    return stat.st_ino, offset + complete, lines, reset
+
+
+def _read_sealed_lines(path: Path, offset: int) -> Tuple[int, List[bytes]]:
+    """
+    Read the lines of a gzipped segment past `offset`, where `offset` is
+    the uncompressed position reached while the segment was still plain.
+    """
+    with open_segment(path) as f:
+        f.seek(offset)
+        data: bytes = f.read()
+    complete: int = data.rfind(b"\n") + 1
+    lines: List[bytes] = [line for line in data[:complete].splitlines() if line.strip()]
+    return offset + complete, lines
+
+
+class SessionIndex:
+    """ Connection to the session index database. """
+
+    def __init__(self, db_path: Optional[PathLike] = None, timeout: float = 5.0):
+        self.path: Path = Path(db_path) if db_path is not None else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # autocommit mode; transactions are opened explicitly
+        self.conn: sqlite3.Connection = sqlite3.connect(
+            str(self.path), timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        # the log segment an event came from; not recorded before this column
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(events)")}
+        if "source" not in columns:
+            self.conn.execute("ALTER TABLE events ADD COLUMN source TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS events_source ON events(source)")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SessionIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ingestion
+
+    def _source_state(self, key: str) -> Tuple[int, int, int]:
+        row = self.conn.execute(
+            "SELECT inode, offset, lines FROM sources WHERE path = ?", (key,)).fetchone()
+        return (row["inode"], row["offset"], row["lines"]) if row else (0, 0, 0)
+
+    def _save_source(self, key: str, inode: int, offset: int, lines: int) -> None:
+        self.conn.execute(
+            "INSERT INTO sources (path, inode, offset, lines) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET inode = excluded.inode, "
+            "offset = excluded.offset, lines = excluded.lines",
+            (key, inode, offset, lines))
+
+    def _touch_sessions(self, seen: Dict[str, Dict[str, Any]]) -> None:
+        for session_id, info in seen.items():
+            if not session_id:
+                continue
+            self.conn.execute(
+                "INSERT INTO sessions (session_id, cwd, transcript_path, first_seen, last_seen, event_count) "
+                "VALUES (:session_id, :cwd, :transcript_path, :first, :last, :count) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                "cwd = COALESCE(excluded.cwd, cwd), "
+                "transcript_path = COALESCE(excluded.transcript_path, transcript_path), "
+                "first_seen = MIN(first_seen, excluded.first_seen), "
+                "last_seen = MAX(last_seen, excluded.last_seen), "
+                "event_count = event_count + excluded.event_count",
+                {"session_id": session_id, **info})
+
+    def _forget_source(self, key: str) -> None:
+        """ Drop the events ingested from one log segment, and their counts. """
+        for row in self.conn.execute(
+                "SELECT session_id, COUNT(*) AS n FROM events WHERE source = ? GROUP BY session_id",
+                (key,)).fetchall():
+            self.conn.execute(
+                "UPDATE sessions SET event_count = MAX(event_count - ?, 0) WHERE session_id = ?",
+                (row["n"], row["session_id"]))
+        self.conn.execute("DELETE FROM events WHERE source = ?", (key,))
+
+    def ingest_log(self, hook: str, path: PathLike) -> int:
+        """
+        Ingest the events appended to one hook log segment since the last
+        call. A segment keeps its progress when it is gzipped; once a
+        compressed segment has been read to the end it is never opened
+        again. A segment that was replaced or truncated is ingested again
+        from the start, in place of the events read from it before.
+        """
+        log_path: Path = Path(path)
+        if not log_path.exists():
+            return 0
+        log_path = log_path.resolve()
+        sealed: bool = log_path.name.endswith(GZIP_SUFFIX)
+        key: str = str(log_path)[:-len(GZIP_SUFFIX)] if sealed else str(log_path)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            inode, offset, count = self._source_state(key)
+            if offset < 0:
+                self.conn.execute("COMMIT")
+                return 0
+            if sealed:
+                offset, lines = _read_sealed_lines(log_path, offset)
+            else:
+                inode, offset, lines, reset = _read_new_lines(log_path, inode, offset)
+                if reset:
+                    self._forget_source(key)
+                    count = 0
+            rows: List[Tuple[Any, ...]] = []
+            seen: Dict[str, Dict[str, Any]] = {}
+            now: float = time.time()
+            for line in lines:
+                try:
+                    event: Any = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if not isinstance(event, dict):
+                    continue
+                session_id: str = str(event.get("session_id") or "")
+                try:
+                    ts: float = float(event.get("logged_at") or now)
+                except (TypeError, ValueError, OverflowError):
+                    ts = now  # hand edited or legacy line
+                rows.append((session_id, hook, event.get("tool_name"), ts,
+                             line.decode("utf-8", "replace"), key))
+                info = seen.setdefault(session_id, {
+                    "cwd": None, "transcript_path": None,
+                    "first": ts, "last": ts, "count": 0})
+                info["cwd"] = event.get("cwd") or info["cwd"]
+                info["transcript_path"] = event.get("transcript_path") or info["transcript_path"]
+                info["first"] = min(info["first"], ts)
+                info["last"] = max(info["last"], ts)
+                info["count"] += 1
+            self.conn.executemany(
+                "INSERT INTO events (session_id, hook, tool_name, ts, payload, source) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows)
+            self._touch_sessions(seen)
+            self._save_source(key, inode, -1 if sealed else offset, count + len(rows))
+            self.conn.execute("COMMIT")
+            return len(rows)
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def ingest_log_dir(self, log_dir: Optional[PathLike] = None) -> int:
+        """ Ingest every hook log in a project's log directory. """
+        base: Path = Path(log_dir) if log_dir is not None else default_log_dir()
+        total: int = 0
+        for hook in HOOK_LOGS:
+            for segment in list_segments(hook, base):
+                total += self.ingest_log(hook, segment)
+        return total
+
+    def ingest_transcript(self, session_id: str, transcript_path: PathLike) -> int:
+        """ Ingest the transcript lines appended since the last call. """
+        path: Path = Path(transcript_path)
+        if not path.exists():
+            return 0
+        key: str = f"transcript:{session_id}"
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            inode, offset, count = self._source_state(key)
+            inode, offset, lines, reset = _read_new_lines(path, inode, offset)
+            if reset:
+                self.conn.execute("DELETE FROM transcript WHERE session_id = ?", (session_id,))
+                count = 0
+            rows: List[Tuple[Any, ...]] = []
+            for line in lines:
+                try:
+                    entry: Any = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if not isinstance(entry, dict):
+                    entry = {}
+                rows.append((session_id, count + len(rows), entry.get("type"),
+                             entry.get("timestamp"), line.decode("utf-8", "replace")))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO transcript (session_id, line_no, type, ts, payload) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            self._save_source(key, inode, offset, count + len(rows))
+            self.conn.execute("COMMIT")
+            return len(rows)
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def ingest_transcripts(self, session_id: Optional[str] = None) -> int:
+        """ Ingest the transcripts of every indexed session, or of one. """
+        total: int = 0
+        sql: str = "SELECT session_id, transcript_path FROM sessions WHERE transcript_path IS NOT NULL"
+        params: Tuple[str, ...] = ()
+        if session_id is not None:
+            sql += " AND session_id = ?"
+            params = (session_id,)
+        rows = self.conn.execute(sql, params).fetchall()
+        for row in rows:
+            total += self.ingest_transcript(row["session_id"], row["transcript_path"])
+        return total
+
+    # queries
+
+    def list_sessions(
+            self,
+            limit: int = 20,
+            since: Optional[float] = None,
+            cwd: Optional[str] = None,
+            tool_name: Optional[str] = None,
+    ) -> List[sqlite3.Row]:
+        """ Most recently active sessions first. """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if since is not None:
+            clauses.append("s.last_seen >= ?")
+            params.append(since)
+        if cwd is not None:
+            clauses.append("s.cwd = ?")
+            params.append(cwd)
+        if tool_name is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM events e WHERE e.session_id = s.session_id AND e.tool_name = ?)")
+            params.append(tool_name)
+        where: str = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        return self.conn.execute(
+            f"SELECT s.* FROM sessions s {where} ORDER BY s.last_seen DESC LIMIT ?",
+            params).fetchall()
+
+    def resolve_session(self, prefix: str) -> Optional[str]:
+        """ Expand a unique session id prefix to the full id. """
+        rows = self.conn.execute(
+            "SELECT session_id FROM sessions WHERE session_id >= ? AND session_id < ? LIMIT 2",
+            (prefix, prefix + "\U0010ffff")).fetchall()
+        return rows[0]["session_id"] if len(rows) == 1 else None
+
+    def get_events(
+            self,
+            session_id: str,
+            hook: Optional[str] = None,
+            tool_name: Optional[str] = None,
+            limit: Optional[int] = None,
+    ) -> List[sqlite3.Row]:
+        """ A session's events in the order they were logged. """
+        sql: str = "SELECT * FROM events WHERE session_id = ?"
+        params: List[Any] = [session_id]
+        if hook is not None:
+            sql += " AND hook = ?"
+            params.append(hook)
+        if tool_name is not None:
+            sql += " AND tool_name = ?"
+            params.append(tool_name)
+        sql += " ORDER BY ts, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def _event_filter(
+            self,
+            tool_name: Optional[str],
+            hook: Optional[str],
+            since: Optional[float],
+            until: Optional[float],
+            cwd: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if tool_name is not None:
+            clauses.append("tool_name = ?")
+            params.append(tool_name)
+        if hook is not None:
+            clauses.append("hook = ?")
+            params.append(hook)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if cwd is not None:
+            clauses.append("session_id IN (SELECT session_id FROM sessions WHERE cwd = ?)")
+            params.append(cwd)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query_events(
+            self,
+            tool_name: Optional[str] = None,
+            hook: Optional[str] = None,
+            since: Optional[float] = None,
+            until: Optional[float] = None,
+            cwd: Optional[str] = None,
+            limit: Optional[int] = None,
+    ) -> List[sqlite3.Row]:
+        """
+        Events of every session and project, newest first. Filtering on a
+        tool and a time range is answered from the (tool_name, ts) index.
+        """
+        where, params = self._event_filter(tool_name, hook, since, until, cwd)
+        sql: str = f"SELECT * FROM events {where} ORDER BY ts DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def count_events(
+            self,
+            tool_name: Optional[str] = None,
+            hook: Optional[str] = None,
+            since: Optional[float] = None,
+            until: Optional[float] = None,
+            cwd: Optional[str] = None,
+    ) -> int:
+        where, params = self._event_filter(tool_name, hook, since, until, cwd)
+        return int(self.conn.execute(f"SELECT COUNT(*) FROM events {where}", params).fetchone()[0])
+
+    def get_transcript(self, session_id: str, entry_type: Optional[str] = None) -> Iterator[sqlite3.Row]:
+        sql: str = "SELECT * FROM transcript WHERE session_id = ?"
+        params: List[Any] = [session_id]
+        if entry_type is not None:
+            sql += " AND type = ?"
+            params.append(entry_type)
+        return iter(self.conn.execute(sql + " ORDER BY line_no", params))
+
+
+def update_index(log_dir: Optional[PathLike] = None,
+                 sessions: Iterable[Tuple[str, str]] = (),
+                 db_path: Optional[PathLike] = None) -> int:
+    """
+    Catch the index up with a project's hook logs and the given
+    (session_id, transcript_path) pairs.
+    """
+    with SessionIndex(db_path) as index:
+        total: int = index.ingest_log_dir(log_dir)
+        for session_id, transcript_path in sessions:
+            total += index.ingest_transcript(session_id, transcript_path)
+        return total
@@ -0,0 +1,4 @@
+"""
+LLM providers behind one hedged, breaker-guarded client, and the prompts
+the announcements use.
+"""
@@ -0,0 +1,73 @@
+"""
+Prompts for LLM-written announcements, and cleanup of what comes back.
+"""
+
+import re
+from typing import List, Tuple
+
+_STYLE: str = '"Agent work complete!", "Job is all done!", "Agent Task finished!", "Your agent is ready for your next move!"'
+
+
+def _name_parts(engineer_name: str, share: str) -> Tuple[str, str]:
+    if not engineer_name:
+        return "", f"Examples of the style: {_STYLE} "
+    name_instruction: str = f"{share} include the engineer's name '{engineer_name}' in a natural way."
+    examples: str = f"""Examples of the style:
+- Standard: {_STYLE}
+- Personalized: "{engineer_name}, your agent is all set!", "Your agent is ready for you, {engineer_name}!", "Your agent work is complete, {engineer_name}!", "{engineer_name}, your agent is done!" """
+    return name_instruction, examples
+
+
+def completion_prompt(engineer_name: str = "") -> str:
+    """ Ask for one completion message. """
+    name_instruction, examples = _name_parts(engineer_name, "Sometimes (about 30% of the time)")
+    return f"""Generate a short, friendly completion message for when an AI coding assistant finishes a task.
+
+Requirements:
+- Keep it under 15 words
+- Make it positive or humorous or jestful and future focused
+- Use natural, conversational language
+- Focus on completion/readiness
+- Do NOT include quotes, formatting, or explanations
+- Return ONLY the completion message text
+{name_instruction}
+
+{examples}
+
+Generate ONE completion message:"""
+
+
+def completion_batch_prompt(count: int, engineer_name: str = "") -> str:
+    """ Ask for `count` varied completion messages, one per line. """
+    name_instruction, examples = _name_parts(engineer_name, "About 30% of them should")
+    return f"""Generate {count} short, friendly completion messages for when an AI coding assistant finishes a task.
+
+Requirements:
+- Keep each one under 15 words
+- Make them positive or humorous or jestful and future focused, and different from each other
+- Use natural, conversational language
+- Focus on completion/readiness
+- Do NOT include quotes, numbering, bullets, formatting, or explanations
+- Return ONLY the messages, one per line
+{name_instruction}
+
+{examples}
+
+Generate {count} completion messages:"""
+
+
+def _clean(line: str) -> str:
+    # drop list markers the model adds despite being asked not to
+    line = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line)
+    return line.strip().strip('"').strip("'").strip()
+
+
+def first_line(response: str) -> str:
+    """ A single message: the first line, unquoted. """
+    lines: List[str] = parse_lines(response)
+    return lines[0] if lines else ""
+
+
+def parse_lines(response: str) -> List[str]:
+    """ One message per non-empty line, without list markers or quotes. """
+    return [line for line in (_clean(raw) for raw in response.splitlines()) if line]
@@ -0,0 +1,427 @@
+"""
+One client for every LLM the hooks talk to.
+
+Providers speak their HTTP APIs with the stdlib and keep their HTTPS
+connections open between requests, so a long-lived process (the hook
+daemon, the announce worker) pays for the TLS handshake once. A circuit
+breaker takes a provider out of rotation for a cooldown after repeated
+failures.
+
+Each request is bounded by the call's deadline (`llm.timeout_s` unless
+given) and by the provider's own cap in `llm.provider_timeout_s`.
+`LLMClient.complete` sends the prompt to the first provider in
+`llm.order` that is available and whose breaker is closed. If no answer
+arrived after `hedge_after_ms`, the same prompt also goes to the next
+provider; a provider that fails hands over to the next one at once. The
+first answer wins, and the whole call never takes longer than its
+deadline, so tail latency is bounded by the settings rather than by the
+slowest API.
+
+Providers: "anthropic" (ANTHROPIC_API_KEY), "openai" (OPENAI_API_KEY)
+and "stub", which answers locally from canned lines for tests and
+offline use.
+
+Prompt from the command line with ``python -m utils.llm.providers``.
+"""
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
+
+from ..settings import load_settings
+
+DEFAULT_TIMEOUT: float = 10.0
+
+
+class ProviderError(Exception):
+    """ A provider failed to answer; the client moves on to the next one. """
+
+
+@dataclass
+class LLMRules:
+    """ Ordering, deadlines, hedging and breaker settings from `llm`. """
+
+    order: List[str]
+    timeout: float = DEFAULT_TIMEOUT
+    hedge_after: float = 1.5
+    breaker_failures: int = 3
+    breaker_cooldown: float = 60.0
+    # per provider caps on a single request, within the overall deadline
+    provider_timeouts: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls) -> "LLMRules":
+        rules: Dict[str, Any] = load_settings()["llm"]
+        return cls(
+            order=list(rules.get("order", ["anthropic", "openai"])),
+            timeout=float(rules.get("timeout_s", DEFAULT_TIMEOUT)),
+            hedge_after=float(rules.get("hedge_after_ms", 1500)) / 1000,
+            breaker_failures=int(rules.get("breaker_failures", 3)),
+            breaker_cooldown=float(rules.get("breaker_cooldown_s", 60)),
+            provider_timeouts={name: float(seconds)
+                               for name, seconds in rules.get("provider_timeout_s", {}).items()},
+        )
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failures and stays open for
+    `cooldown` seconds; then lets one trial request through (half open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(self, failures: int = 3, cooldown: float = 60.0):
+        self.failures: int = failures
+        self.cooldown: float = cooldown
+        self.consecutive: int = 0
+        self.opened_at: Optional[float] = None
+        self._trial: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state: str = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._trial = False
+            if ok:
+                self.consecutive, self.opened_at = 0, None
+                return
+            self.consecutive += 1
+            if self.opened_at is not None or self.consecutive >= self.failures:
+                self.opened_at = time.monotonic()
+
+
+class Provider:
+    """ Base class: a named LLM behind a `complete(prompt, ...)` call. """
+
+    name: str = "provider"
+
+    def available(self) -> bool:
+        return True
+
+    def complete(self, prompt: str, max_tokens: int = 100, temperature: float = 0.7,
+                 timeout: float = DEFAULT_TIMEOUT) -> str:
+        raise NotImplementedError
+
+
+# how a kept-alive connection the server has since closed fails on reuse
+STALE_CONNECTION_ERRORS: Tuple[Type[BaseException], ...] = (
+    http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class HTTPProvider(Provider):
+    """ JSON over a pool of kept-alive HTTPS connections to one host. """
+
+    host: str = ""
+    path: str = ""
+    key_env: str = ""
+    connection_class: Callable[..., http.client.HTTPConnection] = http.client.HTTPSConnection
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+        self.api_key: str = api_key or os.getenv(self.key_env, "")
+        self.model: Optional[str] = model
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def headers(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def parse(self, payload: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def _post(self, body: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        with self._lock:
+            idle: Optional[http.client.HTTPConnection] = self._idle.pop() if self._idle else None
+        try:
+            if idle is not None:
+                try:
+                    return self._send(idle, body, timeout)
+                except STALE_CONNECTION_ERRORS:
+                    # the server closed the kept-alive connection while it
+                    # sat idle; not the provider's fault, so it is retried
+                    # once on a fresh connection and never reaches the breaker
+                    pass
+            return self._send(self.connection_class(self.host, timeout=timeout), body, timeout)
+        except (OSError, http.client.HTTPException) as e:
+            raise ProviderError(f"{self.name}: {e}") from e
+
+    def _send(self, conn: http.client.HTTPConnection, body: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """ One request on `conn`, which goes back to the pool unless it failed. """
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request("POST", self.path, body=json.dumps(body),
+                         headers={"Content-Type": "application/json", **self.headers()})
+            response: http.client.HTTPResponse = conn.getresponse()
+            data: bytes = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        with self._lock:
+            self._idle.append(conn)
+        if response.status != 200:
+            raise ProviderError(f"{self.name}: HTTP {response.status}: {data[:200]!r}")
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise ProviderError(f"{self.name}: invalid JSON response") from e
+
+    def complete(self, prompt: str, max_tokens: int = 100, temperature: float = 0.7,
+                 timeout: float = DEFAULT_TIMEOUT) -> str:
+        payload: Dict[str, Any] = self._post(self.body(prompt, max_tokens, temperature), timeout)
+        try:
+            return self.parse(payload).strip()
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            raise ProviderError(f"{self.name}: unexpected response shape") from e
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+
+
+class AnthropicProvider(HTTPProvider):
+    name: str = "anthropic"
+    host: str = "api.anthropic.com"
+    path: str = "/v1/messages"
+    key_env: str = "ANTHROPIC_API_KEY"
+
+    def headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": "2023-06-01"}
+
+    def body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {
+            "model": self.model or "claude-3-5-haiku-20241022",
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    def parse(self, payload: Dict[str, Any]) -> str:
+        return payload["content"][0]["text"]
+
+
+class OpenAIProvider(HTTPProvider):
+    name: str = "openai"
+    host: str = "api.openai.com"
+    path: str = "/v1/chat/completions"
+    key_env: str = "OPENAI_API_KEY"
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {
+            "model": self.model or "gpt-4.1-nano",
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    def parse(self, payload: Dict[str, Any]) -> str:
+        return payload["choices"][0]["message"]["content"]
+
+
+class StubProvider(Provider):
+    """
+    Answers locally: with `reply` (a string, or a function of the prompt)
+    after `delay` seconds, or raises when `fail` is set. Without a reply
+    it returns one canned completion message per line asked for.
+    """
+
+    name: str = "stub"
+
+    def __init__(self, reply: Union[str, Callable[[str], str], None] = None, delay: float = 0.0,
+                 fail: bool = False, name: Optional[str] = None):
+        self.reply = reply
+        self.delay: float = delay
+        self.fail: bool = fail
+        self.calls: int = 0
+        if name:
+            self.name = name
+
+    def complete(self, prompt: str, max_tokens: int = 100, temperature: float = 0.7,
+                 timeout: float = DEFAULT_TIMEOUT) -> str:
+        self.calls += 1
+        if self.delay:
+            time.sleep(min(self.delay, timeout))
+            if self.delay > timeout:
+                raise ProviderError(f"{self.name}: timed out")
+        if self.fail:
+            raise ProviderError(f"{self.name}: failed")
+        if callable(self.reply):
+            return self.reply(prompt)
+        if self.reply is not None:
+            return self.reply
+        from ..tts.phrases import COMPLETION_MESSAGES
+        return "\n".join(COMPLETION_MESSAGES)
+
+
+PROVIDERS: Dict[str, Callable[[], Provider]] = {
+    "anthropic": lambda: AnthropicProvider(model=load_settings()["llm"].get("anthropic_model")),
+    "openai": lambda: OpenAIProvider(model=load_settings()["llm"].get("openai_model")),
+    "stub": StubProvider,
+}
+
+
+class LLMClient:
+    """ Hedged, breaker-guarded completion over an ordered list of providers. """
+
+    def __init__(self, providers: Optional[List[Provider]] = None, rules: Optional[LLMRules] = None):
+        self.rules: LLMRules = rules or LLMRules.from_settings()
+        if providers is None:
+            providers = [PROVIDERS[name]() for name in self.rules.order if name in PROVIDERS]
+        self.providers: List[Provider] = providers
+        self.breakers: Dict[str, CircuitBreaker] = {
+            p.name: CircuitBreaker(self.rules.breaker_failures, self.rules.breaker_cooldown)
+            for p in providers}
+        # requests abandoned at the deadline finish in the background; the
+        # pool is sized so they never hold up a later call
+        self._pool: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max(2, 2 * len(providers)), thread_name_prefix="llm")
+
+    def candidates(self) -> List[Provider]:
+        return [p for p in self.providers if p.available() and self.breakers[p.name].state != "open"]
+
+    def _call(self, provider: Provider, prompt: str, max_tokens: int, temperature: float,
+              timeout: float) -> str:
+        try:
+            text: str = provider.complete(prompt, max_tokens=max_tokens, temperature=temperature,
+                                          timeout=timeout)
+        except Exception:
+            self.breakers[provider.name].record(False)
+            raise
+        self.breakers[provider.name].record(True)
+        if not text:
+            raise ProviderError(f"{provider.name}: empty response")
+        return text
+
+    def complete(self, prompt: str, max_tokens: int = 100, temperature: float = 0.7,
+                 deadline: Optional[float] = None, hedge: bool = True) -> Optional[str]:
+        """
+        The first answer to `prompt`, or None when every provider failed or
+        `deadline` (seconds, default `llm.timeout_s`) passed. Without
+        `hedge`, the next provider is only asked once the current one failed.
+        """
+        budget: float = deadline if deadline is not None else self.rules.timeout
+        end: float = time.monotonic() + budget
+        queue: List[Provider] = self.candidates()
+        futures: List[Future] = []
+
+        def launch() -> bool:
+            while queue:
+                provider: Provider = queue.pop(0)
+                if not self.breakers[provider.name].allow():
+                    continue
+                remaining: float = max(end - time.monotonic(), 0.001)
+                cap: float = self.rules.provider_timeouts.get(provider.name, remaining)
+                futures.append(self._pool.submit(self._call, provider, prompt, max_tokens,
+                                                 temperature, min(remaining, cap)))
+                return True
+            return False
+
+        if not launch():
+            return None
+        hedge_at: float = time.monotonic() + self.rules.hedge_after
+        handled: Set[Future] = set()
+        while True:
+            for future in list(futures):
+                if future.done() and future not in handled:
+                    handled.add(future)
+                    if future.exception() is None:
+                        return future.result()
+                    # a failed provider hands over to the next one at once
+                    launch()
+            pending: List[Future] = [f for f in futures if not f.done()]
+            if not pending:
+                if len(handled) == len(futures):
+                    return None
+                continue
+            now: float = time.monotonic()
+            if now >= end:
+                return None
+            if hedge and queue and now >= hedge_at:
+                # slow answer: ask the next provider too, keep the first reply
+                launch()
+                hedge_at = now + self.rules.hedge_after
+                continue
+            wake: float = min(end, hedge_at) if hedge and queue else end
+            wait(pending, timeout=wake - now, return_when=FIRST_COMPLETED)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+        for provider in self.providers:
+            if isinstance(provider, HTTPProvider):
+                provider.close()
+
+
+def llm_available() -> bool:
+    """ Whether any provider in `llm.order` can run here. """
+    return any(PROVIDERS[name]().available() for name in LLMRules.from_settings().order if name in PROVIDERS)
+
+
+_client: Optional[LLMClient] = None
+_client_lock: threading.Lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """ The process wide client, so connections and breakers are shared. """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
+
+
+def _main(argv: List[str]) -> None:
+    from .prompts import completion_batch_prompt, completion_prompt, first_line, parse_lines
+    from ..tts.phrases import engineer_name
+
+    client: LLMClient = get_client()
+    if argv[:1] == ["--completions"]:
+        count: int = int(argv[1]) if len(argv) > 1 else 40
+        text: Optional[str] = client.complete(completion_batch_prompt(count, engineer_name()),
+                                              max_tokens=max(100, count * 30), deadline=60, hedge=False)
+        print("\n".join(parse_lines(text or "")))
+    elif argv[:1] == ["--completion"]:
+        print(first_line(client.complete(completion_prompt(engineer_name())) or "")
+              or "The agents work is complete")
+    elif argv:
+        print(client.complete(" ".join(argv)) or "")
+    else:
+        print("Usage: python -m utils.llm.providers 'your prompt here', --completion or --completions N",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
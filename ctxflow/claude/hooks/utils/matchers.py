@@ -0,0 +1,135 @@
+"""
+Tool matchers for the PreToolUse/PostToolUse entries in `.claude/settings.json`.
+
+Claude Code starts a hook command for every tool call its matcher
+accepts, and `"matcher": ""` accepts all of them. A hook script says which
+tools it actually needs with a module level literal:
+
+    HOOK_TOOLS = ("Read", "Edit", "MultiEdit", "Write", "Bash")
+
+`apply_matchers` reads that declaration from the script (statically, the
+script is not imported) and sets the matcher of every entry that runs it,
+so tool calls no hook cares about start no process at all. A script
+without `HOOK_TOOLS` keeps matching every tool.
+
+`hooks.audit` in the settings widens this for auditing:
+
+- "off" (default): only the declared tools reach the hooks.
+- "sampled": every tool call reaches the hooks; calls outside a hook's
+  tools are logged with probability `hooks.audit_sample` and otherwise
+  dropped right after parsing.
+- "full": every tool call reaches the hooks and is logged.
+"""
+
+import json
+import os
+import random
+import re
+from pathlib import Path
+from typing import Any, Collection, Dict, Optional, Tuple
+
+from .settings import load_settings
+
+ALL_TOOLS: str = ""
+AUDIT_MODES: Tuple[str, ...] = ("off", "sampled", "full")
+# events whose entries take a tool matcher
+TOOL_EVENTS: Tuple[str, ...] = ("PreToolUse", "PostToolUse")
+# `hook_client.py <hook>` or `<hook>.py`, with or without a warmed interpreter
+_HOOK_RE = re.compile(r"hook_client\.py\s+(?P<client>\w+)|(?P<script>\w+)\.py\b")
+
+
+def audit_mode() -> str:
+    mode: str = str(load_settings()["hooks"].get("audit", "off"))
+    return mode if mode in AUDIT_MODES else "off"
+
+
+def should_audit(tool_name: str, tools: Optional[Collection[str]]) -> bool:
+    """
+    Whether a hook that declared `tools` handles a call to `tool_name`.
+    Calls outside the declaration only get here through an audit matcher,
+    and are sampled according to the audit mode.
+    """
+    if tools is None or tool_name in tools:
+        return True
+    mode: str = audit_mode()
+    if mode == "full":
+        return True
+    if mode == "sampled":
+        return random.random() < float(load_settings()["hooks"].get("audit_sample", 0.0))
+    return False
+
+
+def hook_tools(script: Path) -> Optional[Tuple[str, ...]]:
+    """ The `HOOK_TOOLS` a hook script declares; None for all tools. """
+    import ast
+
+    try:
+        tree: ast.Module = ast.parse(script.read_text())
+    except (OSError, SyntaxError):
+        return None
+    for node in tree.body:
+        target: Optional[ast.expr] = None
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            target = node.target
+        if isinstance(target, ast.Name) and target.id == "HOOK_TOOLS":
+            try:
+                tools: Any = ast.literal_eval(node.value)  # type: ignore[arg-type]
+            except ValueError:
+                return None
+            return tuple(str(tool) for tool in tools) if tools is not None else None
+    return None
+
+
+def matcher(tools: Optional[Collection[str]]) -> str:
+    """ A settings.json matcher accepting exactly `tools`. """
+    return "|".join(tools) if tools else ALL_TOOLS
+
+
+def hook_script(command: str, hooks_dir: Path) -> Optional[Path]:
+    """ The hook script a settings.json command ends up running, if any. """
+    for match in _HOOK_RE.finditer(command):
+        name: str = match.group("client") or match.group("script")
+        if name != "hook_client":
+            return hooks_dir / f"{name}.py"
+    return None
+
+
+def apply_matchers(settings: Dict[str, Any], hooks_dir: Path, audit: Optional[str] = None) -> int:
+    """
+    Set the matcher of every tool hook entry from its script's
+    declaration, or to all tools when auditing; returns how many changed.
+    """
+    audit = audit or audit_mode()
+    changed: int = 0
+    for event in TOOL_EVENTS:
+        for group in settings.get("hooks", {}).get(event, []):
+            tools: Optional[Tuple[str, ...]] = None
+            for hook in group.get("hooks", []):
+                script: Optional[Path] = hook_script(str(hook.get("command", "")), hooks_dir)
+                declared: Optional[Tuple[str, ...]] = hook_tools(script) if script else None
+                if declared is None:
+                    tools = None
+                    break
+                tools = tuple(dict.fromkeys((tools or ()) + declared))
+            wanted: str = ALL_TOOLS if audit != "off" else matcher(tools)
+            if group.get("matcher") != wanted:
+                group["matcher"] = wanted
+                changed += 1
+    return changed
+
+
+def write_matchers(project_dir: Path, audit: Optional[str] = None) -> int:
+    """ Apply the matchers to a project's `.claude/settings.json` in place. """
+    path: Path = project_dir / ".claude" / "settings.json"
+    with open(path, "r") as f:
+        settings: Dict[str, Any] = json.load(f)
+    changed: int = apply_matchers(settings, project_dir / ".claude" / "hooks", audit)
+    if changed:
+        tmp: Path = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(settings, f, indent=4)
+            f.write("\n")
+        os.replace(tmp, path)
+    return changed
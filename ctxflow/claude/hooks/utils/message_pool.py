@@ -0,0 +1,173 @@
+"""
+A pool of LLM-written completion messages, served from disk.
+
+Asking an LLM for a fresh sentence whenever Claude stops puts a network
+round trip in front of the announcement and costs one request per
+message. Instead one request asks for a whole batch of messages, which
+are kept in `~/.ctxflow/messages/completion.json`; taking one is a read
+and a rewrite of that file under an flock. When fewer than `low_water`
+messages are left, a detached refill is started, so the pool is topped up
+before it runs dry and no announcement ever waits on the LLM.
+
+Messages are written for the current `ENGINEER_NAME`; a pool written for
+another name is discarded.
+
+Refill the pool in the foreground with ``python -m utils.message_pool refill``.
+"""
+
+import fcntl
+import json
+import os
+import random
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+from .detach import spawn_module
+from .settings import load_settings
+from .tts.phrases import engineer_name
+
+# a batch of dozens of messages takes far longer than a single line
+BATCH_DEADLINE: float = 60.0
+# longer messages are dropped; the prompt asks for fewer than 15 words
+MAX_WORDS: int = 20
+
+Pool = Dict[str, Any]
+
+
+def pool_dir() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "messages"
+
+
+def pool_path() -> Path:
+    return pool_dir() / "completion.json"
+
+
+def _rules() -> Dict[str, Any]:
+    rules: Dict[str, Any] = load_settings()["announce"]
+    return {
+        "batch": int(rules.get("pool_batch", 40)),
+        "low_water": int(rules.get("pool_low_water", 10)),
+    }
+
+
+@contextmanager
+def _locked(name: str, blocking: bool = True) -> Iterator[Optional[TextIO]]:
+    """ Hold `<pool dir>/<name>`; yields None if non-blocking and taken. """
+    pool_dir().mkdir(parents=True, exist_ok=True)
+    with open(pool_dir() / name, "a") as lock:
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield None
+            return
+        yield lock
+
+
+def load_pool(name: Optional[str] = None) -> Pool:
+    """ The pool for `name` (default: the current engineer's); empty if unset. """
+    wanted: str = engineer_name() if name is None else name
+    try:
+        with open(pool_path(), "r") as f:
+            pool: Any = json.load(f)
+    except (OSError, ValueError):
+        pool = None
+    if not isinstance(pool, dict) or pool.get("name", "") != wanted \
+            or not isinstance(pool.get("messages"), list):
+        return {"name": wanted, "messages": []}
+    return pool
+
+
+def _save_pool(pool: Pool) -> None:
+    tmp: Path = pool_path().with_name(f".{pool_path().name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(pool, f)
+    os.replace(tmp, pool_path())
+
+
+def request_refill() -> None:
+    """ Start a background refill unless one is running or no LLM is configured. """
+    from .llm.providers import llm_available
+
+    if not llm_available():
+        return
+    with _locked("refill.lock", blocking=False) as lock:
+        if lock is None:
+            return
+    spawn_module("message_pool", "refill")
+
+
+def take_message() -> Optional[str]:
+    """
+    Remove and return a random pooled message, or None when the pool is
+    empty. Starts a refill when the pool runs low.
+    """
+    with _locked("pool.lock"):
+        pool: Pool = load_pool()
+        messages: List[str] = pool["messages"]
+        message: Optional[str] = messages.pop(random.randrange(len(messages))) if messages else None
+        if message is not None:
+            _save_pool(pool)
+        remaining: int = len(messages)
+    if remaining < _rules()["low_water"]:
+        request_refill()
+    return message
+
+
+def add_messages(messages: List[str], name: Optional[str] = None) -> int:
+    """ Add new, reasonably short messages to the pool; returns how many. """
+    with _locked("pool.lock"):
+        pool: Pool = load_pool(name)
+        seen = {m.lower() for m in pool["messages"]}
+        added: int = 0
+        for message in messages:
+            message = message.strip()
+            if not message or len(message.split()) > MAX_WORDS or message.lower() in seen:
+                continue
+            pool["messages"].append(message)
+            seen.add(message.lower())
+            added += 1
+        if added:
+            _save_pool(pool)
+    return added
+
+
+def generate_batch(count: int) -> List[str]:
+    """ One LLM request for `count` messages. """
+    # imported here: the provider layer loads http.client and ssl, which
+    # hooks that only queue an announcement should not pay for
+    from .llm.prompts import completion_batch_prompt, parse_lines
+    from .llm.providers import get_client
+
+    response: Optional[str] = get_client().complete(
+        completion_batch_prompt(count, engineer_name()),
+        max_tokens=max(100, count * 30),
+        deadline=BATCH_DEADLINE,
+        # nobody is waiting on a refill; don't pay for the batch twice
+        hedge=False,
+    )
+    return parse_lines(response or "")
+
+
+def refill(generate: Callable[[int], List[str]] = generate_batch, force: bool = False) -> int:
+    """
+    Top the pool up with one batch unless it is above the low water mark
+    (or `force`); returns how many messages were added. Only one refill
+    runs at a time.
+    """
+    rules: Dict[str, Any] = _rules()
+    with _locked("refill.lock", blocking=False) as lock:
+        if lock is None:
+            return 0
+        name: str = engineer_name()
+        if not force and len(load_pool(name)["messages"]) >= rules["low_water"]:
+            return 0
+        return add_messages(generate(rules["batch"]), name)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["refill"]:
+        print(f"{refill(force='--force' in sys.argv)} messages added")
+    else:
+        print(__doc__)
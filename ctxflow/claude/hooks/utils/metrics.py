@@ -0,0 +1,181 @@
+"""
+Per-phase latency metrics for the Claude hooks.
+
+Every hook run is wrapped in a `HookTimer`; the code inside marks its
+phases (stdin parse, policy check, log write, LLM/TTS dispatch, ...) with
+`phase("name")`. Timings come from the monotonic ``perf_counter_ns`` clock
+and are written as one JSONL record per run to
+`~/.ctxflow/metrics/hooks.jsonl`, with the same single ``O_APPEND`` write
+and segment rotation as the hook event logs, so recording them costs a
+few microseconds.
+
+A hook script passes `utils.STARTED_NS` as `started_ns`, so its total
+also covers loading the shared code, recorded as the "import" phase.
+
+`phase` is a no-op outside of a timer, so hook functions can be called
+from tests or other tools without recording anything. The active timer
+is thread local because the hook daemon serves requests on threads.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .eventlog import EventLog, RotationPolicy, iter_hook_events
+from .settings import load_settings
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+METRICS_LOG: str = "hooks"
+PERCENTILES: Tuple[int, ...] = (50, 95, 99)
+
+_active: threading.local = threading.local()
+_sink: Optional[EventLog] = None
+_sink_lock: threading.Lock = threading.Lock()
+
+
+def metrics_dir() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "metrics"
+
+
+def _get_sink() -> EventLog:
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = EventLog(metrics_dir() / f"{METRICS_LOG}.jsonl", RotationPolicy.from_settings())
+    return _sink
+
+
+class HookTimer:
+    """
+    Times one hook run and its phases.
+
+    Used as a context manager around a hook's body; on exit the total and
+    per-phase durations (milliseconds) are recorded together with the exit
+    code, taken from ``SystemExit`` when the hook exits through it. With
+    `started_ns`, the total counts from then and the time up to entering
+    the timer is the "import" phase.
+    """
+
+    def __init__(self, hook: str, via: str = "process", sink: Optional[EventLog] = None,
+                 started_ns: Optional[int] = None):
+        self.hook: str = hook
+        self.via: str = via
+        self.sink: Optional[EventLog] = sink
+        self.phases: Dict[str, float] = {}
+        self.code: Optional[int] = None
+        self._start: int = 0
+        self._started_ns: Optional[int] = started_ns
+        self._previous: Optional["HookTimer"] = None
+
+    def __enter__(self) -> "HookTimer":
+        self._previous = getattr(_active, "timer", None)
+        _active.timer = self
+        self._start = time.perf_counter_ns()
+        if self._started_ns is not None:
+            # the run began before the hook's imports
+            self.add("import", (self._start - self._started_ns) / 1e6)
+            self._start = self._started_ns
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        total_ns: int = time.perf_counter_ns() - self._start
+        _active.timer = self._previous
+        if self.code is None:
+            if isinstance(exc, SystemExit):
+                self.code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+            else:
+                self.code = 0 if exc is None else 1
+        self.record(total_ns / 1e6)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+
+    def record(self, total_ms: float) -> None:
+        """ Write this run to the metrics sink; never raises. """
+        try:
+            if self.sink is None and not load_settings()["metrics"].get("enabled", True):
+                return
+            (self.sink or _get_sink()).append({
+                "hook": self.hook,
+                "via": self.via,
+                "ts": time.time(),
+                "code": self.code,
+                "total_ms": round(total_ms, 3),
+                "phases": {name: round(ms, 3) for name, ms in self.phases.items()},
+            })
+        except Exception:
+            pass
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """ Time a block as phase `name` of the active hook run, if any. """
+    timer: Optional[HookTimer] = getattr(_active, "timer", None)
+    if timer is None:
+        yield
+        return
+    start: int = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        timer.add(name, (time.perf_counter_ns() - start) / 1e6)
+
+
+def record_phase(name: str, elapsed_ms: float) -> None:
+    """ Add a duration measured elsewhere to the active hook run, if any. """
+    timer: Optional[HookTimer] = getattr(_active, "timer", None)
+    if timer is not None:
+        timer.add(name, elapsed_ms)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """ Linearly interpolated percentile of already sorted values. """
+    if not values:
+        return 0.0
+    rank: float = (len(values) - 1) * pct / 100
+    low: int = int(rank)
+    high: int = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def iter_records(since: Optional[float] = None, hook: Optional[str] = None,
+                 path: Optional[PathLike] = None) -> Iterator[Dict[str, Any]]:
+    """ Recorded runs, oldest first, across every metrics segment. """
+    for record in iter_hook_events(METRICS_LOG, Path(path) if path else metrics_dir()):
+        if not isinstance(record, dict):
+            continue
+        if since is not None and record.get("ts", 0) < since:
+            continue
+        if hook is not None and record.get("hook") != hook:
+            continue
+        yield record
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Percentiles per (hook, via) for the whole run (phase "total") and for
+    each phase, sorted by hook then by descending p95.
+    """
+    samples: Dict[Tuple[str, str, str], List[float]] = {}
+    for record in records:
+        key: Tuple[str, str] = (str(record.get("hook")), str(record.get("via", "process")))
+        samples.setdefault(key + ("total",), []).append(float(record.get("total_ms", 0)))
+        for name, ms in (record.get("phases") or {}).items():
+            samples.setdefault(key + (name,), []).append(float(ms))
+
+    rows: List[Dict[str, Any]] = []
+    for (hook, via, name), values in samples.items():
+        values.sort()
+        row: Dict[str, Any] = {"hook": hook, "via": via, "phase": name, "count": len(values)}
+        for pct in PERCENTILES:
+            row[f"p{pct}"] = round(percentile(values, pct), 3)
+        row["max"] = values[-1]
+        rows.append(row)
+    rows.sort(key=lambda r: (r["hook"], r["via"], r["phase"] != "total", -r["p95"]))
+    return rows
+
@@ -0,0 +1,499 @@
+"""
+Command policy engine for the pre tool use hook.
+
+Rules are declared in ``policy_rules.json`` next to the hooks and compiled
+once when the engine is built. A Bash command is tokenized a single time,
+split into simple commands on ``|``, ``||``, ``&&``, ``;``, ``&``, newlines,
+subshells and command substitutions, and every rule is evaluated against
+those tokens. Heredoc bodies are data, not commands, and are skipped with
+one ``str.find``-style search, so large heredocs cost next to nothing. A
+``#`` that starts a word comments out the rest of the line.
+
+Rule types:
+
+``path``
+    Blocks tools that touch a path whose name matches one of the ``match``
+    globs and none of the ``allow`` globs. File tools are checked on
+    ``tool_input["file_path"]``; Bash is checked on every word and
+    redirection target of every simple command.
+
+``command``
+    Blocks Bash when one of ``commands`` is invoked (directly or through a
+    wrapper such as ``sudo`` or ``xargs``) with any of ``flags``. Single
+    letters match bundled short options (``-rf``), entries starting with
+    ``--`` match long options.
+
+``deny``
+    Blocks every call to ``tools``.
+
+A wrapper is declared as the list of its options that take an argument,
+or as ``{"options": [...], "operands": n}`` when it also takes ``n``
+positional operands before the command it runs (``timeout 5 cmd``).
+Scripts handed to ``sh -c`` (and bash, zsh, dash, ksh, ``flock -c``), the
+arguments of ``eval`` and the commands after ``find -exec``/``-execdir``/
+``-ok``/``-okdir`` are parsed again and checked like the outer command.
+A Bash command that cannot be tokenized (an unterminated quote or
+command substitution) is blocked outright, since no rule can vouch for it.
+"""
+
+import fnmatch
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Pattern, Tuple, Union
+
+FILE_TOOLS: Tuple[str, ...] = ("Read", "Edit", "MultiEdit", "Write")
+UNPARSEABLE: str = "unparseable-command"
+UNPARSEABLE_MESSAGE: str = "BLOCKED: Command could not be parsed, so it cannot be checked against the policy"
+
+RULES_FILE: Path = Path(__file__).resolve().parent.parent / "policy_rules.json"
+# used only when the rules file cannot be loaded: block everything the
+# hook guards rather than let it through unchecked
+FALLBACK_POLICY: Dict[str, Any] = {
+    "rules": [
+        {
+            "id": "policy-unavailable",
+            "type": "deny",
+            "tools": [*FILE_TOOLS, "Bash"],
+            "message": "BLOCKED: The tool policy could not be loaded from policy_rules.json",
+        },
+    ],
+}
+
+_TOKEN: Pattern[str] = re.compile(
+    r"""
+    [ \t\r]*
+    (?:
+      (?P<ws>\\\n)
+    | (?P<nl>\n)
+    | (?P<heredoc><<-?[ \t]*(?:'(?P<hq1>[^'\n]*)'|"(?P<hq2>[^"\n]*)"|\\?(?P<hq3>[A-Za-z_][A-Za-z0-9_]*)))
+    | (?P<herestr><<<)
+    | (?P<op>&&|\|\||;;|\|&|\$\(|[|;&()`])
+    | (?P<redir>[0-9]*(?:>>|>&|<&|>\||<>|&>|>|<))
+    | (?P<comment>\#[^\n]*)
+    | (?P<word>(?:[^\s'"\\|;&()`<>]+|\\.|'[^']*'|"(?:[^"\\]+|\\.)*")+)
+    | (?P<other>.)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_UNQUOTE: Pattern[str] = re.compile(r"""'([^']*)'|"((?:[^"\\]+|\\.)*)"|\\(.)""", re.DOTALL)
+_ASSIGNMENT: Pattern[str] = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+# reserved words that can start a simple command without being the command
+_KEYWORDS: FrozenSet[str] = frozenset(
+    ("{", "}", "!", "if", "then", "else", "elif", "fi", "do", "done", "while", "until"))
+_heredoc_ends: Dict[str, Pattern[str]] = {}
+# commands whose arguments are themselves commands
+_SHELLS: FrozenSet[str] = frozenset(("sh", "bash", "zsh", "dash", "ksh"))
+_SHELL_OPTS_WITH_ARG: FrozenSet[str] = frozenset(("-o", "+o", "-O", "+O", "--rcfile", "--init-file"))
+_FIND_EXEC: FrozenSet[str] = frozenset(("-exec", "-execdir", "-ok", "-okdir"))
+MAX_NESTING: int = 8
+
+Wrappers = Dict[str, Tuple[FrozenSet[str], int]]
+
+
+class ParseError(ValueError):
+    """ A Bash command the policy engine cannot tokenize. """
+
+
+def _unquote(raw: str) -> str:
+    if "'" not in raw and '"' not in raw and "\\" not in raw:
+        return raw
+    return _UNQUOTE.sub(lambda m: m.group(1) or m.group(2) or m.group(3) or "", raw)
+
+
+def _skip_heredoc(command: str, pos: int, delimiter: str, strip_tabs: bool) -> int:
+    """
+    Return the index just past the heredoc's closing delimiter line, or
+    the end of the command when it is never closed. The body itself is
+    never tokenized; plain `str.find` hops from candidate to candidate.
+    """
+    end: int = len(command)
+    if strip_tabs:
+        pattern: Optional[Pattern[str]] = _heredoc_ends.get(delimiter)
+        if pattern is None:
+            pattern = re.compile(r"^\t*" + re.escape(delimiter) + r"[ \t]*$", re.MULTILINE)
+            _heredoc_ends[delimiter] = pattern
+        found = pattern.search(command, pos)
+        return found.end() if found else end
+
+    needle: str = "\n" + delimiter
+    at: int = pos - 1  # pos is just past the newline that opened the body
+    while True:
+        at = command.find(needle, at)
+        if at < 0:
+            return end
+        after: int = at + len(needle)
+        line_end: int = command.find("\n", after)
+        if line_end < 0:
+            line_end = end
+        if not command[after:line_end].strip(" \t"):
+            return line_end
+        at = after
+
+
+@dataclass
+class SimpleCommand:
+    """ One command of a pipeline/list: its words and redirection targets. """
+
+    words: List[str] = field(default_factory=list)
+    redirects: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.words or self.redirects)
+
+
+def split_commands(command: str) -> List[SimpleCommand]:
+    """
+    Tokenize a shell command once and split it into simple commands.
+    Runs in a single left to right pass; heredoc bodies are skipped.
+    """
+    commands: List[SimpleCommand] = []
+    current: SimpleCommand = SimpleCommand()
+    pending_heredocs: List[Tuple[str, bool]] = []
+    expect_redirect: bool = False
+    open_groups: int = 0  # unclosed `(` and `$(`
+    in_backticks: bool = False
+    pos: int = 0
+    end: int = len(command)
+
+    while pos < end:
+        m = _TOKEN.match(command, pos)
+        if m is None:  # only trailing whitespace left
+            break
+        pos = m.end()
+        kind: Optional[str] = m.lastgroup
+        if kind in ("hq1", "hq2", "hq3"):
+            kind = "heredoc"
+
+        if kind in ("ws", "comment"):  # line continuation, `# ...` up to the newline
+            continue
+        if kind == "word":
+            raw: str = m.group("word")
+            word: str = _unquote(raw)
+            if "$(" in raw or "`" in raw:
+                # command substitution inside a quoted word still runs
+                commands.extend(split_commands(word.replace("`", " ; ")))
+            if expect_redirect:
+                current.redirects.append(word)
+                expect_redirect = False
+            else:
+                current.words.append(word)
+            continue
+        if kind == "redir":
+            expect_redirect = True
+            continue
+        if kind == "herestr":
+            continue
+        if kind == "heredoc":
+            delimiter: str = m.group("hq1") or m.group("hq2") or m.group("hq3") or ""
+            pending_heredocs.append((delimiter, m.group("heredoc").startswith("<<-")))
+            continue
+
+        if kind == "other":
+            raise ParseError(f"cannot parse {command[pos - 1:pos + 19]!r}")
+        if kind == "op":
+            op: str = m.group("op")
+            if op in ("(", "$("):
+                open_groups += 1
+            elif op == ")":
+                open_groups = max(open_groups - 1, 0)  # `case` patterns close without opening
+            elif op == "`":
+                in_backticks = not in_backticks
+
+        # operators and newlines end the simple command
+        expect_redirect = False
+        if current:
+            commands.append(current)
+            current = SimpleCommand()
+        if kind == "nl" and pending_heredocs:
+            for delimiter, strip_tabs in pending_heredocs:
+                pos = _skip_heredoc(command, pos, delimiter, strip_tabs)
+            pending_heredocs = []
+
+    if open_groups or in_backticks:
+        raise ParseError("unterminated subshell or command substitution")
+    if current:
+        commands.append(current)
+    return commands
+
+
+def _invocations(words: List[str], wrappers: Wrappers) -> Iterator[Tuple[str, List[str]]]:
+    """ Yield (command name, args), looking through wrapper commands. """
+    i: int = 0
+    n: int = len(words)
+    while i < n:
+        while i < n and (words[i] in _KEYWORDS or _ASSIGNMENT.match(words[i])):
+            i += 1
+        if i >= n:
+            return
+        name: str = words[i].rsplit("/", 1)[-1]
+        yield name, words[i + 1:]
+        wrapper: Optional[Tuple[FrozenSet[str], int]] = wrappers.get(name)
+        if wrapper is None:
+            return
+        takes_arg, operands = wrapper
+        i += 1
+        while i < n and words[i].startswith("-"):
+            i += 2 if words[i] in takes_arg else 1
+        i += operands
+
+
+def _shell_script(args: List[str]) -> Optional[str]:
+    """ The script of `sh -c script`: the word after the options, when one of them is `-c`. """
+    has_c: bool = False
+    i: int = 0
+    n: int = len(args)
+    while i < n and args[i][:1] in ("-", "+") and len(args[i]) > 1:
+        arg: str = args[i]
+        i += 1
+        if arg == "--":
+            break
+        if arg in _SHELL_OPTS_WITH_ARG:
+            i += 1
+        elif not arg.startswith("--") and "c" in arg[1:]:
+            has_c = True
+    return args[i] if has_c and i < n else None
+
+
+def _option_value(args: List[str], names: Tuple[str, ...]) -> Optional[str]:
+    """ The argument of the first of `names` in `args` (`flock -c script`). """
+    for i, arg in enumerate(args[:-1]):
+        if arg in names:
+            return args[i + 1]
+    return None
+
+
+def _find_execs(args: List[str]) -> Iterator[List[str]]:
+    """ The commands `find` runs through `-exec`, `-execdir`, `-ok` and `-okdir`. """
+    i: int = 0
+    n: int = len(args)
+    while i < n:
+        if args[i] in _FIND_EXEC:
+            start: int = i + 1
+            i = start
+            while i < n and args[i] not in (";", "+"):
+                i += 1
+            yield args[start:i]
+        i += 1
+
+
+def expand_commands(commands: List[SimpleCommand], wrappers: Wrappers, depth: int = 0) -> List[SimpleCommand]:
+    """
+    The simple commands plus every command nested inside them: scripts
+    run by a shell's `-c` or `flock -c`, `eval` arguments and `find -exec`
+    commands, parsed again and expanded in turn.
+    """
+    expanded: List[SimpleCommand] = []
+    for cmd in commands:
+        expanded.append(cmd)
+        for name, args in _invocations(cmd.words, wrappers):
+            nested: List[SimpleCommand] = []
+            script: Optional[str] = None
+            if name in _SHELLS:
+                script = _shell_script(args)
+            elif name == "flock":
+                script = _option_value(args, ("-c", "--command"))
+            elif name == "eval":
+                script = " ".join(args)
+            elif name == "find":
+                nested = [SimpleCommand(words) for words in _find_execs(args) if words]
+            if script is not None:
+                nested = split_commands(script)
+            if nested:
+                if depth >= MAX_NESTING:
+                    raise ParseError("commands nested too deeply")
+                expanded.extend(expand_commands(nested, wrappers, depth + 1))
+    return expanded
+
+
+def _compile_globs(globs: List[str]) -> Optional[Pattern[str]]:
+    if not globs:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(g)})" for g in globs))
+
+
+@dataclass
+class Violation:
+    """ A rule that blocked a tool call. """
+
+    rule_id: str
+    message: str
+
+
+class Rule:
+    """ Base class for compiled policy rules. """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.id: str = spec["id"]
+        self.tools: FrozenSet[str] = frozenset(spec.get("tools", ()))
+        message: Union[str, List[str]] = spec.get("message", f"BLOCKED: {self.id}")
+        self.message: str = "\n".join(message) if isinstance(message, list) else message
+
+    def matches(self, tool_name: str, tool_input: Dict[str, Any], commands: "_LazyCommands") -> bool:
+        raise NotImplementedError
+
+
+class PathRule(Rule):
+    """ Blocks access to paths matching a set of globs. """
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.field: str = spec.get("field", "file_path")
+        self._match: Optional[Pattern[str]] = _compile_globs(spec.get("match", []))
+        self._allow: Optional[Pattern[str]] = _compile_globs(spec.get("allow", []))
+
+    def matches_path(self, path: str) -> bool:
+        # multi-line words are message bodies/scripts, not paths
+        if self._match is None or not path or "\n" in path:
+            return False
+        for part in path.replace("\\", "/").split("/"):
+            if self._match.match(part) and not (self._allow and self._allow.match(part)):
+                return True
+        return False
+
+    def _matches_word(self, word: str) -> bool:
+        if self.matches_path(word):
+            return True
+        # VAR=.env, --env-file=.env
+        if "=" in word:
+            return self.matches_path(word.rpartition("=")[2])
+        return False
+
+    def matches(self, tool_name: str, tool_input: Dict[str, Any], commands: "_LazyCommands") -> bool:
+        if tool_name == "Bash":
+            for cmd in commands.get():
+                for word in cmd.words:
+                    if self._matches_word(word):
+                        return True
+                for target in cmd.redirects:
+                    if self._matches_word(target):
+                        return True
+            return False
+        value: Any = tool_input.get(self.field, "")
+        return isinstance(value, str) and self.matches_path(value)
+
+
+class CommandRule(Rule):
+    """ Blocks Bash commands invoked with a set of flags. """
+
+    def __init__(self, spec: Dict[str, Any], wrappers: Wrappers):
+        super().__init__(spec)
+        self.commands: FrozenSet[str] = frozenset(spec.get("commands", ()))
+        flags: List[str] = spec.get("flags", [])
+        self.long_flags: FrozenSet[str] = frozenset(f for f in flags if f.startswith("--"))
+        self.short_flags: FrozenSet[str] = frozenset(
+            f.lstrip("-") for f in flags if not f.startswith("--") and len(f.lstrip("-")) == 1)
+        self.wrappers: Wrappers = wrappers
+
+    def _has_flag(self, args: List[str]) -> bool:
+        for arg in args:
+            if arg == "--":
+                return False
+            if arg.startswith("--"):
+                if arg.split("=", 1)[0] in self.long_flags:
+                    return True
+            elif arg.startswith("-") and len(arg) > 1:
+                if not self.short_flags.isdisjoint(arg[1:]):
+                    return True
+        return False
+
+    def matches(self, tool_name: str, tool_input: Dict[str, Any], commands: "_LazyCommands") -> bool:
+        if tool_name != "Bash":
+            return False
+        for cmd in commands.get():
+            for name, args in _invocations(cmd.words, self.wrappers):
+                if name in self.commands and (
+                        not self.short_flags and not self.long_flags or self._has_flag(args)):
+                    return True
+        return False
+
+
+class DenyRule(Rule):
+    """ Blocks every call to its tools. """
+
+    def matches(self, tool_name: str, tool_input: Dict[str, Any], commands: "_LazyCommands") -> bool:
+        return True
+
+
+class _LazyCommands:
+    """
+    Tokenizes the Bash command on first use and shares it across rules.
+    Raises ParseError when the command cannot be tokenized.
+    """
+
+    def __init__(self, tool_input: Dict[str, Any], wrappers: Wrappers):
+        self._tool_input: Dict[str, Any] = tool_input
+        self._wrappers: Wrappers = wrappers
+        self._commands: Optional[List[SimpleCommand]] = None
+
+    def get(self) -> List[SimpleCommand]:
+        if self._commands is None:
+            command: Any = self._tool_input.get("command", "")
+            self._commands = expand_commands(split_commands(command), self._wrappers) \
+                if isinstance(command, str) else []
+        return self._commands
+
+
+class PolicyEngine:
+    """ A compiled set of rules evaluated in declaration order. """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.wrappers: Wrappers = {}
+        for name, opts in spec.get("wrappers", {}).items():
+            if isinstance(opts, dict):
+                self.wrappers[name] = (frozenset(opts.get("options", ())), int(opts.get("operands", 0)))
+            else:
+                self.wrappers[name] = (frozenset(opts), 0)
+        self.rules: List[Rule] = []
+        for rule_spec in spec.get("rules", []):
+            rule_type: str = rule_spec.get("type", "")
+            if rule_type == "path":
+                self.rules.append(PathRule(rule_spec))
+            elif rule_type == "command":
+                self.rules.append(CommandRule(rule_spec, self.wrappers))
+            elif rule_type == "deny":
+                self.rules.append(DenyRule(rule_spec))
+            else:
+                raise ValueError(f"Unknown policy rule type: {rule_type!r}")
+        self._by_id: Dict[str, Rule] = {rule.id: rule for rule in self.rules}
+
+    @property
+    def tools(self) -> FrozenSet[str]:
+        """ Every tool name at least one rule applies to. """
+        return frozenset().union(*(rule.tools for rule in self.rules))
+
+    def check(self, tool_name: str, tool_input: Dict[str, Any]) -> Optional[Violation]:
+        """ Return the first rule the tool call violates, if any. """
+        commands: _LazyCommands = _LazyCommands(tool_input, self.wrappers)
+        for rule in self.rules:
+            try:
+                if tool_name in rule.tools and rule.matches(tool_name, tool_input, commands):
+                    return Violation(rule_id=rule.id, message=rule.message)
+            except ParseError:
+                return Violation(rule_id=UNPARSEABLE, message=UNPARSEABLE_MESSAGE)
+        return None
+
+    def check_rule(self, rule_id: str, tool_name: str, tool_input: Dict[str, Any]) -> bool:
+        """ True when one specific rule blocks the tool call. """
+        rule: Optional[Rule] = self._by_id.get(rule_id)
+        if rule is None or tool_name not in rule.tools:
+            return False
+        try:
+            return rule.matches(tool_name, tool_input, _LazyCommands(tool_input, self.wrappers))
+        except ParseError:
+            return True
+
+
+def load_policy(path: Optional[Union[str, Path]] = None) -> PolicyEngine:
+    """
+    Build the engine from a rules file, `policy_rules.json` by default.
+    When the file is missing or invalid the fallback policy blocks every
+    guarded tool, so the hook never fails open.
+    """
+    try:
+        with open(RULES_FILE if path is None else path, "r") as f:
+            return PolicyEngine(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return PolicyEngine(FALLBACK_POLICY)
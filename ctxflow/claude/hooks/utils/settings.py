@@ -0,0 +1,121 @@
+"""
+User settings for the hooks, read from `~/.ctxflow/settings.json`.
+
+Every key is optional; whatever the file leaves out falls back to
+DEFAULTS, so older or hand-edited settings files keep working.
+"""
+
+import copy
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULTS: Dict[str, Any] = {
+    "logs": {
+        # seal the active segment of a hook log once it reaches this size...
+        "segment_max_bytes": 10 * 1024 * 1024,
+        # ...or once it is this old; 0 disables either limit
+        "segment_max_age_hours": 24,
+        # delete sealed segments older than this; 0 keeps them forever
+        "retention_days": 30,
+        # gzip sealed segments in the background
+        "compress": True,
+        # tool hooks move payload values this big to logs/blobs and log a
+        # reference instead; 0 keeps everything inline
+        "blob_min_bytes": 16 * 1024,
+        # log every project's hook events to ~/.ctxflow/events instead of
+        # <project>/logs, for `ctx events` queries across projects
+        "central": False,
+    },
+    "announce": {
+        # wait this long after the last queued announcement before speaking,
+        # so a burst of events becomes one announcement...
+        "debounce_ms": 750,
+        # ...but never hold the first one back for longer than this
+        "max_delay_ms": 3000,
+        # drop announcements that waited longer than this to be spoken
+        "stale_after_s": 30,
+        # merge queued announcements of the same kind ("3 subagents complete")
+        "coalesce": True,
+        # LLM-written completion messages requested per batch, and the pool
+        # size below which a background refill starts
+        "pool_batch": 40,
+        "pool_low_water": 10,
+    },
+    "tts": {
+        # evict least recently played clips beyond this many bytes
+        "cache_max_bytes": 256 * 1024 * 1024,
+        # where announcements are played: "ffplay", "null" or "file:<path>"
+        "player": "ffplay",
+        # "auto" (elevenlabs when ELEVENLABS_API_KEY is set), "fastest"
+        # (lowest measured time to first audio of elevenlabs and local),
+        # "off" or a backend name; "local" turns on the offline engine
+        "backend": "auto",
+        # voice for the offline engine; empty for its default
+        "local_voice": "",
+    },
+    "llm": {
+        # providers tried in this order: "anthropic", "openai", "stub"
+        "order": ["anthropic", "openai"],
+        # give up on a request (every provider together) after this long...
+        "timeout_s": 10,
+        # ...and on a single provider after its cap here, e.g. {"openai": 5}
+        "provider_timeout_s": {},
+        # ask the next provider too when the first has not answered by then
+        "hedge_after_ms": 1500,
+        # take a provider out of rotation after this many failures in a row,
+        # for this long
+        "breaker_failures": 3,
+        "breaker_cooldown_s": 60,
+        "anthropic_model": "claude-3-5-haiku-20241022",
+        "openai_model": "gpt-4.1-nano",
+    },
+    "hooks": {
+        # "off": tool hooks only see the tools they declare; "sampled": every
+        # tool call reaches them and a share of the rest is logged; "full":
+        # every tool call is logged
+        "audit": "off",
+        # share of undeclared tool calls logged in "sampled" mode
+        "audit_sample": 0.05,
+    },
+    "metrics": {
+        # record per-phase hook timings to ~/.ctxflow/metrics/hooks.jsonl
+        "enabled": True,
+    },
+}
+
+_cache: Optional[Dict[str, Any]] = None
+
+
+def settings_path() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "settings.json"
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def load_settings(reload: bool = False) -> Dict[str, Any]:
+    """ Settings merged over DEFAULTS; read once per process. """
+    global _cache
+    if _cache is None or reload:
+        merged: Dict[str, Any] = copy.deepcopy(DEFAULTS)
+        try:
+            with open(settings_path(), "r") as f:
+                user: Any = json.load(f)
+            if isinstance(user, dict):
+                _merge(merged, user)
+        except (OSError, ValueError):
+            pass
+        _cache = merged
+    return _cache
+
+
+def get_setting(section: str, key: str) -> Any:
+    return load_settings()[section][key]
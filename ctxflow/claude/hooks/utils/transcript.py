@@ -0,0 +1,142 @@
+"""
+Incremental transcript export for the Stop/SubagentStop `--chat` switch.
+
+Claude Code appends one JSON line per message to the session transcript.
+Instead of re-reading and re-writing the whole conversation on every Stop
+event, the exporter remembers how far it got (byte offset and line count)
+per session and only parses the lines appended since, appending them to
+`logs/chat/<session_id>.jsonl`.
+"""
+
+import fcntl
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Union
+
+from .eventlog import EventLog, default_log_dir, encode_event, iter_events
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+_UNSAFE: "re.Pattern[str]" = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+@dataclass
+class Checkpoint:
+    """ Where the last export of a session's transcript stopped. """
+
+    transcript_path: str = ""
+    inode: int = 0
+    offset: int = 0
+    lines: int = 0
+    export_size: int = 0
+
+
+class TranscriptExporter:
+    """ Appends newly written transcript lines to a per-session export. """
+
+    def __init__(self, log_dir: Optional[PathLike] = None):
+        base: Path = Path(log_dir) if log_dir is not None else default_log_dir()
+        self.export_dir: Path = base / "chat"
+
+    def _name(self, session_id: str) -> str:
+        return _UNSAFE.sub("_", session_id) or "unknown"
+
+    def export_path(self, session_id: str) -> Path:
+        return self.export_dir / f"{self._name(session_id)}.jsonl"
+
+    def checkpoint_path(self, session_id: str) -> Path:
+        return self.export_dir / f"{self._name(session_id)}.checkpoint.json"
+
+    def load_checkpoint(self, session_id: str) -> Checkpoint:
+        try:
+            with open(self.checkpoint_path(session_id), "r") as f:
+                return Checkpoint(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return Checkpoint()
+
+    def _save_checkpoint(self, session_id: str, checkpoint: Checkpoint) -> None:
+        path: Path = self.checkpoint_path(session_id)
+        tmp: Path = path.with_name(path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(asdict(checkpoint), f)
+        os.replace(tmp, path)
+
+    def export(self, session_id: str, transcript_path: PathLike) -> int:
+        """
+        Export the lines appended to a transcript since the last call.
+        Returns the number of new lines exported.
+        """
+        transcript: Path = Path(transcript_path)
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        export_path: Path = self.export_path(session_id)
+        lock_path: Path = self.export_dir / f"{self._name(session_id)}.lock"
+
+        with open(lock_path, "a") as lock:
+            # Stop and SubagentStop can fire together for one session
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                checkpoint: Checkpoint = self.load_checkpoint(session_id)
+                with open(transcript, "rb") as f:
+                    stat: os.stat_result = os.fstat(f.fileno())
+                    if (checkpoint.transcript_path != str(transcript)
+                            or checkpoint.inode != stat.st_ino
+                            or stat.st_size < checkpoint.offset):
+                        # new, replaced or truncated transcript: start over
+                        checkpoint = Checkpoint(
+                            transcript_path=str(transcript), inode=stat.st_ino)
+
+                    exported: int = export_path.stat().st_size if export_path.exists() else 0
+                    if exported < checkpoint.export_size:
+                        # export was removed or cut short: rebuild it
+                        checkpoint = Checkpoint(
+                            transcript_path=str(transcript), inode=stat.st_ino)
+                    if exported > checkpoint.export_size:
+                        # drop lines written after the last saved checkpoint,
+                        # e.g. by an export that died before saving it
+                        with open(export_path, "r+b") as out:
+                            out.truncate(checkpoint.export_size)
+
+                    f.seek(checkpoint.offset)
+                    data: bytes = f.read(max(stat.st_size - checkpoint.offset, 0))
+
+                # a trailing line without a newline is still being written
+                complete: int = data.rfind(b"\n") + 1
+                if complete == 0:
+                    return 0
+
+                records: List[bytes] = []
+                for line in data[:complete].splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(encode_event(json.loads(line)))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+
+                written: int = 0
+                if records:
+                    with EventLog(export_path) as log:
+                        written = log.append_raw(b"".join(records))
+
+                checkpoint.offset += complete
+                checkpoint.lines += len(records)
+                checkpoint.export_size += written
+                self._save_checkpoint(session_id, checkpoint)
+                return len(records)
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def export_transcript(session_id: str, transcript_path: PathLike,
+                      log_dir: Optional[PathLike] = None) -> int:
+    """ Export the new part of a session transcript; see TranscriptExporter. """
+    return TranscriptExporter(log_dir).export(session_id, transcript_path)
+
+
+def iter_export(session_id: str, log_dir: Optional[PathLike] = None) -> Iterator[Any]:
+    """ Stream a session's exported transcript lines. """
+    return iter_events(TranscriptExporter(log_dir).export_path(session_id))
@@ -0,0 +1,3 @@
+"""
+Text-to-speech scripts and the audio clip cache they share.
+"""
@@ -0,0 +1,412 @@
+"""
+Content-addressed store of synthesized audio clips.
+
+Every clip is named by the SHA-256 of what produced it: the normalized
+text, voice, model, output format and voice settings. Racing processes
+that synthesize the same announcement therefore write the same file
+instead of piling up duplicates. The index, `~/.ctxflow/audio_cache.db`
+(SQLite, WAL), maps keys to files and tracks size, hits and last access
+time for every clip, so `evict` can keep `~/.ctxflow/audio` under the
+byte budget from the `tts` section of `~/.ctxflow/settings.json` by
+dropping the least recently played clips first. Hit, miss and eviction
+counters feed `ctx tts cache`. `tee` writes a clip while it is being
+played, so streaming playback and caching happen in one pass.
+
+The TTS scripts used to load all of `~/.ctxflow/api_calls.csv` with pandas
+on every announcement; that CSV is imported on first use. Every CSV
+clip was synthesized with the same voice settings, LEGACY_VOICE, so its
+rows, like rows indexed before voice settings were part of the key, are
+keyed with those settings and found by the ElevenLabs backend. They keep
+their old file names and are evicted first.
+
+Stdlib only; it is imported by the hooks and by ctx.
+
+Import an existing CSV with ``python audio_cache.py migrate [CSV]``.
+"""
+
+import csv
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+DEFAULT_BUDGET: int = 256 * 1024 * 1024
+SCHEMA_VERSION: int = 2
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS clips (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    voice_id TEXT,
+    model_id TEXT,
+    output_format TEXT,
+    audio_path TEXT NOT NULL,
+    date_created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# columns added by version 2; added with ALTER TABLE to version 1 databases
+_V2_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("voice_settings", "TEXT"),
+    ("size", "INTEGER NOT NULL DEFAULT 0"),
+    ("last_access", "REAL NOT NULL DEFAULT 0"),
+    ("hits", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+# what the pandas script synthesized every CSV clip with; the same as
+# backends.ELEVENLABS_VOICE, which cannot be imported here
+LEGACY_VOICE: Dict[str, Any] = {
+    "voice_id": "56AoDkrOh6qfVPDXZ7Pt",
+    "model_id": "eleven_turbo_v2_5",
+    "output_format": "mp3_44100_128",
+    "voice_settings": {"stability": 0.8, "style": 0, "speed": 0.9},
+}
+
+
+def ctxflow_dir() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow"
+
+
+def default_db_path() -> Path:
+    return ctxflow_dir() / "audio_cache.db"
+
+
+def default_audio_dir() -> Path:
+    return ctxflow_dir() / "audio"
+
+
+def default_csv_path() -> Path:
+    return ctxflow_dir() / "api_calls.csv"
+
+
+def tts_setting(key: str, default: Any) -> Any:
+    """
+    A key of the `tts` section of ~/.ctxflow/settings.json, read directly
+    so `python audio_cache.py` runs on its own.
+    """
+    try:
+        with open(ctxflow_dir() / "settings.json", "r") as f:
+            return json.load(f).get("tts", {}).get(key, default)
+    except (OSError, ValueError, TypeError, AttributeError):
+        return default
+
+
+def cache_budget() -> int:
+    """ `tts.cache_max_bytes` from the settings. """
+    try:
+        return int(tts_setting("cache_max_bytes", DEFAULT_BUDGET))
+    except (ValueError, TypeError):
+        return DEFAULT_BUDGET
+
+
+def normalize_text(text: str) -> str:
+    """ The normalization the CSV cache used; kept so migrated rows match. """
+    return text.lower().replace(" ", "")
+
+
+def clip_key(text: str, voice_id: Optional[str] = None, model_id: Optional[str] = None,
+             output_format: Optional[str] = None, voice_settings: Optional[Dict[str, Any]] = None) -> str:
+    """ Content address of a clip: SHA-256 over text and synthesis parameters. """
+    spec: str = json.dumps(
+        [normalize_text(text), voice_id, model_id, output_format, voice_settings or {}],
+        sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+
+def legacy_voice(voice_id: Optional[str] = None, model_id: Optional[str] = None,
+                 output_format: Optional[str] = None) -> Dict[str, Any]:
+    """ The synthesis parameters of a clip indexed without voice settings. """
+    return {
+        "voice_id": voice_id or LEGACY_VOICE["voice_id"],
+        "model_id": model_id or LEGACY_VOICE["model_id"],
+        "output_format": output_format or LEGACY_VOICE["output_format"],
+        "voice_settings": LEGACY_VOICE["voice_settings"],
+    }
+
+
+def file_suffix(output_format: Optional[str]) -> str:
+    """ `mp3_44100_128` -> `.mp3`; `pcm_16000` -> `.pcm`. """
+    return "." + (output_format or "mp3").split("_", 1)[0]
+
+
+class AudioCache:
+    """ Connection to the audio clip index and its store directory. """
+
+    def __init__(self, db_path: Optional[PathLike] = None, audio_dir: Optional[PathLike] = None,
+                 timeout: float = 5.0):
+        self.path: Path = Path(db_path) if db_path is not None else default_db_path()
+        self.audio_dir: Path = Path(audio_dir) if audio_dir is not None else default_audio_dir()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn: sqlite3.Connection = sqlite3.connect(
+            str(self.path), timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._upgrade()
+
+    def _upgrade(self) -> None:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(clips)")}
+            for name, decl in _V2_COLUMNS:
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE clips ADD COLUMN {name} {decl}")
+            for row in self.conn.execute("SELECT key, audio_path FROM clips WHERE size = 0").fetchall():
+                try:
+                    size: int = os.path.getsize(row["audio_path"])
+                except OSError:
+                    size = 0
+                self.conn.execute("UPDATE clips SET size = ? WHERE key = ?", (size, row["key"]))
+            for row in self.conn.execute(
+                    "SELECT key, text, voice_id, model_id, output_format FROM clips "
+                    "WHERE voice_settings IS NULL").fetchall():
+                voice: Dict[str, Any] = legacy_voice(row["voice_id"], row["model_id"], row["output_format"])
+                self.conn.execute(
+                    "UPDATE OR IGNORE clips SET key = ?, voice_id = ?, model_id = ?, output_format = ?, "
+                    "voice_settings = ? WHERE key = ?",
+                    (clip_key(row["text"], **voice), voice["voice_id"], voice["model_id"],
+                     voice["output_format"], json.dumps(voice["voice_settings"], sort_keys=True), row["key"]))
+                # still there when the re-keyed clip was already indexed
+                self.conn.execute("DELETE FROM clips WHERE key = ? AND voice_settings IS NULL", (row["key"],))
+            self.conn.execute("CREATE INDEX IF NOT EXISTS clips_last_access ON clips(last_access)")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "AudioCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        self.conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, amount))
+
+    def path_for(self, text: str, voice_id: Optional[str] = None, model_id: Optional[str] = None,
+                 output_format: Optional[str] = None, voice_settings: Optional[Dict[str, Any]] = None) -> Path:
+        """ Where the clip for these parameters lives in the store. """
+        key: str = clip_key(text, voice_id, model_id, output_format, voice_settings)
+        return self.audio_dir / f"{key}{file_suffix(output_format)}"
+
+    def contains(self, text: str, voice_id: Optional[str] = None, model_id: Optional[str] = None,
+                 output_format: Optional[str] = None, voice_settings: Optional[Dict[str, Any]] = None) -> bool:
+        """ Whether a playable clip is cached; unlike `get`, not counted. """
+        key: str = clip_key(text, voice_id, model_id, output_format, voice_settings)
+        row: Optional[sqlite3.Row] = self.conn.execute(
+            "SELECT audio_path FROM clips WHERE key = ?", (key,)).fetchone()
+        return row is not None and os.path.exists(row["audio_path"])
+
+    def get(self, text: str, voice_id: Optional[str] = None, model_id: Optional[str] = None,
+            output_format: Optional[str] = None,
+            voice_settings: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        The cached clip for a text and voice, or None; counts a hit or a
+        miss. A row whose audio file has gone missing is dropped so the
+        text gets synthesized again.
+        """
+        key: str = clip_key(text, voice_id, model_id, output_format, voice_settings)
+        row: Optional[sqlite3.Row] = self.conn.execute(
+            "SELECT * FROM clips WHERE key = ?", (key,)).fetchone()
+        if row is not None and not os.path.exists(row["audio_path"]):
+            self.conn.execute("DELETE FROM clips WHERE key = ?", (key,))
+            row = None
+        if row is None:
+            self._count("misses")
+            return None
+        self.conn.execute(
+            "UPDATE clips SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        self._count("hits")
+        return dict(row)
+
+    def put(self, text: str, audio_path: PathLike, voice_id: Optional[str] = None,
+            model_id: Optional[str] = None, output_format: Optional[str] = None,
+            voice_settings: Optional[Dict[str, Any]] = None, date_created: Optional[str] = None) -> str:
+        """
+        Record a clip unless one is already recorded for the same key.
+        Returns the audio path cached for the key afterwards, which is an
+        earlier writer's file if this call lost a race.
+        """
+        key: str = clip_key(text, voice_id, model_id, output_format, voice_settings)
+        try:
+            size: int = os.path.getsize(audio_path)
+        except OSError:
+            size = 0
+        self.conn.execute(
+            "INSERT OR IGNORE INTO clips (key, text, voice_id, model_id, output_format, voice_settings, "
+            "audio_path, size, date_created, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, normalize_text(text), voice_id, model_id, output_format,
+             json.dumps(voice_settings, sort_keys=True) if voice_settings else None,
+             str(audio_path), size,
+             date_created or datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+             time.time()))
+        row: sqlite3.Row = self.conn.execute(
+            "SELECT audio_path FROM clips WHERE key = ?", (key,)).fetchone()
+        return row["audio_path"]
+
+    def tee(self, text: str, chunks: Iterable[bytes], voice_id: Optional[str] = None,
+            model_id: Optional[str] = None, output_format: Optional[str] = None,
+            voice_settings: Optional[Dict[str, Any]] = None) -> Iterator[bytes]:
+        """
+        Pass a synthesized stream through while writing it to its content
+        address, so playback can start on the first chunk. The file is
+        renamed into place and indexed once the stream is exhausted; a
+        reader never plays a partial clip, a stream abandoned part way
+        leaves nothing behind and a racing writer writes the same name.
+        """
+        target: Path = self.path_for(text, voice_id, model_id, output_format, voice_settings)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp: Path = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in chunks:
+                    if isinstance(chunk, bytes):
+                        f.write(chunk)
+                        yield chunk
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.put(text, target, voice_id, model_id, output_format, voice_settings)
+
+    def store(self, text: str, chunks: Iterable[bytes], voice_id: Optional[str] = None,
+              model_id: Optional[str] = None, output_format: Optional[str] = None,
+              voice_settings: Optional[Dict[str, Any]] = None) -> str:
+        """ Write a whole synthesized stream to its content address and index it. """
+        for _ in self.tee(text, chunks, voice_id, model_id, output_format, voice_settings):
+            pass
+        return str(self.path_for(text, voice_id, model_id, output_format, voice_settings))
+
+    def total_size(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()[0]
+
+    def evict(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Delete least recently used clips until the store fits in
+        `max_bytes` (default: the configured budget). Returns the number
+        of clips and bytes evicted.
+        """
+        budget: int = cache_budget() if max_bytes is None else max_bytes
+        total: int = self.total_size()
+        if total <= budget:
+            return 0, 0
+        evicted: int = 0
+        freed: int = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row in self.conn.execute(
+                    "SELECT key, audio_path, size FROM clips ORDER BY last_access").fetchall():
+                if total - freed <= budget:
+                    break
+                try:
+                    os.remove(row["audio_path"])
+                except FileNotFoundError:
+                    pass
+                self.conn.execute("DELETE FROM clips WHERE key = ?", (row["key"],))
+                evicted += 1
+                freed += row["size"]
+            self._count("evictions", evicted)
+            self._count("evicted_bytes", freed)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return evicted, freed
+
+    def stats(self) -> Dict[str, Any]:
+        """ Clip count, size, budget and the hit/miss/eviction counters. """
+        counters: Dict[str, int] = {
+            row["name"]: row["value"] for row in self.conn.execute("SELECT name, value FROM counters")}
+        hits: int = counters.get("hits", 0)
+        misses: int = counters.get("misses", 0)
+        return {
+            "clips": len(self),
+            "bytes": self.total_size(),
+            "budget": cache_budget(),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": counters.get("evictions", 0),
+            "evicted_bytes": counters.get("evicted_bytes", 0),
+        }
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM clips").fetchone()[0]
+
+    def migrate_csv(self, csv_path: Optional[PathLike] = None) -> int:
+        """
+        Import the rows of the legacy pandas CSV cache, keyed with the
+        LEGACY_VOICE settings they were synthesized with, and rename it to
+        `<name>.migrated`. Returns the number of rows imported; a missing
+        CSV imports nothing.
+        """
+        path: Path = Path(csv_path) if csv_path is not None else default_csv_path()
+        if not path.exists():
+            return 0
+        imported: int = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            with open(path, "r", newline="") as f:
+                for row in csv.DictReader(f):
+                    if not row.get("text") or not row.get("audio_path"):
+                        continue
+                    try:
+                        size: int = os.path.getsize(row["audio_path"])
+                    except OSError:
+                        size = 0
+                    voice: Dict[str, Any] = legacy_voice(
+                        row.get("voice_id"), row.get("model_id"), row.get("output_format"))
+                    # the CSV already holds normalized text; normalizing is idempotent
+                    cursor: sqlite3.Cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO clips (key, text, voice_id, model_id, output_format, "
+                        "voice_settings, audio_path, size, date_created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (clip_key(row["text"], **voice), normalize_text(row["text"]),
+                         voice["voice_id"], voice["model_id"], voice["output_format"],
+                         json.dumps(voice["voice_settings"], sort_keys=True), row["audio_path"], size,
+                         row.get("date_created") or ""))
+                    imported += cursor.rowcount
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        try:
+            os.replace(path, path.with_name(path.name + ".migrated"))
+        except FileNotFoundError:
+            pass  # a concurrent migration renamed it first
+        return imported
+
+
+def open_cache(db_path: Optional[PathLike] = None) -> AudioCache:
+    """ Open the cache, importing the legacy CSV on first use. """
+    cache: AudioCache = AudioCache(db_path)
+    if default_csv_path().exists():
+        cache.migrate_csv()
+    return cache
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["migrate"]:
+        with AudioCache() as cache:
+            count: int = cache.migrate_csv(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(f"{count} clips imported")
+    else:
+        print(__doc__)
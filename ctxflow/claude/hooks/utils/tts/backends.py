@@ -0,0 +1,228 @@
+"""
+Text-to-speech backends and the resolver every announcement goes through.
+
+A backend has a `name`, a `voice` dict (the synthesis parameters that
+address its clips in the audio cache) and a `synthesize(text)` method
+that yields audio chunks as they are produced; `available()` says
+whether it can run here. All of them are stdlib only, so the announce
+worker synthesizes in process instead of starting a `uv run` script:
+
+- "elevenlabs": the ElevenLabs streaming REST endpoint, when
+  `ELEVENLABS_API_KEY` is set.
+- "local": an offline engine on the PATH (espeak-ng, espeak or macOS
+  `say`); no network, tens of milliseconds per phrase.
+- "fake": deterministic bytes, for tests and dry runs.
+
+`tts.backend` in the settings picks one by name, or "auto" (the
+default) for the first available in PREFERENCE order, "fastest" for the
+available backend with the lowest recorded time to first audio, or
+"off" to silence announcements. "auto" only ever picks ElevenLabs, as
+before the local engines existed: without `ELEVENLABS_API_KEY` it stays
+silent, and the local engines speak only once chosen as "local" or
+through "fastest".
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol
+
+from .audio_cache import tts_setting
+
+VOICE_ID: str = "56AoDkrOh6qfVPDXZ7Pt"
+MODEL_ID: str = "eleven_turbo_v2_5"
+OUTPUT_FORMAT: str = "mp3_44100_128"
+# testing, voice was fast at 1.0
+# 7 was a little tism; too slow
+VOICE_SETTINGS: Dict[str, Any] = {
+    "stability": 0.8,
+    "style": 0,
+    "speed": 0.9,
+}
+ELEVENLABS_VOICE: Dict[str, Any] = {
+    "voice_id": VOICE_ID,
+    "model_id": MODEL_ID,
+    "output_format": OUTPUT_FORMAT,
+    "voice_settings": VOICE_SETTINGS,
+}
+ELEVENLABS_URL: str = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream?output_format={output_format}"
+HTTP_TIMEOUT: float = 30.0
+CHUNK_SIZE: int = 4096
+
+# "auto" takes the first of these that is available
+PREFERENCE: List[str] = ["elevenlabs"]
+# "fastest" ranks these; the local engines are opt-in
+RANKED: List[str] = ["elevenlabs", "local"]
+DEFAULT_BACKEND: str = "auto"
+
+
+class Backend(Protocol):
+    """ What the player and `prefetch` need from a synthesizer. """
+
+    name: str
+    voice: Dict[str, Any]
+    # whether personalized messages are synthesized as separately cached
+    # segments; only worth it when synthesis is slow and clips concatenate
+    segmented: bool
+
+    def available(self) -> bool:
+        ...
+
+    def synthesize(self, text: str) -> Iterable[bytes]:
+        ...
+
+
+class ElevenLabsBackend:
+    """ ElevenLabs over its streaming HTTP endpoint; chunks as they arrive. """
+
+    name: str = "elevenlabs"
+    voice: Dict[str, Any] = ELEVENLABS_VOICE
+    segmented: bool = True
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key: str = api_key or os.getenv("ELEVENLABS_API_KEY", "")
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def synthesize(self, text: str) -> Iterator[bytes]:
+        # imported here: urllib.request pulls in ssl and http.client, which
+        # would slow down every hook that only checks for a backend
+        import urllib.request
+
+        request: urllib.request.Request = urllib.request.Request(
+            ELEVENLABS_URL.format(voice_id=VOICE_ID, output_format=OUTPUT_FORMAT),
+            data=json.dumps({
+                "text": text,
+                "model_id": MODEL_ID,
+                "voice_settings": VOICE_SETTINGS,
+            }).encode("utf-8"),
+            headers={
+                "xi-api-key": self.api_key,
+                "Content-Type": "application/json",
+                "Accept": "audio/mpeg",
+            },
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            while True:
+                chunk: bytes = response.read1(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+
+class LocalBackend:
+    """
+    An offline synthesizer on the PATH. espeak-ng and espeak write a WAV
+    stream to stdout; `say` can only write to a file, which is read back.
+    WAV clips carry a header each, so messages are not segmented.
+    """
+
+    name: str = "local"
+    segmented: bool = False
+    engines: List[str] = ["espeak-ng", "espeak", "say"]
+
+    def __init__(self, engine: Optional[str] = None):
+        self.engine: Optional[str] = engine or next(
+            (name for name in self.engines if shutil.which(name)), None)
+        self.voice: Dict[str, Any] = {
+            "voice_id": self.engine,
+            "model_id": str(tts_setting("local_voice", "")) or None,
+            "output_format": "wav_22050",
+        }
+
+    def available(self) -> bool:
+        return self.engine is not None and shutil.which(self.engine) is not None
+
+    def _command(self, text: str, out: Optional[str] = None) -> List[str]:
+        voice: Optional[str] = self.voice["model_id"]
+        if self.engine == "say":
+            return ["say", *(["-v", voice] if voice else []),
+                    "--file-format=WAVE", "--data-format=LEI16@22050", "-o", str(out), text]
+        return [str(self.engine), *(["-v", voice] if voice else []), "--stdout", text]
+
+    def synthesize(self, text: str) -> Iterator[bytes]:
+        if self.engine == "say":
+            with tempfile.TemporaryDirectory(prefix="ctxflow-say-") as scratch:
+                out: Path = Path(scratch) / "clip.wav"
+                subprocess.run(self._command(text, str(out)), check=True, capture_output=True)
+                yield out.read_bytes()
+            return
+        proc: subprocess.Popen[bytes] = subprocess.Popen(
+            self._command(text), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        assert proc.stdout is not None
+        try:
+            while True:
+                chunk: bytes = proc.stdout.read1(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            proc.stdout.close()
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, self._command(text))
+
+
+class FakeBackend:
+    """ Offline backend: a short, text dependent byte string per phrase. """
+
+    name: str = "fake"
+    segmented: bool = True
+
+    def __init__(self, delay: float = 0.0):
+        self.voice: Dict[str, Any] = {
+            "voice_id": "fake", "model_id": "fake", "output_format": "mp3_44100_128"}
+        self.delay: float = delay
+        self.calls: List[str] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def available(self) -> bool:
+        return True
+
+    def synthesize(self, text: str) -> Iterable[bytes]:
+        with self._lock:
+            self.calls.append(text)
+        if self.delay:
+            time.sleep(self.delay)
+        return [b"FAKE", hashlib.sha256(text.encode("utf-8")).digest()]
+
+
+BACKENDS: Dict[str, Callable[[], Backend]] = {
+    "elevenlabs": ElevenLabsBackend,
+    "local": LocalBackend,
+    "fake": FakeBackend,
+}
+
+
+def available_backends() -> List[Backend]:
+    """ Every registered backend that can run here, in RANKED order. """
+    names: List[str] = RANKED + [name for name in BACKENDS if name not in RANKED]
+    return [backend for backend in (BACKENDS[name]() for name in names) if backend.available()]
+
+
+def resolve_backend(name: Optional[str] = None,
+                    latencies: Optional[Dict[str, float]] = None) -> Optional[Backend]:
+    """
+    The backend to speak with, or None when none is available. `name`
+    defaults to `tts.backend` from the settings; "fastest" ranks the
+    available backends by `latencies` (backend name -> seconds to first
+    audio) and falls back to RANKED order for unmeasured ones.
+    """
+    name = name or str(tts_setting("backend", DEFAULT_BACKEND))
+    if name == "off":
+        return None
+    if name in BACKENDS:
+        backend: Backend = BACKENDS[name]()
+        return backend if backend.available() else None
+    ranked: List[str] = RANKED if name == "fastest" else PREFERENCE
+    candidates: List[Backend] = [b for b in available_backends() if b.name in ranked]
+    if name == "fastest" and latencies:
+        candidates.sort(key=lambda b: latencies.get(b.name, float("inf")))
+    return candidates[0] if candidates else None
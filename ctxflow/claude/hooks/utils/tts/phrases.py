@@ -0,0 +1,123 @@
+"""
+Every static phrase the voice announcements use.
+
+The runner, the hooks' announce worker and `ctx tts prefetch` all read
+from here, so prefetching can synthesize each phrase ahead of time and
+announcements in a session are cache hits.
+
+Messages personalized with `ENGINEER_NAME` are spoken as segments: the
+name and the phrase are cached as separate clips and joined at playback,
+so "Ada, your agent needs your input" reuses the clip of "Your agent
+needs your input" instead of costing a synthesis per name.
+"""
+
+import os
+import re
+from typing import List, Optional
+
+# played when a terminal agent session starts; randomized
+ENTRY_MESSAGES: List[str] = [
+    "Another day another codebase to conquer Ready to ship some quality commits",
+    "Back in the terminal where we belong Time to turn coffee into code",
+    "Alright hotshot lets see what architectural masterpiece we're building today",
+    "Terminal is booted brain is caffeinated Lets make something that doesnt break in production",
+    "Welcome back to the command line where real programmers thrive",
+    "Ready to debug the world one elegant solution at a time",
+    "Firing up the dev environment Hope you brought your A-game today",
+    "Another sprint another chance to write code that future you will actually thank you for",
+    "Terminal agent reporting for duty Lets turn those feature requests into reality",
+    "Back to the grind Time to prove why they pay us the big bucks",
+    "Vim is loaded stack overflow is bookmarked Lets write some legendary code",
+    "Time to make the rubber duck proud with some clean readable solutions",
+    "Ready to refactor the world one function at a time",
+    "Booting up another session of architectural wizardry and caffeine dependency",
+    "Welcome to the danger zone where semicolons matter and whitespace has opinions",
+    "Another day dodging memory leaks and hunting down those sneaky race conditions",
+    "Locked and loaded with fresh ideas and a full pot of coffee",
+    "Time to turn those product requirements into something that actually compiles",
+    "Ready to write code so clean it makes the linter weep tears of joy",
+    "Welcome back to the trenches where tabs vs spaces wars are still being fought",
+]
+
+# played when a terminal agent session ends; randomized
+EXIT_MESSAGES: List[str] = [
+    "Session terminated successfully No segfaults detected today",
+    "Logging off before the code reviews pile up See you in the next commit",
+    "Another productive session in the books Time to push to main and call it a day",
+    "Exit code 0 Clean shutdown complete Go grab that well deserved coffee",
+    "Disconnecting from the matrix Remember to actually test your code this time",
+    "Session ended gracefully Unlike that last merge conflict we dont talk about",
+    "Shutting down dev environment Hope you remembered to save your work",
+    "Terminal agent going offline May your builds be fast and your bugs be obvious",
+    "Signing off Time to let the CI pipeline do its thing",
+    "Peace out coder May your documentation be clear and your deadlines be reasonable",
+    "Closing all processes No orphaned threads left behind this time",
+    "Git add git commit git push git home",
+    "Session complete Time to let the code monkeys take over for testing",
+    "Powering down May your next compilation be faster than your last",
+    "Signing off before the rubber duck starts questioning our life choices",
+    "Terminal session ended May your stack traces be short and your logs be verbose",
+    "Logging out Remember the first rule of programming It works on my machine",
+    "Session terminated Time to go pretend we understand what the frontend team is doing",
+    "Shutting down gracefully Unlike that database connection we forgot about last week",
+    "Till next time May your code be bug free and your coffee be strong",
+    "See you space cowboy",
+]
+
+# spoken when Claude stops, unless an LLM wrote a fresh one
+COMPLETION_MESSAGES: List[str] = [
+    "The agents work is complete",
+    "Claude is done!",
+    "Task finished!",
+    "Job complete!",
+    "Your agent is ready for the next task",
+    "Agentic work completed",
+    "Work complete, might be a new record time",
+    "You might want to check your account balance, task is done",
+    "Your checkings definitely overdrafted on this one",
+    "Job is done, good luck debugging that",
+]
+
+SUBAGENT_MESSAGE: str = "Subagent Task Complete"
+NOTIFICATION_MESSAGE: str = "Your agent needs your input"
+CRASH_MESSAGE: str = "Looks like your agent crashed"
+
+
+# separators trimmed from the ends of a segment; the pause comes from the join
+_SEPARATORS: str = " ,;:-"
+
+
+def engineer_name() -> str:
+    return os.getenv("ENGINEER_NAME", "").strip()
+
+
+def personalize(phrase: str, name: Optional[str] = None) -> str:
+    """ "Your agent crashed" -> "Ada, your agent crashed". """
+    if not name:
+        return phrase
+    return f"{name}, {phrase[:1].lower()}{phrase[1:]}"
+
+
+def segments(text: str, name: Optional[str] = None) -> List[str]:
+    """
+    Split a message into the clips it is spoken as: every mention of
+    `name` becomes its own segment, and so does the text around it.
+    Without a name, or when the message does not mention it, the message
+    is a single segment.
+    """
+    if not name or not re.search(rf"\b{re.escape(name)}\b", text, flags=re.IGNORECASE):
+        return [text]
+    parts: List[str] = re.split(rf"\b({re.escape(name)})\b", text, flags=re.IGNORECASE)
+    return [part for part in (p.strip(_SEPARATORS) for p in parts) if part.strip(_SEPARATORS + ".!?")]
+
+
+def static_phrases(name: Optional[str] = None) -> List[str]:
+    """
+    Every phrase above, deduplicated, in a stable order; with `name`, also
+    the name clip personalized messages are joined from.
+    """
+    phrases: List[str] = [*ENTRY_MESSAGES, *EXIT_MESSAGES, *COMPLETION_MESSAGES,
+                          SUBAGENT_MESSAGE, NOTIFICATION_MESSAGE, CRASH_MESSAGE]
+    if name:
+        phrases.append(name)
+    return list(dict.fromkeys(phrases))
@@ -0,0 +1,215 @@
+"""
+Streaming audio playback.
+
+A player is fed audio chunks as they arrive instead of a finished file,
+and stays open between clips: `FfplayPlayer` keeps one `ffplay` reading
+from a pipe for as long as the player lives, so the second announcement
+does not pay for starting a player and the first one starts sounding as
+soon as the first chunk of synthesis arrives. MP3 frames are
+self-delimiting, so clips fed back to back play one after another. A WAV
+clip from the local engines starts with a RIFF header that would be
+garbage in the middle of that stream, so it is played by an `ffplay` of
+its own once the queued audio has finished.
+
+Players are chosen by a spec string, `tts.player` in the settings:
+"ffplay" (the default), "null" (discard the audio) or "file:<path>"
+(append the audio to a file, for tests and debugging).
+
+`speak` plays a message through a player, segment by segment, from the
+audio cache where it can and otherwise from a backend while the clip is
+written to the cache.
+"""
+
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .audio_cache import AudioCache, tts_setting
+from .phrases import engineer_name, segments
+
+CHUNK_SIZE: int = 16 * 1024
+DEFAULT_PLAYER: str = "ffplay"
+
+
+class Player:
+    """ Discards audio; the base class of every player. """
+
+    name: str = "null"
+
+    def __init__(self) -> None:
+        self.bytes_played: int = 0
+        self.clips: int = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes_played += len(chunk)
+
+    def play(self, chunks: Iterable[bytes]) -> Optional[float]:
+        """
+        Feed one clip; returns the seconds until its first chunk reached
+        the player, or None when the clip was empty.
+        """
+        started: float = time.monotonic()
+        first: Optional[float] = None
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if first is None:
+                first = time.monotonic() - started
+            self.feed(chunk)
+        self.clips += 1
+        return first
+
+    def close(self) -> None:
+        """ Let queued audio finish, then release the player. """
+
+    def __enter__(self) -> "Player":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class FileSinkPlayer(Player):
+    """ Appends the audio to a file, or writes it to an open binary stream. """
+
+    name: str = "file"
+
+    def __init__(self, target: Union[str, IO[bytes]]):
+        super().__init__()
+        self._owned: bool = isinstance(target, str)
+        if isinstance(target, str):
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            self._file: IO[bytes] = open(target, "ab")
+        else:
+            self._file = target
+
+    def feed(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._file.flush()
+        super().feed(chunk)
+
+    def close(self) -> None:
+        if self._owned:
+            self._file.close()
+
+
+class FfplayPlayer(Player):
+    """ One long-lived `ffplay` fed MP3 clips through its stdin; one per WAV clip. """
+
+    name: str = "ffplay"
+    command: List[str] = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error", "-i", "pipe:0"]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.proc: Optional["subprocess.Popen[bytes]"] = None
+        self._clip_started: bool = False
+        self._own_player: bool = False
+
+    def play(self, chunks: Iterable[bytes]) -> Optional[float]:
+        self._clip_started = False
+        self._own_player = False
+        try:
+            return super().play(chunks)
+        finally:
+            if self._own_player:
+                # the WAV clip plays out; the next clip starts a fresh player
+                self.close()
+
+    def _start(self) -> "subprocess.Popen[bytes]":
+        if self.proc is None or self.proc.poll() is not None:
+            self.proc = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return self.proc
+
+    def feed(self, chunk: bytes) -> None:
+        if not self._clip_started:
+            self._clip_started = True
+            if chunk.startswith(b"RIFF"):
+                self.close()  # let the queued clips finish first
+                self._own_player = True
+        proc: "subprocess.Popen[bytes]" = self._start()
+        try:
+            assert proc.stdin is not None
+            proc.stdin.write(chunk)
+            proc.stdin.flush()
+        except BrokenPipeError:
+            # ffplay died mid clip; the rest of the clip goes to a new one
+            self.proc = None
+            return
+        super().feed(chunk)
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        try:
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.proc.wait()
+        self.proc = None
+
+
+PLAYERS: Dict[str, Callable[..., Player]] = {
+    "null": Player,
+    "ffplay": FfplayPlayer,
+    "file": FileSinkPlayer,
+}
+
+
+def open_player(spec: Optional[str] = None) -> Player:
+    """
+    A player from a spec ("ffplay", "null", "file:<path>");
+    defaults to `tts.player` from the settings. Falls back to the null
+    player when ffplay is not installed.
+    """
+    spec = spec or str(tts_setting("player", DEFAULT_PLAYER))
+    name, _, arg = spec.partition(":")
+    if name not in PLAYERS:
+        raise ValueError(f"unknown player {spec!r}; expected one of {', '.join(PLAYERS)}")
+    if name == "ffplay" and shutil.which("ffplay") is None:
+        return Player()
+    return PLAYERS[name](arg) if arg else PLAYERS[name]()
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk: bytes = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def clip_stream(cache: AudioCache, backend: Any, text: str) -> Iterator[bytes]:
+    """
+    The audio of one segment: read from the cache on a hit, otherwise
+    streamed from the backend while it is written to the cache.
+    """
+    cached: Optional[Dict[str, Any]] = cache.get(text, **backend.voice)
+    if cached is not None:
+        return read_chunks(cached["audio_path"])
+    return cache.tee(text, backend.synthesize(text), **backend.voice)
+
+
+def speak(cache: AudioCache, backend: Any, text: str, player: Player,
+          name: Optional[str] = None) -> Optional[float]:
+    """
+    Play a message segment by segment (see `phrases.segments`) or whole,
+    for backends that do not segment; returns the seconds until the first
+    audio reached the player.
+    """
+    started: float = time.monotonic()
+    first_audio: Optional[float] = None
+    parts: List[str] = [text]
+    if getattr(backend, "segmented", True):
+        parts = segments(text, name if name is not None else engineer_name())
+    for part in parts:
+        offset: float = time.monotonic() - started
+        first: Optional[float] = player.play(clip_stream(cache, backend, part))
+        if first_audio is None and first is not None:
+            first_audio = offset + first
+    return first_audio
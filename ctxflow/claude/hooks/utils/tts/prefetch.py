@@ -0,0 +1,57 @@
+"""
+Synthesize known phrases ahead of time so announcements are cache hits.
+
+Any backend from `backends` will do. Synthesis runs on a bounded thread
+pool; clips are stored from the calling thread because the cache's
+SQLite connection is not shared between threads.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .audio_cache import AudioCache
+from .backends import Backend, FakeBackend
+from .phrases import engineer_name, static_phrases
+
+__all__ = ["DEFAULT_CONCURRENCY", "Backend", "FakeBackend", "PrefetchReport", "prefetch"]
+
+DEFAULT_CONCURRENCY: int = 4
+
+
+@dataclass
+class PrefetchReport:
+    total: int = 0
+    cached: int = 0
+    synthesized: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def prefetch(cache: AudioCache, backend: Backend, phrases: Optional[Iterable[str]] = None,
+             concurrency: int = DEFAULT_CONCURRENCY) -> PrefetchReport:
+    """
+    Synthesize every phrase (default: all static phrases and the
+    engineer's name clip) that is not cached for the backend's voice yet,
+    at most `concurrency` at a time.
+    """
+    wanted: List[str] = list(dict.fromkeys(phrases if phrases is not None else static_phrases(engineer_name())))
+    report: PrefetchReport = PrefetchReport(total=len(wanted))
+    missing: List[str] = [text for text in wanted if not cache.contains(text, **backend.voice)]
+    report.cached = report.total - len(missing)
+    if not missing:
+        return report
+
+    def synthesize(text: str) -> bytes:
+        return b"".join(chunk for chunk in backend.synthesize(text) if isinstance(chunk, bytes))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="tts-prefetch") as pool:
+        futures: Dict[Future, str] = {pool.submit(synthesize, text): text for text in missing}
+        for future in as_completed(futures):
+            text: str = futures[future]
+            try:
+                cache.store(text, [future.result()], **backend.voice)
+                report.synthesized += 1
+            except Exception as e:
+                report.failed[text] = str(e)
+    cache.evict()
+    return report
@@ -1,41 +1,40 @@
 """
 ctx command line interface
+
+Only the root group lives here. Subcommands are in `ctxflow.commands` and
+are registered by name in COMMANDS, so starting `ctx` imports just click
+and the command that actually runs; keep heavy imports inside functions.
 """
-from pprint import pprint
-from ctxflow.base import (
-    TextualAppContext,
-)
-from ctxflow.__about__ import __application__, __version__
-import rich_click
-import click
-from typing import Optional, Tuple, Any, Callable, TypeVar, List
 import os
 import sys
 import shutil
-import subprocess
-from subprocess import PIPE
-from InquirerPy import inquirer, prompt
+from typing import Optional
 
+import click
 import logging
-from ctxflow.runner import TerminalAgentRunner
+from ctxflow.__about__ import __application__, __version__
+from ctxflow.commands import FAIL, SUCCEED, LazyCommands, LazyGroup
 from ctxflow.logger import setup_logging, logger
-from ctxflow.utils import cmd_builder, initial
 
-# need to be made into enviroment vars with fallbacks
-OC_ALIAS: str = "opencode"
-CLD_ALIAS: str = "claude"
-GI_ALIAS: str = "gitingest"
-# end
-
-OC_VERSION: str = str(subprocess.check_output(
-    f"{OC_ALIAS} --version", shell=True, text=True)).strip()
 AGENT_PREF: str = "claude"
 SCRIPT_DIR: str = os.path.dirname((os.path.abspath(__file__)))
 HOME_DIR: str = os.path.expanduser("~")
-F = TypeVar("F", bound=Callable[..., None])
 
-SUCCEED = 0
-FAIL = 1
+# name -> (where the command lives, the one line help `ctx --help` shows);
+# the help has to match the command's docstring, see tests/test_startup.py
+COMMANDS: LazyCommands = {
+    "init": ("ctxflow.commands.project:init", "📄 initialize prime command with .env variables"),
+    "done": ("ctxflow.commands.project:done", "🧹 Cleanup dirs/files that were created during ctxflow use."),
+    "hookd": ("ctxflow.commands.hooks:hookd", "⚡ serve Claude tool hooks from one long-lived process"),
+    "hooks": ("ctxflow.commands.hooks:hooks", "🪝 manage the Claude hooks installed in this project"),
+    "sessions": ("ctxflow.commands.sessions:sessions", "🔎 list and search indexed Claude sessions"),
+    "events": ("ctxflow.commands.sessions:events", "🗂️ query hook events across projects, like every Bash call today"),
+    "doctor": ("ctxflow.commands.doctor:doctor", "🩺 check that the programs ctxflow drives are installed"),
+    "stats": ("ctxflow.commands.stats:stats", "📊 report recorded performance metrics"),
+    "tts": ("ctxflow.commands.tts:tts", "🔊 manage text to speech audio"),
+    "opencode": ("ctxflow.commands.agents:opencode", "🤖 wrapper around opencode cli"),
+    "claude": ("ctxflow.commands.agents:claude", "🤖 wrapper around claude cli"),
+}
 
 
 def get_ctxflow_logo(pad: str = "", fallback: bool = False, max_width: Optional[int] = None) -> str:
@@ -116,21 +115,29 @@ def get_ctxflow_logo(pad: str = "", fallback: bool = False, max_width: Optional[
     return "".join(result).rstrip()
 
 
-def command_with_aliases(
-        group: click.Group,
-        *aliases: str,
-        **command_kwargs: Any
-) -> Callable[[F], F]:
-    def decorator(f: F) -> F:
-        cmd = click.command(**command_kwargs)(f)
-        group.add_command(cmd)
-        for alias in aliases:
-            group.add_command(cmd, name=alias)
-        return f
-    return decorator
+def find_digest(cwd: str) -> Optional[str]:
+    """ The project's digest: ai_docs/digest.txt, or else the first digest.txt under cwd. """
+    default: str = os.path.join(cwd, 'ai_docs', 'digest.txt')
+    if os.path.isfile(default):
+        return default
+    for root, dirs, files in os.walk(cwd):
+        if 'digest.txt' in files:
+            return os.path.join(root, 'digest.txt')
+    return None
 
 
-@click.group(invoke_without_command=True, help=f"{get_ctxflow_logo(pad='  ')}\n\nContext Flow Management Tool")
+def write_digest(cwd: str, path: str) -> None:
+    """ Digest the project at `cwd` into `path` and report what went in. """
+    from ctxflow.digest import build_digest, format_tokens
+
+    stats = build_digest(cwd, path)
+    logger.debug(f"digest: {stats.files} files, {stats.skipped} skipped, "
+                 f"{stats.bytes} bytes in {stats.seconds:.2f}s")
+    click.echo(f"files_analyzed: {stats.files}")
+    click.echo(f"token_size: {format_tokens(stats.tokens)}")
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS, invoke_without_command=True, help=f"{get_ctxflow_logo(pad='  ')}\n\nContext Flow Management Tool")
 @click.version_option(version=__version__, prog_name=__application__)
 @click.pass_context
 @click.option(
@@ -145,11 +152,11 @@ def ctx(cli_ctx: click.Context, log_lvl: str, agent: str, new_digest: bool) -> N
     """
     CTXFLOW 💭 control the enviroment and context passed to your Terminal Agent
     """
-    numeric_loglevel = getattr(logging, log_lvl)
+    numeric_loglevel = getattr(logging, log_lvl.upper(), None)
     if isinstance(numeric_loglevel, int):
         setup_logging(numeric_loglevel)
     else:
-        setup_logging(log_lvl_stdout=TextualAppContext().loglvl)
+        setup_logging()
 
     cli_ctx.ensure_object(dict)
     cli_ctx.obj['ctx'] = {
@@ -158,76 +165,22 @@ def ctx(cli_ctx: click.Context, log_lvl: str, agent: str, new_digest: bool) -> N
         "commands": {
             "browsr": {},
             "opencode": {},
-            "gitingest": {},
         }
     }
 
+    from ctxflow.utils import initial
+
     cwd: str = os.getcwd()
     if new_digest:
         # if flag enabled this will only update a digest and exit
         click.echo("updating the git digest file...")
-        for root, dirs, files in os.walk(cwd):
-            for name in files:
-                if name == 'digest.txt':
-                    cmd: str = cmd_builder(
-                        prog=GI_ALIAS,
-                        cmds=tuple(["."]),
-                        flags={
-                            "--output": os.path.join(root, name),
-                            "--exclude-pattern": "logs/",
-                            "-e": ["logs/", "*.log*", "*.env*", "*.claude*", "ai_docs/", "specs/"],
-                        },
-                        exclude_logs=True,
-                    )
-                    with subprocess.Popen(cmd, stdout=PIPE, stderr=PIPE, shell=True, text=True) as proc:
-                        stdout, stderr = proc.communicate()
-                        if stderr:
-                            msg: List[str] = stderr.strip().split('\n')
-                            logger.debug("Gitingest: " + " ".join(msg))
-
-                        if stdout:
-                            # don't care about index: 1 (Summary:) or 2 (Directory:)
-                            # fragil as its dependent on output of another cli prog
-                            try:
-                                output: List[str] = [
-                                    x for x in stdout.split('\n') if x != ""]
-                                output = output[0:1] + output[3:]
-                                if len(output) != 3:
-                                    raise IndexError
-                                output_structured: dict[str, str] = {
-                                    "output_path": "", "files_analyzed": "", "token_size": ""}
-                                for idx, line in enumerate(output):
-                                    # index: 0 key: output val: path,
-                                    # index: 1 key: files analyzed val: int,
-                                    # index: 2 key: token size val: float K
-                                    key_val: List[str] = line.split(":")
-                                    if len(key_val) != 2:
-                                        raise IndexError
-                                    if idx == 0:
-                                        output_structured["output_path"] = str(
-                                            key_val[1]).strip()
-                                    elif idx == 1:
-                                        output_structured["files_analyzed"] = str(
-                                            key_val[1]).strip()
-                                    elif idx == 2:
-                                        output_structured["token_size"] = str(
-                                            key_val[1]).strip()
-                                for key, val in output_structured.items():
-                                    # don't care for output_path right now; redundent
-                                    if key != "output_path":
-                                        click.echo(f"{key}: {val}")
-                            except IndexError:
-                                pass
-                            except Exception as e:
-                                logger.exception(
-                                    "stdout output might have changed, details: {e}")
-
-                    click.echo(
-                        f"{os.path.relpath(os.path.join(root, name))} updated")
-                    cli_ctx.exit(SUCCEED)
-
-        click.echo("no git digest file found")
-        cli_ctx.exit(FAIL)
+        digest: Optional[str] = find_digest(cwd)
+        if digest is None:
+            click.echo("no git digest file found")
+            cli_ctx.exit(FAIL)
+        write_digest(cwd, digest)
+        click.echo(f"{os.path.relpath(digest)} updated")
+        cli_ctx.exit(SUCCEED)
 
     cpydirs: tuple[tuple[str, str], ...] = (
         # directory - persistent storage
@@ -267,63 +220,19 @@ def ctx(cli_ctx: click.Context, log_lvl: str, agent: str, new_digest: bool) -> N
     cpydocs: tuple[tuple[str, str], ...] = cpydirs + cpyfiles
 
     if cli_ctx.invoked_subcommand is None:
+        from InquirerPy import inquirer
+
         confirm: bool = inquirer.confirm(message="Start ctxflow?").execute()
         if confirm:
             click.echo("Creating the necessary directories/files...")
             initial(cpyf=cpydocs)
-            # starting up gitingest, for proj indexing and priming
+            # only start tool hooks for the tools they handle
+            from pathlib import Path
+            from ctxflow.claude.hooks.utils.matchers import write_matchers
+            write_matchers(Path(cwd))
+            # digest the project, for proj indexing and priming
             click.echo("\nMaking a git digest file...")
-            cmd = cmd_builder(
-                prog=GI_ALIAS,
-                cmds=tuple(["."]),
-                flags={
-                    "--output": os.path.join(cwd, 'ai_docs', 'digest.txt'),
-                    "-e": ["logs/", "*.log*", "*.env*", "*.claude*", "ai_docs/", "specs/"],
-                },
-                exclude_logs=True,
-            )
-            with subprocess.Popen(cmd, stdout=PIPE, stderr=PIPE, shell=True, text=True) as proc:
-                stdout, stderr = proc.communicate()
-                if stderr:
-                    msg = stderr.strip().split('\n')
-                    logger.debug("Gitingest: " + " ".join(msg))
-
-                if stdout:
-                    # don't care about index: 1 (Summary:) or 2 (Directory:)
-                    # fragil as its dependent on output of another cli prog
-                    try:
-                        output = [
-                            x for x in stdout.split('\n') if x != ""]
-                        output = output[0:1] + output[3:]
-                        if len(output) != 3:
-                            raise IndexError
-                        output_structured = {
-                            "output_path": "", "files_analyzed": "", "token_size": ""}
-                        for idx, line in enumerate(output):
-                            # index: 0 key: output val: path,
-                            # index: 1 key: files analyzed val: int,
-                            # index: 2 key: token size val: float K
-                            key_val = line.split(":")
-                            if len(key_val) != 2:
-                                raise IndexError
-                            if idx == 0:
-                                output_structured["output_path"] = str(
-                                    key_val[1]).strip()
-                            elif idx == 1:
-                                output_structured["files_analyzed"] = str(
-                                    key_val[1]).strip()
-                            elif idx == 2:
-                                output_structured["token_size"] = str(
-                                    key_val[1]).strip()
-                        for key, val in output_structured.items():
-                            # don't care for output_path right now; redundent
-                            if key != "output_path":
-                                click.echo(f"{key}: {val}")
-                    except IndexError:
-                        pass
-                    except Exception as e:
-                        logger.exception(
-                            "stdout output might have changed, details: {e}")
+            write_digest(cwd, os.path.join(cwd, 'ai_docs', 'digest.txt'))
 
             click.echo("\nInitialization complete!")
 
@@ -336,134 +245,5 @@ def ctx(cli_ctx: click.Context, log_lvl: str, agent: str, new_digest: bool) -> N
     }
 
 
-@ctx.command(name="init", cls=rich_click.rich_command.RichCommand)
-@click.pass_context
-def init(cli_ctx: click.Context) -> None:
-    """
-    📄 initialize prime command with .env variables
-    """
-    questions: List[dict[str, str]] = [
-        {"type": "input", "message": "Project Name:", "name": "PROJECT_NAME"},
-        {"type": "input", "message": "Tech Stack:", "name": "TECH_STACK"},
-        {"type": "input", "message": "Current Status:", "name": "CURRENT_STATUS"},
-        {"type": "input", "message": "Priority:", "name": "PRIORITY"},
-        {"type": "confirm", "message": "Confirm?", "name": "confirm"},
-    ]
-    while True:
-        result: dict[str, Any] = prompt(questions)
-        if result["confirm"] == True:
-            for key, val in result.items():
-                click.echo(f'{key}="{val}"')
-            break
-
-    cwd: str = os.getcwd()
-    for root, dirs, files in os.walk(cwd):
-        for name in files:
-            if name == '.env':
-                path_env: str = os.path.join(root, name)
-                click.echo("Updating the .env file...")
-                if os.path.getsize(path_env) == 0:
-                    with open(path_env, 'w') as fd:
-                        for key, val in result.items():
-                            if key != 'confirm':
-                                fd.write(f'{key}="{val}"\n')
-                else:
-                    with open(path_env, 'a') as fd:
-                        for key, val in result.items():
-                            if key != 'confirm':
-                                fd.write(f'{key}="{val}"\n')
-
-                click.echo(f"{os.path.relpath(path_env)} updated")
-                cli_ctx.exit(SUCCEED)
-
-    path_env = os.path.join(cwd, ".env")
-    click.echo(
-        f".env file not found, creating one at {os.path.relpath(path_env)}")
-    open(path_env, 'x')
-    click.echo("Updating the .env file...")
-    with open(path_env, 'w') as fd:
-        for key, val in result.items():
-            if key != 'confirm':
-                fd.write(f'{key}="{val}"\n')
-    click.echo(f"{os.path.relpath(path_env)} updated")
-    cli_ctx.exit(SUCCEED)
-
-
-@ctx.command(name="done", cls=rich_click.rich_command.RichCommand)
-@click.pass_context
-def done(cli_ctx: click.Context) -> None:
-    """
-    🧹 Cleanup dirs/files that were created during ctxflow use.
-    \f
-    !!! Be MINDFUL of the data that you are deleting, ALWAYS double check any removals !!!
-    """
-    cli_ctx.obj['ctx']['commands']['done'] = {
-        "flags": {},
-        "args": {},
-        "commands": {},
-    }
-    confirm: bool = inquirer.confirm(message="Are you sure?").execute()
-    if confirm:
-        root_cli_ctx = cli_ctx.find_root()
-        ctx_teardown: Tuple[str, ...] = root_cli_ctx.obj['ctx']['kwargs']['remove']
-        for path in ctx_teardown:
-            file: str = os.path.basename(path)
-            try:
-                # just in case; absolutely don't want to remove these
-                if file == '.env' or file == '.ctxflow':
-                    continue
-                elif os.path.isdir(path) and os.path.exists(path):
-                    shutil.rmtree(path)
-                    click.echo(f"{os.path.relpath(path)} was removed")
-                elif os.path.isfile(path) and os.path.exists(path):
-                    os.remove(path)
-                    click.echo(f"{os.path.relpath(path)} was removed")
-                else:
-                    click.echo(
-                        f"{os.path.relpath(path)} was not removed, likely the file was already deleted")
-            except Exception as e:
-                logger.exception(f"An error of {type(e)} occured. Details:")
-                click.echo(f"couldn't remove {file}. see logs for details")
-                continue
-
-    cli_ctx.exit(SUCCEED)
-
-
-@command_with_aliases(ctx, OC_ALIAS, name="opencode", cls=rich_click.rich_command.RichCommand, context_settings=dict(
-    ignore_unknown_options=True,
-    allow_extra_args=True,
-    allow_interspersed_args=False
-))
-@click.pass_context
-def opencode(cli_ctx: click.Context) -> None:
-    """ 🤖 wrapper around opencode cli """
-    all_args: List[str] = cli_ctx.args
-    if not all_args:
-        all_args = ["."]
-
-    cmd: str = cmd_builder(prog=OC_ALIAS, cmds=tuple(all_args))
-    agent: TerminalAgentRunner = TerminalAgentRunner(
-        agent_alias=OC_ALIAS, cmd=cmd)
-    exit_code: int = agent.run()
-    cli_ctx.exit(exit_code)
-
-
-@command_with_aliases(ctx, CLD_ALIAS, name="claude", cls=rich_click.rich_command.RichCommand, context_settings=dict(
-    ignore_unknown_options=True,
-    allow_extra_args=True,
-    allow_interspersed_args=False
-))
-@click.pass_context
-def claude(cli_ctx: click.Context) -> None:
-    """ 🤖 wrapper around claude cli """
-    all_args: List[str] = cli_ctx.args
-    cmd: str = cmd_builder(prog=CLD_ALIAS, cmds=tuple(
-        all_args) if all_args is not None else None, exclude_logs=True)
-    agent: TerminalAgentRunner = TerminalAgentRunner(
-        agent_alias=CLD_ALIAS, cmd=cmd)
-    exit_code: int = agent.run()
-    cli_ctx.exit(exit_code)
-
-
 if __name__ == "__main__":
     ctx()
@@ -0,0 +1,108 @@
+"""
+ctx subcommands, imported the first time they are run.
+
+Every module in this package holds one subcommand (or group) of `ctx`
+and imports what it needs inside the command bodies. `ctx` itself only
+knows them by name through LazyGroup, so `ctx --help`, shell completion
+and every other subcommand never import a command they don't run.
+"""
+
+import datetime
+import importlib
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+# need to be made into enviroment vars with fallbacks
+OC_ALIAS: str = "opencode"
+CLD_ALIAS: str = "claude"
+# end
+
+PACKAGE_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUCCEED = 0
+FAIL = 1
+
+# command name -> ("module:attribute", one line help)
+LazyCommands = Dict[str, Tuple[str, str]]
+
+
+class LazyGroup(click.Group):
+    """
+    A group whose subcommands are imported on first use. The help listing
+    and completion use the one line help from `lazy_commands`, so they
+    import nothing.
+    """
+
+    def __init__(self, *args: Any, lazy_commands: Optional[LazyCommands] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands: LazyCommands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        command: Optional[click.Command] = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in self.lazy_commands:
+            module, attribute = self.lazy_commands[cmd_name][0].split(":")
+            command = getattr(importlib.import_module(module), attribute)
+            self.commands[cmd_name] = command  # type: ignore[assignment]
+        return command
+
+    def _short_help(self, ctx: click.Context, name: str, limit: int) -> Optional[str]:
+        if name in self.lazy_commands and name not in self.commands:
+            return click.utils.make_default_short_help(self.lazy_commands[name][1], limit)
+        command: Optional[click.Command] = self.get_command(ctx, name)
+        if command is None or command.hidden:
+            return None
+        return command.get_short_help_str(limit)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        names: List[str] = self.list_commands(ctx)
+        if not names:
+            return
+        limit: int = formatter.width - 6 - max(len(name) for name in names)
+        rows: List[Tuple[str, str]] = []
+        for name in names:
+            short_help: Optional[str] = self._short_help(ctx, name, limit)
+            if short_help is not None:
+                rows.append((name, short_help))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+    def shell_complete(self, ctx: click.Context, incomplete: str) -> List[Any]:
+        from click.shell_completion import CompletionItem
+
+        results: List[Any] = []
+        for name in self.list_commands(ctx):
+            if name.startswith(incomplete):
+                short_help: Optional[str] = self._short_help(ctx, name, 45)
+                if short_help is not None:
+                    results.append(CompletionItem(name, help=short_help))
+        results.extend(click.Command.shell_complete(self, ctx, incomplete))
+        return results
+
+
+def parse_since(value: Optional[str]) -> Optional[float]:
+    """ Turn `30m`, `12h`, `7d` or `today` into an epoch timestamp that far back. """
+    if not value:
+        return None
+    if value == "today":
+        now = datetime.datetime.now(tz=datetime.timezone.utc).astimezone()
+        midnight = datetime.datetime.combine(now.date(), datetime.time(), tzinfo=now.tzinfo)
+        return midnight.timestamp()
+    units: dict[str, int] = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    try:
+        amount: float = float(value[:-1]) * units[value[-1]]
+    except (KeyError, ValueError):
+        raise click.BadParameter(
+            f"{value!r} is not a duration like 30m, 12h or 7d") from None
+    return time.time() - amount
+
+
+def format_ts(ts: float) -> str:
+    when = datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).astimezone()
+    return when.strftime("%Y-%m-%d %H:%M:%S")
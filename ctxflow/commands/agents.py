@@ -0,0 +1,70 @@
+"""
+ctx opencode and ctx claude: run a terminal agent with ctxflow around it
+"""
+
+from typing import List
+
+import click
+import rich_click.rich_command
+
+from ctxflow.commands import CLD_ALIAS, FAIL, OC_ALIAS
+from ctxflow.logger import logger
+
+_AGENT_CONTEXT = dict(
+    ignore_unknown_options=True,
+    allow_extra_args=True,
+    allow_interspersed_args=False
+)
+
+
+def preflight(cli_ctx: click.Context, alias: str) -> None:
+    """
+    Exit with install instructions if the agent is not installed. The check
+    is cached against the binary, so it only runs the agent's version flag
+    after an install or upgrade.
+    """
+    from ctxflow.preflight import TOOLS_BY_NAME, check
+
+    status = check([alias])[alias]
+    if not status.found:
+        click.echo(f"{alias} is not installed; install with: {TOOLS_BY_NAME[alias].install}", err=True)
+        cli_ctx.exit(FAIL)
+    if status.error:
+        logger.warning(f"{alias} at {status.path}: {status.error}")
+    logger.debug(f"{alias} version: {status.version}")
+
+
+@click.command(name="opencode", cls=rich_click.rich_command.RichCommand, context_settings=_AGENT_CONTEXT)
+@click.pass_context
+def opencode(cli_ctx: click.Context) -> None:
+    """ 🤖 wrapper around opencode cli """
+    from ctxflow.runner import TerminalAgentRunner
+    from ctxflow.utils import cmd_builder
+
+    preflight(cli_ctx, OC_ALIAS)
+    all_args: List[str] = cli_ctx.args
+    if not all_args:
+        all_args = ["."]
+
+    cmd: str = cmd_builder(prog=OC_ALIAS, cmds=tuple(all_args))
+    agent: TerminalAgentRunner = TerminalAgentRunner(
+        agent_alias=OC_ALIAS, cmd=cmd)
+    exit_code: int = agent.run()
+    cli_ctx.exit(exit_code)
+
+
+@click.command(name="claude", cls=rich_click.rich_command.RichCommand, context_settings=_AGENT_CONTEXT)
+@click.pass_context
+def claude(cli_ctx: click.Context) -> None:
+    """ 🤖 wrapper around claude cli """
+    from ctxflow.runner import TerminalAgentRunner
+    from ctxflow.utils import cmd_builder
+
+    preflight(cli_ctx, CLD_ALIAS)
+    all_args: List[str] = cli_ctx.args
+    cmd: str = cmd_builder(prog=CLD_ALIAS, cmds=tuple(
+        all_args) if all_args is not None else None, exclude_logs=True)
+    agent: TerminalAgentRunner = TerminalAgentRunner(
+        agent_alias=CLD_ALIAS, cmd=cmd, hookd=True)
+    exit_code: int = agent.run()
+    cli_ctx.exit(exit_code)
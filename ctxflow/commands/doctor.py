@@ -0,0 +1,37 @@
+"""
+ctx doctor: check for the external programs ctxflow drives
+"""
+
+import click
+import rich_click.rich_command
+
+from ctxflow.commands import FAIL, SUCCEED
+
+
+@click.command(name="doctor", cls=rich_click.rich_command.RichCommand)
+@click.option("--refresh", default=False, is_flag=True, help="ask every tool for its version again")
+@click.option("--json", "as_json", default=False, is_flag=True, help="print one JSON object per row")
+@click.pass_context
+def doctor(cli_ctx: click.Context, refresh: bool, as_json: bool) -> None:
+    """
+    🩺 check that the programs ctxflow drives are installed
+    """
+    import json
+    from dataclasses import asdict
+    from ctxflow.preflight import TOOLS_BY_NAME, check
+
+    statuses = check(refresh=refresh)
+    if as_json:
+        for status in statuses.values():
+            click.echo(json.dumps(asdict(status)))
+        cli_ctx.exit(SUCCEED if all(s.ok for s in statuses.values()) else FAIL)
+
+    click.echo(f"{'TOOL':<10} {'STATUS':<22} {'NEEDED FOR':<30} PATH")
+    for name, status in statuses.items():
+        tool = TOOLS_BY_NAME[name]
+        state: str = (status.version or "found") if status.ok else ("broken" if status.found else "missing")
+        click.echo(f"{name:<10} {state[:22]:<22} {tool.needed_for:<30} {status.path or ''}")
+    problems = [s for s in statuses.values() if not s.ok]
+    for status in problems:
+        click.echo(f"\n{status.name}: {status.error}; install with: {TOOLS_BY_NAME[status.name].install}")
+    cli_ctx.exit(FAIL if problems else SUCCEED)
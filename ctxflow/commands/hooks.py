@@ -0,0 +1,110 @@
+"""
+ctx hookd and ctx hooks: the hook daemon and the hooks installed in a project
+"""
+
+import os
+from typing import Optional
+
+import click
+import rich_click.rich_command
+import rich_click.rich_group
+
+from ctxflow.commands import FAIL, PACKAGE_DIR, SUCCEED
+
+
+@click.command(name="hookd", cls=rich_click.rich_command.RichCommand)
+@click.option("--stop", "stop_daemon", default=False, is_flag=True, help="stop the hook daemon for this project")
+@click.option("--status", default=False, is_flag=True, help="report whether the hook daemon is running")
+@click.option("--idle-timeout", default=3600.0, type=click.FLOAT, help="exit after this many idle seconds, 0 to never exit")
+@click.pass_context
+def hookd(cli_ctx: click.Context, stop_daemon: bool, status: bool, idle_timeout: float) -> None:
+    """
+    ⚡ serve Claude tool hooks from one long-lived process
+    """
+    from ctxflow.claude.hooks.utils import hookd as daemon
+
+    cwd: str = os.getcwd()
+    if status:
+        running: bool = daemon.is_running(cwd)
+        click.echo(f"hookd is {'running' if running else 'not running'} for {cwd}")
+        cli_ctx.exit(SUCCEED if running else FAIL)
+
+    if stop_daemon:
+        cli_ctx.exit(SUCCEED if daemon.stop(cwd) else FAIL)
+
+    hooks_dir: str = os.path.join(cwd, '.claude', 'hooks')
+    if not os.path.isdir(hooks_dir):
+        # project not initialized yet; serve the bundled hooks
+        hooks_dir = os.path.join(PACKAGE_DIR, 'claude', 'hooks')
+    cli_ctx.exit(daemon.serve(project_dir=cwd, hooks_dir=hooks_dir, idle_timeout=idle_timeout))
+
+
+@click.group(name="hooks", cls=rich_click.rich_group.RichGroup)
+@click.pass_context
+def hooks(cli_ctx: click.Context) -> None:
+    """
+    🪝 manage the Claude hooks installed in this project
+    """
+
+
+@hooks.command(name="warm", cls=rich_click.rich_command.RichCommand)
+@click.option("--force", default=False, is_flag=True, help="rebuild environments even if their deps are unchanged")
+@click.option("--undo", default=False, is_flag=True, help="restore the hook commands from before warming")
+@click.pass_context
+def hooks_warm(cli_ctx: click.Context, force: bool, undo: bool) -> None:
+    """
+    🔥 prebuild locked environments for the hook scripts and run hooks with their interpreters
+    """
+    import subprocess
+    from pathlib import Path
+
+    from ctxflow.claude.hooks.utils.hookenv import unwarm_project, warm_project
+
+    cwd: Path = Path(os.getcwd())
+    if not (cwd / '.claude' / 'settings.json').is_file():
+        click.echo("no .claude/settings.json here; run ctx first to install the hooks")
+        cli_ctx.exit(FAIL)
+    if undo:
+        click.echo(f"restored {unwarm_project(cwd)} hook commands")
+        cli_ctx.exit(SUCCEED)
+
+    try:
+        report = warm_project(cwd, force=force)
+    except FileNotFoundError as e:
+        click.echo(f"couldn't build hook environments, is uv installed? ({e})")
+        cli_ctx.exit(FAIL)
+    except subprocess.CalledProcessError as e:
+        click.echo(f"building a hook environment failed: {(e.stderr or b'').decode(errors='replace').strip()}")
+        cli_ctx.exit(FAIL)
+    click.echo(f"{len(report.built)} environments built, {len(report.reused)} reused, "
+               f"{report.rewritten} hook commands rewritten")
+    for command in report.skipped:
+        click.echo(f"left as is: {command}")
+    cli_ctx.exit(SUCCEED)
+
+
+@hooks.command(name="matchers", cls=rich_click.rich_command.RichCommand)
+@click.option("--audit", default=None, type=click.Choice(["off", "sampled", "full"]),
+              help="send every tool call to the hooks for audit logging, default from settings")
+@click.pass_context
+def hooks_matchers(cli_ctx: click.Context, audit: Optional[str]) -> None:
+    """
+    🎯 scope the tool hook matchers in settings.json to the tools each hook declares
+    """
+    import json
+    from pathlib import Path
+
+    from ctxflow.claude.hooks.utils.matchers import write_matchers
+
+    cwd: Path = Path(os.getcwd())
+    path: Path = cwd / '.claude' / 'settings.json'
+    if not path.is_file():
+        click.echo("no .claude/settings.json here; run ctx first to install the hooks")
+        cli_ctx.exit(FAIL)
+    changed: int = write_matchers(cwd, audit)
+    click.echo(f"{changed} matchers updated")
+    for event, groups in json.loads(path.read_text()).get("hooks", {}).items():
+        for group in groups:
+            if "matcher" in group and event.endswith("ToolUse"):
+                click.echo(f"{event:<12} {group['matcher'] or '*'}")
+    cli_ctx.exit(SUCCEED)
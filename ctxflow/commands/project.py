@@ -0,0 +1,110 @@
+"""
+ctx init and ctx done: set a project up for prompting and clean it up again
+"""
+
+import os
+import shutil
+from typing import Any, List, Tuple
+
+import click
+import rich_click.rich_command
+
+from ctxflow.commands import SUCCEED
+from ctxflow.logger import logger
+
+
+@click.command(name="init", cls=rich_click.rich_command.RichCommand)
+@click.pass_context
+def init(cli_ctx: click.Context) -> None:
+    """
+    📄 initialize prime command with .env variables
+    """
+    from InquirerPy import prompt
+
+    questions: List[dict[str, str]] = [
+        {"type": "input", "message": "Project Name:", "name": "PROJECT_NAME"},
+        {"type": "input", "message": "Tech Stack:", "name": "TECH_STACK"},
+        {"type": "input", "message": "Current Status:", "name": "CURRENT_STATUS"},
+        {"type": "input", "message": "Priority:", "name": "PRIORITY"},
+        {"type": "confirm", "message": "Confirm?", "name": "confirm"},
+    ]
+    while True:
+        result: dict[str, Any] = prompt(questions)
+        if result["confirm"] == True:
+            for key, val in result.items():
+                click.echo(f'{key}="{val}"')
+            break
+
+    cwd: str = os.getcwd()
+    for root, dirs, files in os.walk(cwd):
+        for name in files:
+            if name == '.env':
+                path_env: str = os.path.join(root, name)
+                click.echo("Updating the .env file...")
+                if os.path.getsize(path_env) == 0:
+                    with open(path_env, 'w') as fd:
+                        for key, val in result.items():
+                            if key != 'confirm':
+                                fd.write(f'{key}="{val}"\n')
+                else:
+                    with open(path_env, 'a') as fd:
+                        for key, val in result.items():
+                            if key != 'confirm':
+                                fd.write(f'{key}="{val}"\n')
+
+                click.echo(f"{os.path.relpath(path_env)} updated")
+                cli_ctx.exit(SUCCEED)
+
+    path_env = os.path.join(cwd, ".env")
+    click.echo(
+        f".env file not found, creating one at {os.path.relpath(path_env)}")
+    open(path_env, 'x')
+    click.echo("Updating the .env file...")
+    with open(path_env, 'w') as fd:
+        for key, val in result.items():
+            if key != 'confirm':
+                fd.write(f'{key}="{val}"\n')
+    click.echo(f"{os.path.relpath(path_env)} updated")
+    cli_ctx.exit(SUCCEED)
+
+
+@click.command(name="done", cls=rich_click.rich_command.RichCommand)
+@click.pass_context
+def done(cli_ctx: click.Context) -> None:
+    """
+    🧹 Cleanup dirs/files that were created during ctxflow use.
+    \f
+    !!! Be MINDFUL of the data that you are deleting, ALWAYS double check any removals !!!
+    """
+    cli_ctx.obj['ctx']['commands']['done'] = {
+        "flags": {},
+        "args": {},
+        "commands": {},
+    }
+    from InquirerPy import inquirer
+
+    confirm: bool = inquirer.confirm(message="Are you sure?").execute()
+    if confirm:
+        root_cli_ctx = cli_ctx.find_root()
+        ctx_teardown: Tuple[str, ...] = root_cli_ctx.obj['ctx']['kwargs']['remove']
+        for path in ctx_teardown:
+            file: str = os.path.basename(path)
+            try:
+                # just in case; absolutely don't want to remove these
+                if file == '.env' or file == '.ctxflow':
+                    continue
+                elif os.path.isdir(path) and os.path.exists(path):
+                    shutil.rmtree(path)
+                    click.echo(f"{os.path.relpath(path)} was removed")
+                elif os.path.isfile(path) and os.path.exists(path):
+                    os.remove(path)
+                    click.echo(f"{os.path.relpath(path)} was removed")
+                else:
+                    click.echo(
+                        f"{os.path.relpath(path)} was not removed, likely the file was already deleted")
+            except Exception as e:
+                logger.exception(f"An error of {type(e)} occured. Details:")
+                click.echo(f"couldn't remove {file}. see logs for details")
+                continue
+
+    cli_ctx.exit(SUCCEED)
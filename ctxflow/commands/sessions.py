@@ -0,0 +1,145 @@
+"""
+ctx sessions and ctx events: query the indexed hook events and transcripts
+"""
+
+import os
+from typing import Optional
+
+import click
+import rich_click.rich_command
+import rich_click.rich_group
+
+from ctxflow.commands import FAIL, format_ts, parse_since
+
+
+@click.group(name="sessions", cls=rich_click.rich_group.RichGroup, invoke_without_command=True)
+@click.option("--limit", default=20, type=click.INT, help="maximum number of sessions to list")
+@click.option("--since", default=None, type=click.STRING, help="only sessions active within e.g. 30m, 12h, 7d")
+@click.option("--tool", default=None, type=click.STRING, help="only sessions that used this tool")
+@click.option("--all-projects", default=False, is_flag=True, help="include sessions from every project")
+@click.pass_context
+def sessions(cli_ctx: click.Context, limit: int, since: Optional[str], tool: Optional[str], all_projects: bool) -> None:
+    """
+    🔎 list and search indexed Claude sessions
+    """
+    from ctxflow.claude.hooks.utils.eventlog import default_log_dir
+    from ctxflow.claude.hooks.utils.index import SessionIndex
+
+    index: SessionIndex = SessionIndex()
+    cli_ctx.obj['index'] = index
+    cli_ctx.call_on_close(index.close)
+    # cheap catch-up with the current project's (or the central) logs before answering
+    index.ingest_log_dir(default_log_dir())
+
+    if cli_ctx.invoked_subcommand is not None:
+        return
+
+    rows = index.list_sessions(
+        limit=limit,
+        since=parse_since(since),
+        cwd=None if all_projects else os.getcwd(),
+        tool_name=tool,
+    )
+    if not rows:
+        click.echo("no sessions found")
+        return
+    click.echo(f"{'SESSION':<38} {'LAST SEEN':<19} {'EVENTS':>7}  PROJECT")
+    for row in rows:
+        click.echo(
+            f"{row['session_id']:<38} {format_ts(row['last_seen']):<19} "
+            f"{row['event_count']:>7}  {row['cwd'] or ''}")
+
+
+@sessions.command(name="show", cls=rich_click.rich_command.RichCommand)
+@click.argument("session_id")
+@click.option("--hook", default=None, type=click.STRING, help="only events from this hook, e.g. pre_tool_use")
+@click.option("--tool", default=None, type=click.STRING, help="only events for this tool, e.g. Bash")
+@click.option("--limit", default=None, type=click.INT, help="maximum number of events")
+@click.option("--json", "as_json", default=False, is_flag=True, help="print raw JSONL payloads")
+@click.option("--blobs", default=False, is_flag=True, help="with --json, inline payload values stored in logs/blobs")
+@click.pass_context
+def sessions_show(cli_ctx: click.Context, session_id: str, hook: Optional[str], tool: Optional[str], limit: Optional[int], as_json: bool, blobs: bool) -> None:
+    """
+    📜 show the hook events of one session (id prefixes work)
+    """
+    index = cli_ctx.obj['index']
+    full_id: Optional[str] = index.resolve_session(session_id)
+    if full_id is None:
+        click.echo(f"no unique session matches {session_id!r}")
+        cli_ctx.exit(FAIL)
+
+    store = None
+    if blobs:
+        from ctxflow.claude.hooks.utils.eventlog import blob_store
+        store = blob_store()
+    for row in index.get_events(full_id, hook=hook, tool_name=tool, limit=limit):
+        if as_json and store is not None:
+            import json
+            click.echo(json.dumps(store.resolve(json.loads(row['payload']))))
+        elif as_json:
+            click.echo(row['payload'])
+        else:
+            click.echo(f"{format_ts(row['ts'])}  {row['hook']:<14} {row['tool_name'] or ''}")
+
+
+@sessions.command(name="transcript", cls=rich_click.rich_command.RichCommand)
+@click.argument("session_id")
+@click.option("--type", "entry_type", default=None, type=click.STRING, help="only entries of this type, e.g. user")
+@click.pass_context
+def sessions_transcript(cli_ctx: click.Context, session_id: str, entry_type: Optional[str]) -> None:
+    """
+    💬 print the indexed transcript of one session as JSONL
+    """
+    index = cli_ctx.obj['index']
+    full_id: Optional[str] = index.resolve_session(session_id)
+    if full_id is None:
+        click.echo(f"no unique session matches {session_id!r}")
+        cli_ctx.exit(FAIL)
+
+    # the Stop hook leaves transcripts to be ingested when they are read
+    index.ingest_transcripts(full_id)
+    for row in index.get_transcript(full_id, entry_type=entry_type):
+        click.echo(row['payload'])
+
+
+@sessions.command(name="reindex", cls=rich_click.rich_command.RichCommand)
+@click.pass_context
+def sessions_reindex(cli_ctx: click.Context) -> None:
+    """
+    ♻️ ingest new transcript lines for every indexed session
+    """
+    index = cli_ctx.obj['index']
+    click.echo(f"{index.ingest_transcripts()} transcript lines indexed")
+
+
+@click.command(name="events", cls=rich_click.rich_command.RichCommand)
+@click.option("--tool", default=None, type=click.STRING, help="only calls to this tool, e.g. Bash")
+@click.option("--hook", default=None, type=click.STRING, help="only events from this hook, e.g. post_tool_use")
+@click.option("--since", default="today", type=click.STRING, help="only events within e.g. 30m, 12h, 7d or today")
+@click.option("--project", default=None, type=click.Path(file_okay=False, resolve_path=True),
+              help="only events from sessions in this project, default every project")
+@click.option("--limit", default=50, type=click.INT, help="maximum number of events")
+@click.option("--count", "count_only", default=False, is_flag=True, help="only print how many events match")
+@click.option("--json", "as_json", default=False, is_flag=True, help="print raw JSONL payloads")
+@click.pass_context
+def events(cli_ctx: click.Context, tool: Optional[str], hook: Optional[str], since: str, project: Optional[str],
+           limit: int, count_only: bool, as_json: bool) -> None:
+    """
+    🗂️ query hook events across projects, like every Bash call today
+    """
+    from ctxflow.claude.hooks.utils.eventlog import central_log_dir
+    from ctxflow.claude.hooks.utils.index import SessionIndex
+
+    with SessionIndex() as index:
+        index.ingest_log_dir(central_log_dir())
+        if os.path.isdir(os.path.join(os.getcwd(), 'logs')):
+            index.ingest_log_dir(os.path.join(os.getcwd(), 'logs'))
+        filters = {"tool_name": tool, "hook": hook, "since": parse_since(since), "cwd": project}
+        if count_only:
+            click.echo(index.count_events(**filters))
+            return
+        for row in index.query_events(limit=limit, **filters):
+            if as_json:
+                click.echo(row['payload'])
+            else:
+                click.echo(f"{format_ts(row['ts'])}  {row['session_id'][:8]}  {row['hook']:<14} {row['tool_name'] or ''}")
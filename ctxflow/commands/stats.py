@@ -0,0 +1,47 @@
+"""
+ctx stats: recorded performance metrics
+"""
+
+from typing import Optional
+
+import click
+import rich_click.rich_command
+import rich_click.rich_group
+
+from ctxflow.commands import parse_since
+
+
+@click.group(name="stats", cls=rich_click.rich_group.RichGroup)
+@click.pass_context
+def stats(cli_ctx: click.Context) -> None:
+    """
+    📊 report recorded performance metrics
+    """
+
+
+@stats.command(name="hooks", cls=rich_click.rich_command.RichCommand)
+@click.option("--since", default=None, type=click.STRING, help="only runs within e.g. 30m, 12h, 7d")
+@click.option("--hook", default=None, type=click.STRING, help="only this hook, e.g. stop")
+@click.option("--json", "as_json", default=False, is_flag=True, help="print one JSON object per row")
+@click.pass_context
+def stats_hooks(cli_ctx: click.Context, since: Optional[str], hook: Optional[str], as_json: bool) -> None:
+    """
+    ⏱️ p50/p95/p99 latency per hook and per phase, in milliseconds
+    """
+    import json
+    from ctxflow.claude.hooks.utils.metrics import iter_records, summarize
+
+    rows = summarize(iter_records(since=parse_since(since), hook=hook))
+    if not rows:
+        click.echo("no hook metrics recorded yet")
+        return
+    if as_json:
+        for row in rows:
+            click.echo(json.dumps(row))
+        return
+    click.echo(f"{'HOOK':<15} {'VIA':<8} {'PHASE':<8} {'RUNS':>6} {'P50':>9} {'P95':>9} {'P99':>9} {'MAX':>9}")
+    for row in rows:
+        name: str = row['hook'] if row['phase'] == 'total' else ''
+        click.echo(
+            f"{name:<15} {row['via'] if name else '':<8} {row['phase']:<8} {row['count']:>6} "
+            f"{row['p50']:>9.2f} {row['p95']:>9.2f} {row['p99']:>9.2f} {row['max']:>9.2f}")
@@ -0,0 +1,100 @@
+"""
+ctx tts: the text to speech cache and backends
+"""
+
+from typing import Optional
+
+import click
+import rich_click.rich_command
+import rich_click.rich_group
+
+from ctxflow.commands import FAIL, SUCCEED
+
+
+@click.group(name="tts", cls=rich_click.rich_group.RichGroup)
+@click.pass_context
+def tts(cli_ctx: click.Context) -> None:
+    """
+    🔊 manage text to speech audio
+    """
+
+
+@tts.command(name="cache", cls=rich_click.rich_command.RichCommand)
+@click.option("--evict", default=False, is_flag=True, help="evict clips until the cache fits its budget")
+@click.option("--max-bytes", default=None, type=click.INT, help="budget to evict down to, default from settings")
+@click.pass_context
+def tts_cache(cli_ctx: click.Context, evict: bool, max_bytes: Optional[int]) -> None:
+    """
+    💾 report audio cache hit rate, size and evictions
+    """
+    from ctxflow.claude.hooks.utils.tts.audio_cache import open_cache
+
+    with open_cache() as cache:
+        if evict or max_bytes is not None:
+            evicted, freed = cache.evict(max_bytes)
+            click.echo(f"evicted {evicted} clips ({freed / 1e6:.1f} MB)")
+        stats = cache.stats()
+    click.echo(f"clips:      {stats['clips']}")
+    click.echo(f"size:       {stats['bytes'] / 1e6:.1f} MB of {stats['budget'] / 1e6:.1f} MB")
+    click.echo(f"hit rate:   {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses)")
+    click.echo(f"evictions:  {stats['evictions']} ({stats['evicted_bytes'] / 1e6:.1f} MB)")
+
+
+@tts.command(name="prefetch", cls=rich_click.rich_command.RichCommand)
+@click.option("--concurrency", default=4, type=click.IntRange(1, 32), help="phrases synthesized at once")
+@click.option("--backend", default=None, type=click.Choice(["elevenlabs", "local", "fake"]),
+              help="synthesizer to fill the cache with, default from settings")
+@click.pass_context
+def tts_prefetch(cli_ctx: click.Context, concurrency: int, backend: Optional[str]) -> None:
+    """
+    📥 synthesize every entry, exit and completion phrase that is not cached yet
+    """
+    from ctxflow.claude.hooks.utils.tts.audio_cache import open_cache
+    from ctxflow.claude.hooks.utils.tts.backends import resolve_backend
+    from ctxflow.claude.hooks.utils.tts.prefetch import prefetch
+
+    synthesizer = resolve_backend(backend)
+    if synthesizer is None:
+        click.echo(f"TTS backend {backend or 'from settings'} is not available; nothing to prefetch")
+        cli_ctx.exit(FAIL)
+    with open_cache() as cache:
+        report = prefetch(cache, synthesizer, concurrency=concurrency)
+    click.echo(f"{report.total} phrases: {report.cached} already cached, "
+               f"{report.synthesized} synthesized, {len(report.failed)} failed ({synthesizer.name})")
+    for text, error in report.failed.items():
+        click.echo(f"failed: {text!r}: {error}")
+    cli_ctx.exit(FAIL if report.failed else SUCCEED)
+
+
+@tts.command(name="backends", cls=rich_click.rich_command.RichCommand)
+@click.option("--json", "as_json", default=False, is_flag=True, help="print one JSON object per row")
+def tts_backends(as_json: bool) -> None:
+    """
+    🎙️ list TTS backends, which one announcements use and how fast each starts speaking
+    """
+    import json
+
+    from ctxflow.claude.hooks.utils.announce import backend_latencies
+    from ctxflow.claude.hooks.utils.tts.backends import BACKENDS, resolve_backend
+
+    latencies = backend_latencies()
+    chosen = resolve_backend(latencies=latencies)
+    rows = []
+    for name, factory in BACKENDS.items():
+        backend = factory()
+        first_audio = latencies.get(name)
+        rows.append({
+            "backend": name,
+            "available": backend.available(),
+            "selected": chosen is not None and chosen.name == name,
+            "first_audio_p50_ms": round(first_audio * 1000, 1) if first_audio is not None else None,
+        })
+    if as_json:
+        for row in rows:
+            click.echo(json.dumps(row))
+        return
+    click.echo(f"{'backend':<12}{'available':>10}{'p50 first audio':>18}")
+    for row in rows:
+        p50 = "-" if row["first_audio_p50_ms"] is None else f"{row['first_audio_p50_ms']}ms"
+        marker = " *" if row["selected"] else ""
+        click.echo(f"{row['backend']:<12}{str(row['available']):>10}{p50:>18}{marker}")
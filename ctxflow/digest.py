@@ -0,0 +1,416 @@
+"""
+digest.py writes the project digest agents are primed with, `ai_docs/digest.txt`.
+
+The digest has the layout gitingest gives it: a directory tree, then every
+text file under a `FILE: <path>` banner, in tree order. Excludes are
+gitignore patterns: gitingest's defaults, the ones ctx adds, and every
+`.gitignore` and `.gitingestignore` in the project, which apply below the
+directory they are in as they do for git. Rules are compiled once into a
+few regexes and excluded directories are pruned while walking, so
+`node_modules` costs one match instead of one per file in it.
+
+Files are read on a thread pool and written out in tree order as they
+arrive; at most `WINDOW_BYTES` of file contents are held at once, however
+large the project.
+"""
+import codecs
+import itertools
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
+
+# files larger than this are left out, as gitingest does
+MAX_FILE_SIZE: int = 10 * 1024 * 1024
+# stop adding files once this much content is in the digest
+MAX_TOTAL_BYTES: int = 500 * 1024 * 1024
+# contents read ahead of the writer, at most
+WINDOW_BYTES: int = 32 * 1024 * 1024
+WINDOW_FILES: int = 256
+
+IGNORE_FILES: Tuple[str, ...] = (".gitignore", ".gitingestignore")
+SEPARATOR: str = "=" * 48
+
+# what ctx has always left out of the digest on top of the defaults
+CTX_EXCLUDES: Tuple[str, ...] = ("logs/", "*.log*", "*.env*", "*.claude*", "ai_docs/", "specs/")
+
+# gitingest's default ignore patterns
+DEFAULT_EXCLUDES: Tuple[str, ...] = (
+    # python
+    "*.pyc", "*.pyo", "*.pyd", "__pycache__", ".pytest_cache", ".coverage", ".tox", ".nox",
+    ".mypy_cache", ".ruff_cache", ".hypothesis", "poetry.lock", "Pipfile.lock",
+    # javascript
+    "node_modules", "bower_components", "package-lock.json", "yarn.lock", ".npm", ".yarn",
+    ".pnpm-store", "bun.lock", "bun.lockb",
+    # java
+    "*.class", "*.jar", "*.war", "*.ear", "*.nar", ".gradle/", "build/", ".settings/", ".classpath",
+    "gradle-app.setting", "*.gradle", ".project",
+    # c / c++ / swift
+    "*.o", "*.obj", "*.dll", "*.dylib", "*.exe", "*.lib", "*.out", "*.a", "*.pdb", "*.bin",
+    ".build/", "*.xcodeproj/", "*.xcworkspace/", "*.pbxuser", "*.mode1v3", "*.mode2v3",
+    "*.perspectivev3", "*.xcuserstate", "xcuserdata/", ".swiftpm/",
+    # ruby
+    "*.gem", ".bundle/", "vendor/bundle", "Gemfile.lock", ".ruby-version", ".ruby-gemset", ".rvmrc",
+    # rust / go / c#
+    "Cargo.lock", "**/*.rs.bk", "target/", "pkg/", "obj/", "*.suo", "*.user", "*.userosscache",
+    "*.sln.docstates", "*.nupkg", "bin/",
+    # version control
+    ".git", ".svn", ".hg", ".gitignore", ".gitattributes", ".gitmodules",
+    # media
+    "*.svg", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.ico", "*.pdf", "*.mov", "*.mp4", "*.mp3", "*.wav",
+    # environments and editors
+    "venv", ".venv", "env", ".env", "virtualenv", ".idea", ".vscode", ".vs", "*.swo", "*.swn",
+    ".settings", "*.sublime-*",
+    # temporary and cache files
+    "*.log", "*.bak", "*.swp", "*.tmp", "*.temp", ".cache", ".sass-cache", ".eslintcache",
+    ".DS_Store", "Thumbs.db", "desktop.ini",
+    # build output
+    "build", "dist", "target", "out", "*.egg-info", "*.egg", "*.whl", "*.so", "site-packages",
+    ".docusaurus", ".next", ".nuxt",
+    # data, minified and generated files
+    "*.db", "*.sqlite", "*.sqlite3", "*.min.js", "*.min.css", "*.map", "*.tfstate*", "vendor/",
+    "digest.txt",
+)
+
+
+def _translate(glob: str) -> str:
+    """ A gitignore glob as a regex: `*` and `?` stay within one path segment, `**` spans them. """
+    out: List[str] = []
+    i: int = 0
+    while i < len(glob):
+        char: str = glob[i]
+        if glob.startswith("**", i) and (i == 0 or glob[i - 1] == "/"):
+            if glob.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if i + 2 == len(glob):
+                out.append(".*")
+                i += 2
+                continue
+        if char == "*":
+            out.append("[^/]*")
+            while glob.startswith("*", i + 1):
+                i += 1
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end: int = glob.find("]", i + 2)
+            if end < 0:
+                out.append(re.escape(char))
+            else:
+                inner: str = glob[i + 1:end]
+                out.append("[" + ("^" + inner[1:] if inner[0] in "!^" else inner).replace("\\", "\\\\") + "]")
+                i = end
+        elif char == "\\" and i + 1 < len(glob):
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out) + r"\Z"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """ One gitignore line. Patterns without a slash match an entry's name at any depth. """
+
+    pattern: str
+    regex: Pattern[str]
+    negated: bool = False
+    dir_only: bool = False
+    basename: bool = True
+
+
+def parse_rule(line: str) -> Optional[Rule]:
+    """ The rule on one line of an ignore file; None for blanks and comments. """
+    text: str = line.rstrip("\r\n")
+    if not text.strip() or text.startswith("#"):
+        return None
+    text = text.rstrip(" \t") if not text.endswith("\\ ") else text
+    negated: bool = text.startswith("!")
+    if negated or text.startswith(("\\!", "\\#")):
+        text = text[1:]
+    dir_only: bool = text.endswith("/")
+    text = text.rstrip("/")
+    if not text:
+        return None
+    basename: bool = "/" not in text
+    return Rule(line.strip(), re.compile(_translate(text.lstrip("/"))), negated, dir_only, basename)
+
+
+def _alternation(rules: Sequence[Rule]) -> Optional[Pattern[str]]:
+    if not rules:
+        return None
+    return re.compile("|".join(f"(?:{rule.regex.pattern})" for rule in rules))
+
+
+class Rules:
+    """
+    The rules of one ignore file, or of the built in excludes. Without
+    negations any match excludes, so all rules are tried at once with four
+    regexes (name or path, any entry or directories only); with negations
+    the last matching rule wins, as in git.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        self.ordered: bool = any(rule.negated for rule in self.rules)
+        self.name_any = _alternation([r for r in self.rules if r.basename and not r.dir_only])
+        self.name_dir = _alternation([r for r in self.rules if r.basename and r.dir_only])
+        self.path_any = _alternation([r for r in self.rules if not r.basename and not r.dir_only])
+        self.path_dir = _alternation([r for r in self.rules if not r.basename and r.dir_only])
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[str]) -> "Rules":
+        return cls([rule for rule in map(parse_rule, lines) if rule is not None])
+
+    def match(self, rel: str, name: str, is_dir: bool) -> Optional[bool]:
+        """ True if excluded, False if a negation keeps it, None if no rule is about it. """
+        if self.ordered:
+            for rule in reversed(self.rules):
+                if (is_dir or not rule.dir_only) and rule.regex.match(name if rule.basename else rel):
+                    return not rule.negated
+            return None
+        if (self.name_any is not None and self.name_any.match(name)) \
+                or (self.path_any is not None and self.path_any.match(rel)):
+            return True
+        if is_dir and ((self.name_dir is not None and self.name_dir.match(name))
+                       or (self.path_dir is not None and self.path_dir.match(rel))):
+            return True
+        return None
+
+
+# (directory the rules apply below, relative to the root; its rules)
+Scope = Tuple[str, Rules]
+
+
+def _excluded(scopes: Sequence[Scope], rel: str, name: str, is_dir: bool) -> bool:
+    # the rules closest to the entry decide, as a nested .gitignore overrides its parents
+    for base, rules in reversed(scopes):
+        verdict: Optional[bool] = rules.match(rel[len(base) + 1:] if base else rel, name, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+@dataclass
+class Node:
+    name: str
+    rel: str
+    kind: str  # "dir", "file" or "symlink"
+    path: str = ""
+    size: int = 0
+    target: str = ""
+    children: List["Node"] = field(default_factory=list)
+    file_count: int = 0
+
+    def sort_key(self) -> Tuple[int, str]:
+        """ README first, then files, hidden files, directories and hidden directories. """
+        name: str = self.name.lower()
+        if self.kind == "file":
+            if name == "readme" or name.startswith("readme."):
+                return (0, name)
+            return (2 if name.startswith(".") else 1, name)
+        return (4 if name.startswith(".") else 3, name)
+
+
+@dataclass
+class DigestStats:
+    output: str = ""
+    files: int = 0
+    dirs: int = 0
+    skipped: int = 0
+    bytes: int = 0
+    tokens: int = 0
+    seconds: float = 0.0
+
+
+class _Walker:
+    def __init__(self, excludes: Rules, max_file_size: int, max_total_bytes: int):
+        self.excludes: Rules = excludes
+        self.max_file_size: int = max_file_size
+        self.max_total_bytes: int = max_total_bytes
+        self.total: int = 0
+        self.skipped: int = 0
+
+    def _ignore_rules(self, path: str) -> Optional[Rules]:
+        lines: List[str] = []
+        for name in IGNORE_FILES:
+            try:
+                with open(os.path.join(path, name), "r", encoding="utf-8", errors="replace") as f:
+                    lines.extend(f)
+            except OSError:
+                continue
+        return Rules.from_lines(lines) if lines else None
+
+    def walk(self, path: str, rel: str, scopes: Tuple[Scope, ...]) -> Node:
+        node: Node = Node(os.path.basename(path), rel, "dir")
+        try:
+            with os.scandir(path) as it:
+                entries: List[os.DirEntry] = list(it)
+        except OSError:
+            return node
+        if any(entry.name in IGNORE_FILES for entry in entries):
+            rules: Optional[Rules] = self._ignore_rules(path)
+            if rules is not None:
+                scopes = scopes + ((rel, rules),)
+
+        for entry in entries:
+            child_rel: str = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_link: bool = entry.is_symlink()
+                is_dir: bool = not is_link and entry.is_dir()
+                if _excluded(scopes, child_rel, entry.name, is_dir):
+                    continue
+                if is_link:
+                    node.children.append(Node(entry.name, child_rel, "symlink", target=os.readlink(entry.path)))
+                    node.file_count += 1
+                elif is_dir:
+                    child: Node = self.walk(entry.path, child_rel, scopes)
+                    if child.file_count:
+                        node.children.append(child)
+                        node.file_count += child.file_count
+                elif entry.is_file():
+                    size: int = entry.stat().st_size
+                    if size > self.max_file_size or self.total + size > self.max_total_bytes:
+                        self.skipped += 1
+                        continue
+                    self.total += size
+                    node.children.append(Node(entry.name, child_rel, "file", path=entry.path, size=size))
+                    node.file_count += 1
+            except OSError:
+                self.skipped += 1
+        node.children.sort(key=Node.sort_key)
+        return node
+
+
+def _tree(node: Node, prefix: str = "", last: bool = True) -> Iterator[str]:
+    name: str = node.name + "/" if node.kind == "dir" else node.name
+    if node.kind == "symlink":
+        name += " -> " + os.path.basename(node.target)
+    yield f"{prefix}{'└── ' if last else '├── '}{name}\n"
+    prefix += "    " if last else "│   "
+    for i, child in enumerate(node.children):
+        yield from _tree(child, prefix, i == len(node.children) - 1)
+
+
+def _files(node: Node) -> Iterator[Node]:
+    for child in node.children:
+        if child.kind == "dir":
+            yield from _files(child)
+        else:
+            yield child
+
+
+def _count_dirs(node: Node) -> int:
+    return sum(1 + _count_dirs(child) for child in node.children if child.kind == "dir")
+
+
+def _is_text(head: bytes) -> bool:
+    if b"\x00" in head:
+        return False
+    try:
+        # final=False: the sample may end inside a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def read_text(path: str) -> str:
+    """ A file's text for the digest, or a placeholder for empty, binary and unreadable files. """
+    try:
+        with open(path, "rb") as f:
+            data: bytes = f.read()
+    except OSError as e:
+        return f"Error reading file: {e.strerror}"
+    if not data:
+        return "[Empty file]"
+    if not _is_text(data[:1024]):
+        return "[Binary file]"
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def _block(node: Node, future: Optional["Future[str]"]) -> str:
+    if future is None:
+        header, content = f"SYMLINK: {node.rel} -> {os.path.basename(node.target)}", ""
+    else:
+        header, content = f"FILE: {node.rel}", future.result()
+    return f"{SEPARATOR}\n{header}\n{SEPARATOR}\n{content}\n\n"
+
+
+def _contents(tree: Node, pool: ThreadPoolExecutor) -> Iterator[str]:
+    """ Every file's block in tree order, reading up to the window ahead on `pool`. """
+    pending: Deque[Tuple[Node, Optional["Future[str]"]]] = deque()
+    pending_bytes: int = 0
+    separator: str = ""
+    for node in _files(tree):
+        future: Optional["Future[str]"] = None
+        if node.kind == "file":
+            future = pool.submit(read_text, node.path)
+        pending.append((node, future))
+        pending_bytes += node.size
+        while pending and (pending_bytes > WINDOW_BYTES or len(pending) > WINDOW_FILES):
+            done, done_future = pending.popleft()
+            pending_bytes -= done.size
+            yield separator + _block(done, done_future)
+            separator = "\n"
+    while pending:
+        yield separator + _block(*pending.popleft())
+        separator = "\n"
+
+
+def format_tokens(tokens: int) -> str:
+    """ 1234 -> 1.2k, like gitingest's summary. """
+    for threshold, suffix in ((1_000_000, "M"), (1_000, "k")):
+        if tokens >= threshold:
+            return f"{tokens / threshold:.1f}{suffix}"
+    return str(tokens)
+
+
+def build_digest(
+        root: Union[str, Path],
+        output: Union[str, Path],
+        excludes: Sequence[str] = CTX_EXCLUDES,
+        max_file_size: int = MAX_FILE_SIZE,
+        max_total_bytes: int = MAX_TOTAL_BYTES,
+        workers: Optional[int] = None,
+) -> DigestStats:
+    """
+    Write the digest of `root` to `output` and return what went into it.
+    `excludes` are added to DEFAULT_EXCLUDES. Tokens are estimated at four
+    characters each. The digest replaces `output` only once it is complete.
+    """
+    start: float = time.perf_counter()
+    root_path: Path = Path(root).resolve()
+    out_path: Path = Path(output)
+    walker: _Walker = _Walker(Rules.from_lines([*DEFAULT_EXCLUDES, *excludes]), max_file_size, max_total_bytes)
+    tree: Node = walker.walk(str(root_path), "", (("", walker.excludes),))
+    stats: DigestStats = DigestStats(output=str(out_path), files=tree.file_count, dirs=_count_dirs(tree),
+                                     skipped=walker.skipped)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp: Path = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    chars: int = 0
+    try:
+        with open(tmp, "wb", buffering=1024 * 1024) as out, ThreadPoolExecutor(
+                max_workers=workers or min(32, (os.cpu_count() or 1) * 4), thread_name_prefix="digest") as pool:
+            header: str = "Directory structure:\n" + "".join(_tree(tree)) + "\n"
+            for text in itertools.chain((header,), _contents(tree, pool)):
+                data: bytes = text.encode("utf-8")
+                out.write(data)
+                chars += len(text)
+                stats.bytes += len(data)
+        os.replace(tmp, out_path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    stats.tokens = (chars + 3) // 4
+    stats.seconds = time.perf_counter() - start
+    return stats
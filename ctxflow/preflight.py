@@ -0,0 +1,152 @@
+"""
+preflight.py checks for the external programs ctxflow drives.
+
+Every tool is located on PATH and asked for its version, all of them at
+once on a thread pool, so a full check costs about as long as the slowest
+tool takes to answer. Answers are kept in `~/.ctxflow/preflight.json`
+next to the resolved path, mtime and size of the binary they came from;
+while those still match, the binary has not been reinstalled or upgraded
+and the cached answer is used, so a repeat check is a few stat calls and
+runs no subprocess at all.
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PROBE_TIMEOUT: float = 10.0
+
+_VERSION = re.compile(r"\d+(?:\.\d+)+[\w.+-]*")
+
+
+@dataclass(frozen=True)
+class Tool:
+    """ An external program and how to ask it for its version. """
+
+    name: str
+    needed_for: str
+    install: str
+    version_args: Tuple[str, ...] = ("--version",)
+
+
+TOOLS: Tuple[Tool, ...] = (
+    Tool("opencode", "ctx opencode", "npm install -g opencode-ai"),
+    Tool("claude", "ctx claude", "npm install -g @anthropic-ai/claude-code"),
+    Tool("browsr", "browsing project files", "pip install browsr"),
+    Tool("ffmpeg", "voice announcements", "brew install ffmpeg, or apt install ffmpeg", version_args=("-version",)),
+)
+TOOLS_BY_NAME: Dict[str, Tool] = {tool.name: tool for tool in TOOLS}
+
+
+@dataclass
+class ToolStatus:
+    name: str
+    path: Optional[str] = None
+    version: Optional[str] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+    @property
+    def ok(self) -> bool:
+        return self.found and self.error is None
+
+
+def cache_path() -> Path:
+    return Path(os.path.expanduser("~")) / ".ctxflow" / "preflight.json"
+
+
+def load_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(cache_path(), "r") as f:
+            cache: Any = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(cache: Dict[str, Dict[str, Any]]) -> None:
+    path: Path = cache_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp: Path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _fingerprint(path: str) -> Optional[Dict[str, Any]]:
+    """ What identifies an installed binary: where it really lives, and its mtime and size. """
+    resolved: str = os.path.realpath(path)
+    try:
+        st: os.stat_result = os.stat(resolved)
+    except OSError:
+        return None
+    return {"resolved": resolved, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _probe(tool: Tool, path: str, timeout: float) -> ToolStatus:
+    """ Run the tool's version flag and pull the version out of what it prints. """
+    try:
+        proc: subprocess.CompletedProcess[str] = subprocess.run(
+            [path, *tool.version_args], stdin=subprocess.DEVNULL,
+            capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return ToolStatus(tool.name, path=path, error=f"no answer to {' '.join(tool.version_args)} in {timeout:g}s")
+    except OSError as e:
+        return ToolStatus(tool.name, path=path, error=str(e))
+    output: str = (proc.stdout or proc.stderr).strip()
+    if proc.returncode != 0:
+        return ToolStatus(tool.name, path=path, error=f"{' '.join(tool.version_args)} exited {proc.returncode}")
+    match: Optional[re.Match] = _VERSION.search(output)
+    version: str = match.group() if match else (output.splitlines() or [""])[0]
+    return ToolStatus(tool.name, path=path, version=version)
+
+
+def check(names: Optional[Iterable[str]] = None, refresh: bool = False,
+          timeout: float = PROBE_TIMEOUT) -> Dict[str, ToolStatus]:
+    """
+    Status of each tool in `names` (default: all of them), in TOOLS order.
+    Tools whose binary changed since the last check, or every tool with
+    `refresh`, are probed concurrently; the rest come from the cache.
+    """
+    wanted: List[Tool] = list(TOOLS) if names is None else [TOOLS_BY_NAME[name] for name in names]
+    cache: Dict[str, Dict[str, Any]] = load_cache()
+    results: Dict[str, ToolStatus] = {}
+    stale: List[Tuple[Tool, str, Dict[str, Any]]] = []
+
+    for tool in wanted:
+        path: Optional[str] = shutil.which(tool.name)
+        fingerprint: Optional[Dict[str, Any]] = _fingerprint(path) if path else None
+        if path is None or fingerprint is None:
+            results[tool.name] = ToolStatus(tool.name, error="not found on PATH")
+            continue
+        entry: Dict[str, Any] = cache.get(tool.name, {})
+        if not refresh and all(entry.get(key) == value for key, value in fingerprint.items()):
+            results[tool.name] = ToolStatus(tool.name, path=path, version=entry.get("version"), cached=True)
+        else:
+            stale.append((tool, path, fingerprint))
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=len(stale), thread_name_prefix="preflight") as pool:
+            probed: List[ToolStatus] = list(pool.map(lambda job: _probe(job[0], job[1], timeout), stale))
+        for (tool, _, fingerprint), status in zip(stale, probed):
+            results[tool.name] = status
+            if status.ok:
+                cache[tool.name] = {**fingerprint, "version": status.version}
+            else:
+                # probe again next time; the failure may not last
+                cache.pop(tool.name, None)
+        try:
+            _save_cache(cache)
+        except OSError:
+            pass  # read-only home: probe every time
+
+    return {tool.name: results[tool.name] for tool in wanted}
@@ -1,9 +0,0 @@
-#!/bin/bash
-
-# Check if user has:
-# 1. opencode
-# 2. claude code
-# 3. gitingest
-# 4. browsr
-# 5. ffmpeg (on both linux and macos)
-# and recommend they download them if not existing on system or else program won't have full functionality
@@ -6,18 +6,20 @@ import datetime
 import os
 import shutil
 from dataclasses import dataclass
-from typing import Any, BinaryIO, Dict, Optional, Union, Tuple
-
-import fitz
-import rich_pixels
-from fitz import Pixmap
-from PIL import Image
-from rich_pixels import Pixels
-from textual_universal_directorytree import UPath, is_remote_path
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Optional, Union
 
 import click
 from ctxflow.logger import logger
 
+if TYPE_CHECKING:
+    # PyMuPDF, Pillow, rich-pixels and the directory tree (fsspec) take
+    # longer to import than the rest of `ctx` together; only the file
+    # preview helpers below need them, and they import them when called
+    from fitz import Pixmap
+    from PIL import Image
+    from rich_pixels import Pixels
+    from textual_universal_directorytree import UPath
+
 # from tokenizers import Tokenizer
 # from toeaenizers.models import BPE
 # from tokenizers.pre_tokenizers import Whitespace
@@ -94,12 +96,15 @@ def cmd_builder(
     return x
 
 
-def _open_pdf_as_image(buf: BinaryIO) -> Image.Image:
+def _open_pdf_as_image(buf: BinaryIO) -> "Image.Image":
     """
     Open a PDF file and return a PIL.Image object
     """
+    import fitz
+    from PIL import Image
+
     doc = fitz.open(stream=buf.read(), filetype="pdf")
-    pix: Pixmap = doc[0].get_pixmap()
+    pix: "Pixmap" = doc[0].get_pixmap()
     if pix.colorspace is None:
         mode = "L"
     elif pix.colorspace.n == 1:
@@ -111,10 +116,13 @@ def _open_pdf_as_image(buf: BinaryIO) -> Image.Image:
     return Image.frombytes(size=(pix.width, pix.height), data=pix.samples, mode=mode)
 
 
-def open_image(document: UPath, screen_width: float) -> Pixels:
+def open_image(document: "UPath", screen_width: float) -> "Pixels":
     """
     Open an image file and return a rich_pixels.Pixels object
     """
+    import rich_pixels
+    from PIL import Image
+
     with document.open("rb") as buf:
         if document.suffix.lower() == ".pdf":
             image = _open_pdf_as_image(buf=buf)
@@ -135,7 +143,7 @@ class FileInfo:
     File Information Object
     """
 
-    file: UPath
+    file: "UPath"
     size: int
     tokens: int
     last_modified: Optional[datetime.datetime]
@@ -151,10 +159,12 @@ def tokenizing(buf: bytes) -> int:
     return 0
 
 
-def get_file_info(file_path: UPath) -> FileInfo:
+def get_file_info(file_path: "UPath") -> FileInfo:
     """
     Get File Information, Regardless of the FileSystem
     """
+    from textual_universal_directorytree import is_remote_path
+
     try:
         stat: Union[Dict[str, Any], os.stat_result] = file_path.stat()
         # TODO: this error with IsADirectoryError() when file_path is a dir
@@ -215,7 +225,7 @@ def get_file_info(file_path: UPath) -> FileInfo:
         )
 
 
-def handle_duplicate_filenames(file_path: UPath) -> UPath:
+def handle_duplicate_filenames(file_path: "UPath") -> "UPath":
     """
     Handle Duplicate Filenames
 
@@ -0,0 +1,86 @@
+"""
+Announcement Queue Tests
+"""
+
+import pathlib
+
+import pytest
+
+from ctxflow.claude.hooks.utils import announce
+from ctxflow.claude.hooks.utils.tts.player import FileSinkPlayer
+
+
+@pytest.fixture
+def queue_home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test")
+    monkeypatch.setattr(announce, "spawn_module", lambda *args: None)
+    return tmp_path
+
+
+def test_enqueue_is_cheap_and_ordered(queue_home: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that hooks only write job files and the worker speaks them in order
+    """
+    announce.enqueue("stop", message="first")
+    announce.enqueue("subagent_stop")
+    assert len(announce.pending_jobs()) == 2
+
+    spoken = []
+    monkeypatch.setattr(announce, "speak", spoken.append)
+    assert announce.run_worker(idle=0, schedule=announce.Schedule(debounce=0, max_delay=0)) == 2
+    assert spoken == ["first", announce.SUBAGENT_MESSAGE]
+    assert announce.pending_jobs() == []
+
+
+def test_worker_reopens_its_player_when_it_takes_over(queue_home: pathlib.Path,
+                                                       monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that a job queued while the worker was giving up is played through
+    a fresh player, not the one closed on the way out
+    """
+    sink = queue_home / "heard.mp3"
+    monkeypatch.setattr(announce, "open_player", lambda: FileSinkPlayer(str(sink)))
+    monkeypatch.setattr(announce, "speak", lambda message: announce._player.feed(message.encode()))
+    pending = announce.pending_jobs
+    late = []
+
+    def pending_jobs() -> list:
+        # the worker has let go of the lock and is about to exit
+        if not late and not announce.worker_running():
+            late.append(announce.enqueue("stop", message="late"))
+        return pending()
+
+    monkeypatch.setattr(announce, "pending_jobs", pending_jobs)
+    announce.enqueue("stop", message="first")
+    assert announce.run_worker(idle=0, schedule=announce.Schedule(debounce=0, max_delay=0)) == 2
+    assert sink.read_bytes() == b"firstlate"
+
+
+def test_single_worker(queue_home: pathlib.Path) -> None:
+    """
+    Test that a second worker backs off while one holds the lock
+    """
+    with announce._open_lock() as lock:
+        assert announce._try_lock(lock)
+        assert announce.worker_running()
+        assert announce.run_worker(idle=0) == 0
+    assert not announce.worker_running()
+
+
+def test_bursts_are_coalesced_and_stale_jobs_dropped() -> None:
+    """
+    Test that a burst of subagent completions becomes one announcement and
+    that jobs past the staleness limit are not spoken
+    """
+    now = 1000.0
+    schedule = announce.Schedule(stale_after=30)
+    jobs = [{"kind": "subagent_stop", "created": now - 1} for _ in range(5)]
+    jobs.insert(0, {"kind": "stop", "created": now - 120})
+    jobs.append({"kind": "runner", "message": "bye", "created": now})
+
+    batch = announce.coalesce(jobs, schedule, now=now)
+    assert [job["kind"] for job in batch] == ["subagent_stop", "runner"]
+    assert announce.render_message(batch[0]) == "5 subagents complete"
+    assert announce.render_message(batch[1]) == "bye"
+    assert len(announce.coalesce(jobs, announce.Schedule(coalesce=False), now=now)) == 6
@@ -0,0 +1,102 @@
+"""
+Audio Cache Tests
+"""
+
+import pathlib
+import sqlite3
+
+from ctxflow.claude.hooks.utils.tts.audio_cache import _SCHEMA, AudioCache, LEGACY_VOICE, clip_key
+from ctxflow.claude.hooks.utils.tts.backends import ELEVENLABS_VOICE, ElevenLabsBackend
+from ctxflow.claude.hooks.utils.tts.player import Player, speak
+
+VOICE = {"voice_id": "v", "model_id": "m", "output_format": "mp3_44100_128",
+         "voice_settings": {"speed": 0.9}}
+
+
+def test_content_addressed_store(tmp_path: pathlib.Path) -> None:
+    """
+    Test that clips are named by their synthesis parameters, that lookups
+    ignore case and spaces, and that hits and misses are counted
+    """
+    with AudioCache(tmp_path / "cache.db", tmp_path / "audio") as cache:
+        assert cache.get("Job complete!", **VOICE) is None
+        path = cache.store("Job complete!", [b"ab", b"cd"], **VOICE)
+        assert pathlib.Path(path).name == clip_key("Job complete!", **VOICE) + ".mp3"
+        assert cache.store("job COMPLETE!", [b"abcd"], **VOICE) == path
+        assert cache.get("Jobcomplete!", **VOICE)["size"] == 4
+        assert cache.get("Job complete!", **{**VOICE, "voice_settings": {"speed": 1.0}}) is None
+        stats = cache.stats()
+        assert (stats["clips"], stats["hits"], stats["misses"]) == (1, 1, 2)
+
+        pathlib.Path(path).unlink()
+        assert cache.get("Job complete!", **VOICE) is None
+        assert len(cache) == 0
+
+
+def test_lru_eviction(tmp_path: pathlib.Path) -> None:
+    """
+    Test that eviction drops the least recently played clips first
+    """
+    with AudioCache(tmp_path / "cache.db", tmp_path / "audio") as cache:
+        paths = [cache.store(f"clip {i}", [b"x" * 100], **VOICE) for i in range(3)]
+        cache.conn.execute("UPDATE clips SET last_access = 0")
+        cache.get("clip 0", **VOICE)
+        assert cache.evict(max_bytes=150) == (2, 200)
+        assert [pathlib.Path(p).exists() for p in paths] == [True, False, False]
+        assert cache.stats()["evictions"] == 2
+
+
+def test_migrate_csv(tmp_path: pathlib.Path) -> None:
+    """
+    Test that rows of the legacy pandas CSV are imported once
+    """
+    clip = tmp_path / "clip.mp3"
+    clip.write_bytes(b"x")
+    csv_path = tmp_path / "api_calls.csv"
+    csv_path.write_text(
+        "text,voice_id,model_id,output_format,audio_path,date_created\n"
+        f"claudeisdone!,v,m,mp3,{clip},2025-01-01T00:00:00+00:00\n"
+        f"claudeisdone!,v,m,mp3,{clip},2025-01-02T00:00:00+00:00\n")
+    with AudioCache(tmp_path / "cache.db", tmp_path / "audio") as cache:
+        assert cache.migrate_csv(csv_path) == 1
+        row = cache.get("Claude is done!", voice_id="v", model_id="m", output_format="mp3",
+                        voice_settings=LEGACY_VOICE["voice_settings"])
+        assert row["date_created"].startswith("2025-01-01") and row["size"] == 1
+        assert cache.migrate_csv(csv_path) == 0
+    assert (tmp_path / "api_calls.csv.migrated").exists()
+
+
+def test_legacy_clips_are_played_from_the_cache(tmp_path: pathlib.Path) -> None:
+    """
+    Test that clips imported from the CSV and clips indexed by a version 1
+    database, both without voice settings, are hits for the ElevenLabs
+    backend instead of being synthesized again
+    """
+    assert LEGACY_VOICE == ELEVENLABS_VOICE
+    clips = {text: tmp_path / f"cassidy_{i}.mp3" for i, text in enumerate(("Claude is done!", "Job complete!"))}
+    for path in clips.values():
+        path.write_bytes(b"ID3" + path.name.encode())
+    db_path = tmp_path / "cache.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    voice = {key: ELEVENLABS_VOICE[key] for key in ("voice_id", "model_id", "output_format")}
+    conn.execute("INSERT INTO clips (key, text, voice_id, model_id, output_format, audio_path, date_created) "
+                 "VALUES (?, 'jobcomplete!', ?, ?, ?, ?, '2025-01-01')",
+                 (clip_key("Job complete!", **voice), *voice.values(), str(clips["Job complete!"])))
+    conn.commit()
+    conn.close()
+    csv_path = tmp_path / "api_calls.csv"
+    csv_path.write_text("text,voice_id,model_id,output_format,audio_path,date_created\n"
+                        f"claudeisdone!,{','.join(voice.values())},{clips['Claude is done!']},2025-01-01\n")
+
+    class Offline(ElevenLabsBackend):
+        def synthesize(self, text: str):
+            raise AssertionError(f"{text!r} was synthesized again")
+
+    with AudioCache(db_path, tmp_path / "audio") as cache:
+        assert cache.migrate_csv(csv_path) == 1
+        for text, path in clips.items():
+            player = Player()
+            speak(cache, Offline("key"), text, player, name="")
+            assert player.bytes_played == path.stat().st_size
+        assert cache.stats()["hits"] == 2
@@ -0,0 +1,70 @@
+"""
+TTS Backends Tests
+"""
+
+import json
+import pathlib
+
+import pytest
+
+from ctxflow.claude.hooks.utils import announce, metrics, settings
+from ctxflow.claude.hooks.utils.tts.backends import LocalBackend, resolve_backend
+
+
+@pytest.fixture
+def offline(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """ A HOME with settings and a PATH whose only engine is a fake espeak-ng. """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    engine = bin_dir / "espeak-ng"
+    engine.write_text("#!/bin/sh\nprintf 'RIFF:%s' \"$*\"\n")
+    engine.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("ELEVENLABS_API_KEY", raising=False)
+    monkeypatch.setattr(metrics, "_sink", None)
+    (tmp_path / ".ctxflow").mkdir()
+    (tmp_path / ".ctxflow" / "settings.json").write_text(json.dumps(
+        {"tts": {"player": f"file:{tmp_path / 'played.wav'}", "backend": "local"}}))
+    settings.load_settings(reload=True)
+    yield tmp_path
+    settings.load_settings(reload=True)
+
+
+def test_resolver(offline: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that "auto" only speaks through ElevenLabs, that the local engine
+    is used once chosen, and that "fastest" ranks by measured latency
+    """
+    assert resolve_backend("auto") is None
+    assert resolve_backend().name == "local"
+    assert resolve_backend("fastest").name == "local"
+    assert resolve_backend("fake").name == "fake"
+    assert resolve_backend("elevenlabs") is None
+
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test")
+    assert resolve_backend("auto").name == "elevenlabs"
+    assert resolve_backend("fastest", {"elevenlabs": 0.6, "local": 0.02}).name == "local"
+    assert resolve_backend("fastest", {"elevenlabs": 0.6}).name == "elevenlabs"
+
+    monkeypatch.setenv("PATH", str(offline / "empty"))
+    monkeypatch.delenv("ELEVENLABS_API_KEY")
+    assert resolve_backend() is None
+    assert announce.enqueue("stop") is None
+
+
+def test_local_announcement_records_latency(offline: pathlib.Path) -> None:
+    """
+    Test that an announcement is synthesized in process by the offline
+    engine, played whole, cached and recorded with its time to first audio
+    """
+    backend = LocalBackend()
+    assert b"".join(backend.synthesize("hello")) == b"RIFF:--stdout hello"
+
+    assert announce.speak("Ada, your agent crashed")
+    assert (offline / "played.wav").read_bytes() == b"RIFF:--stdout Ada, your agent crashed"
+    assert announce.speak("Ada, your agent crashed")
+
+    latencies = announce.backend_latencies()
+    assert set(latencies) == {"local"}
+    assert latencies["local"] < 1.0
@@ -0,0 +1,29 @@
+"""
+Hook Benchmark Generator Tests
+"""
+
+import json
+import pathlib
+
+from benchmarks import generators
+
+
+def test_generators_are_deterministic() -> None:
+    """
+    Test that the same seed replays byte-identical payloads covering every tool
+    """
+    first = [json.dumps(e) for e in generators.post_tool_use_events(50, seed=7, response_bytes=256)]
+    second = [json.dumps(e) for e in generators.post_tool_use_events(50, seed=7, response_bytes=256)]
+    assert first == second
+    tools = {json.loads(e)["tool_name"] for e in first}
+    assert tools == set(generators.TOOL_INPUTS)
+
+
+def test_stop_events_grow_the_transcript(tmp_path: pathlib.Path) -> None:
+    """
+    Test that every Stop event is preceded by a turn's worth of transcript lines
+    """
+    transcript = tmp_path / "session.jsonl"
+    for turn, event in enumerate(generators.stop_events(3, transcript, lines_per_turn=4), start=1):
+        assert event["transcript_path"] == str(transcript)
+        assert len(transcript.read_text().splitlines()) == 4 * turn
@@ -0,0 +1,123 @@
+"""
+Out-of-line Payload Tests
+"""
+
+import json
+import pathlib
+import threading
+
+import pytest
+
+from ctxflow.claude.hooks.utils import hookd, settings
+from ctxflow.claude.hooks.utils.blobstore import BlobStore, is_blob_ref
+from ctxflow.claude.hooks.utils.envelope import members, peek
+from ctxflow.claude.hooks.utils.eventlog import close_logs, encode_payload, iter_hook_events
+
+HOOKS_DIR = pathlib.Path(__file__).parent.parent / "ctxflow" / "claude" / "hooks"
+
+TRICKY = {
+    "tool_response": {"output": 'a "quoted" {brace} [bracket] \\ back\\"slash\n', "lines": [1, [2, {}]]},
+    "empty": {},
+    "nothing": None,
+    "ok": True,
+    "n": -1.5e3,
+    "tool_name": "Bash",
+}
+
+
+def test_envelope_is_read_without_decoding_the_rest() -> None:
+    """
+    Test that members finds every top level value exactly, through strings
+    holding quotes, brackets and escapes, and that peek decodes only the keys
+    asked for
+    """
+    for raw in (json.dumps(TRICKY).encode(), json.dumps(TRICKY, indent=2).encode()):
+        spans = {key: json.loads(raw[start:end]) for key, _, start, end in members(raw)}
+        assert spans == TRICKY
+        assert peek(raw, ("tool_name",)) == {"tool_name": "Bash"}
+    with pytest.raises(ValueError):
+        peek(b"[1, 2]", ("tool_name",))
+    with pytest.raises(ValueError):
+        list(members(b'{"tool_name": "Bash'))
+
+
+def test_large_values_are_stored_once(tmp_path: pathlib.Path) -> None:
+    """
+    Test that values over the threshold move to the blob store, that an
+    identical value is stored once, and that the record resolves back to
+    the payload
+    """
+    store = BlobStore(tmp_path)
+    payload = {"session_id": "s", "tool_name": "Read",
+               "tool_input": {"file_path": "big.txt"},
+               "tool_response": {"content": "x" * 100_000}}
+    raw = json.dumps(payload, indent=2).encode()
+
+    records = [encode_payload(raw, 1.0, store, blob_min_bytes=1024) for _ in range(10)]
+    assert len(records[0]) < 300 and records[0].count(b"\n") == 1
+    event = json.loads(records[0])
+    assert is_blob_ref(event["tool_response"]) and event["tool_input"] == payload["tool_input"]
+    assert len(list(tmp_path.rglob("*.json"))) == 1
+    assert store.resolve(event) == {**payload, "logged_at": 1.0}
+
+    inline = json.loads(encode_payload(raw, 2.0))
+    assert inline == {**payload, "logged_at": 2.0}
+
+
+def test_threads_storing_the_same_value(tmp_path: pathlib.Path) -> None:
+    """
+    Test that threads storing one value at once all succeed and leave a
+    single whole blob and no temp files behind
+    """
+    store = BlobStore(tmp_path)
+    data = b'"' + b"y" * 1_000_000 + b'"'
+    digests, errors = [], []
+    barrier = threading.Barrier(8)
+
+    def put() -> None:
+        barrier.wait()
+        try:
+            digests.append(store.put(data))
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == [] and len(set(digests)) == 1 and len(digests) == 8
+    assert store.get(digests[0]) == data
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [f"{digests[0]}.json"]
+
+
+def test_daemon_logs_post_tool_use_out_of_line(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the daemon hands post tool use the raw payload and the log
+    gets a small record pointing at the blob
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    settings.load_settings(reload=True)
+    path = hookd.socket_path(str(tmp_path))
+    path.parent.mkdir(parents=True)
+    srv = hookd.HookServer(path, HOOKS_DIR)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        payload = {"session_id": "s", "tool_name": "Bash",
+                   "tool_input": {"command": "cat big.log"}, "tool_response": {"stdout": "y" * 50_000}}
+        for _ in range(3):
+            code, _, _ = hookd.send_request("post_tool_use", json.dumps(payload).encode(), project_dir=str(tmp_path))
+            assert code == 0
+        assert hookd.send_request("post_tool_use", b"not json", project_dir=str(tmp_path))[0] == 1
+    finally:
+        srv.shutdown()
+        srv.server_close()
+        close_logs()
+        settings.load_settings(reload=True)
+
+    events = list(iter_hook_events("post_tool_use", tmp_path / "logs"))
+    assert len(events) == 3 and all(is_blob_ref(e["tool_response"]) for e in events)
+    assert (tmp_path / "logs" / "post_tool_use.jsonl").stat().st_size < 1000
+    assert len(list((tmp_path / "logs" / "blobs").rglob("*.json"))) == 1
@@ -0,0 +1,88 @@
+"""
+Central Event Store Tests
+"""
+
+import json
+import pathlib
+import subprocess
+import sys
+import time
+
+import pytest
+
+from ctxflow.claude.hooks.utils import settings
+from ctxflow.claude.hooks.utils.eventlog import central_log_dir, close_logs, default_log_dir
+from ctxflow.claude.hooks.utils.index import SessionIndex
+
+REPO = pathlib.Path(__file__).parent.parent
+
+WRITER = """
+import sys
+from ctxflow.claude.hooks.utils.eventlog import append_event
+project, count = sys.argv[1], int(sys.argv[2])
+for i in range(count):
+    tool = "Bash" if i % 2 else "Read"
+    append_event("post_tool_use", {"session_id": project + "-session", "cwd": project,
+                                   "tool_name": tool, "i": i, "pad": "x" * 2000})
+"""
+
+
+@pytest.fixture
+def central_home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    (tmp_path / ".ctxflow").mkdir()
+    (tmp_path / ".ctxflow" / "settings.json").write_text(json.dumps({"logs": {"central": True}}))
+    settings.load_settings(reload=True)
+    yield tmp_path
+    close_logs()
+    settings.load_settings(reload=True)
+
+
+def test_projects_write_to_one_store_at_once(central_home: pathlib.Path) -> None:
+    """
+    Test that hook processes of several projects writing at the same time
+    all land in the central log without losing or tearing a record, and
+    that the index answers per tool and per project
+    """
+    assert default_log_dir() == central_log_dir()
+    projects = [central_home / name for name in ("alpha", "beta", "alpha-worktree", "gamma")]
+    writers = []
+    for project in projects:
+        project.mkdir()
+        writers.append(subprocess.Popen(
+            [sys.executable, "-c", WRITER, str(project), "300"], cwd=project,
+            env={"HOME": str(central_home), "PYTHONPATH": str(REPO)}))
+    assert all(writer.wait(timeout=60) == 0 for writer in writers)
+    assert not any((project / "logs").exists() for project in projects)
+
+    with SessionIndex(central_home / "sessions.db") as index:
+        assert index.ingest_log_dir(central_log_dir()) == 1200
+        assert index.count_events(tool_name="Bash") == 600
+        assert index.count_events(tool_name="Bash", cwd=str(projects[1])) == 150
+        newest = index.query_events(tool_name="Read", since=time.time() - 3600, limit=5)
+        assert len(newest) == 5 and all(row["tool_name"] == "Read" for row in newest)
+
+
+def test_cross_project_tool_queries_use_the_index(tmp_path: pathlib.Path) -> None:
+    """
+    Test that "every Bash call since t" is answered from the (tool, ts)
+    index rather than a table scan
+    """
+    with SessionIndex(tmp_path / "sessions.db") as index:
+        now = time.time()
+        rows = [(f"s{i % 50}", "post_tool_use", ("Bash", "Read", "Edit", "Grep")[i % 4], now - i, "{}")
+                for i in range(100_000)]
+        index.conn.execute("BEGIN")
+        index.conn.executemany(
+            "INSERT INTO events (session_id, hook, tool_name, ts, payload) VALUES (?, ?, ?, ?, ?)", rows)
+        index.conn.execute("COMMIT")
+
+        since = now - 86400
+        plan = " ".join(str(tuple(row)) for row in index.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM events WHERE tool_name = ? AND ts >= ?", ("Bash", since)))
+        assert "events_tool" in plan
+
+        start = time.perf_counter()
+        assert index.count_events(tool_name="Bash", since=since) == 86400 // 4 + 1
+        assert len(index.query_events(tool_name="Bash", since=since, limit=100)) == 100
+        assert time.perf_counter() - start < 0.5
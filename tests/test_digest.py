@@ -0,0 +1,129 @@
+"""
+Digest Engine Tests
+"""
+
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from ctxflow import digest
+from ctxflow.digest import CTX_EXCLUDES, Rules, build_digest
+
+
+def _project(root: pathlib.Path) -> pathlib.Path:
+    files = {
+        "README.md": "# demo\n",
+        "main.py": "print('hi')\r\n",
+        ".hidden.cfg": "x=1\n",
+        "empty.txt": "",
+        "src/app/core.py": "def core():\n    return 'é'\n",
+        "src/app/notes.cache": "ignored by .gitignore\n",
+        "src/app/keep.cache": "kept by a negation\n",
+        "src/.gitignore": "generated/\n",
+        "src/generated/out.py": "ignored by the nested .gitignore\n",
+        "lib/generated/kept.py": "the nested rule stops at src/\n",
+        "node_modules/pkg/index.js": "default exclude\n",
+        ".git/HEAD": "ref: refs/heads/main\n",
+        "logs/run.jsonl": "ctx exclude\n",
+        ".env": "SECRET=1\n",
+        "ai_docs/digest.txt": "the previous digest\n",
+        "dist/bundle.js": "default exclude\n",
+        ".gitignore": "*.cache\n!keep.cache\n",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(text.encode("utf-8"))
+    (root / "blob.dat").write_bytes(b"\x89PNG\x00\x01\x02" * 100)
+    (root / "assets").mkdir()
+    (root / "assets" / "logo.png").write_bytes(b"\x89PNG")
+    os.symlink("main.py", root / "link.py")
+    return root
+
+
+def _digested(text: str) -> list:
+    return re.findall(r"^(?:FILE|SYMLINK): (.*)$", text, re.M)
+
+
+def test_excludes_and_layout(tmp_path: pathlib.Path) -> None:
+    """
+    Test that default, ctx and .gitignore excludes (with negations and a
+    nested file) apply, that files come in tree order with README first
+    and links among the directories, and that binary, empty and linked
+    files get placeholders
+    """
+    project = _project(tmp_path / "demo")
+    output = project / "ai_docs" / "digest.txt"
+    stats = build_digest(project, output)
+
+    text = output.read_text(encoding="utf-8")
+    assert _digested(text) == ["README.md", "blob.dat", "empty.txt", "main.py", ".hidden.cfg",
+                               "lib/generated/kept.py", "link.py -> main.py", "src/app/core.py",
+                               "src/app/keep.cache"]
+    assert text.startswith("Directory structure:\n└── demo/\n    ├── README.md\n")
+    assert "    ├── link.py -> main.py\n    └── src/\n        └── app/\n" in text
+    assert "FILE: blob.dat\n" + "=" * 48 + "\n[Binary file]\n" in text
+    assert "FILE: empty.txt\n" + "=" * 48 + "\n[Empty file]\n" in text
+    assert "print('hi')\n\n" in text and "\r" not in text and "return 'é'" in text
+    assert stats.files == 9 and stats.dirs == 4
+    assert stats.bytes == output.stat().st_size and stats.tokens > 0
+    assert not list(output.parent.glob(".*.tmp"))
+
+
+def test_read_ahead_window_does_not_change_output(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the digest is the same whether files are read far ahead or
+    one at a time, and that files over the size limit are skipped
+    """
+    project = tmp_path / "many"
+    for i in range(300):
+        path = project / f"pkg{i % 7}" / f"mod{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"VALUE = {i}\n" * (i + 1))
+    (project / "huge.py").write_text("x" * 5000)
+
+    wide = build_digest(project, tmp_path / "wide.txt", max_file_size=4096, workers=8)
+    monkeypatch.setattr(digest, "WINDOW_FILES", 1)
+    monkeypatch.setattr(digest, "WINDOW_BYTES", 1)
+    narrow = build_digest(project, tmp_path / "narrow.txt", max_file_size=4096, workers=8)
+
+    assert (tmp_path / "wide.txt").read_bytes() == (tmp_path / "narrow.txt").read_bytes()
+    assert wide.files == narrow.files == 300 and wide.skipped == 1
+
+
+def test_rules_follow_gitignore_semantics() -> None:
+    """
+    Test anchoring, directory only rules, `**` and negation order
+    """
+    rules = Rules.from_lines(["/top.txt", "build/", "docs/**/*.md", "**/tmp", "*.log", "!keep.log", "\\#lit"])
+    assert rules.match("top.txt", "top.txt", False) is True
+    assert rules.match("a/top.txt", "top.txt", False) is None
+    assert rules.match("a/build", "build", True) is True
+    assert rules.match("a/build", "build", False) is None
+    assert rules.match("docs/x/y/z.md", "z.md", False) is True
+    assert rules.match("docs/z.md", "z.md", False) is True
+    assert rules.match("a/b/tmp", "tmp", True) is True
+    assert rules.match("x/keep.log", "keep.log", False) is False
+    assert rules.match("#lit", "#lit", False) is True
+
+
+@pytest.mark.skipif(shutil.which("gitingest") is None, reason="gitingest is not installed")
+def test_matches_gitingest_output(tmp_path: pathlib.Path) -> None:
+    """
+    Test that the digest is byte for byte what gitingest writes for the
+    same project and excludes
+    """
+    project = _project(tmp_path / "demo")
+    os.unlink(project / "link.py")  # gitingest follows the link to read it
+    (project / "src" / ".gitignore").unlink()  # gitingest anchors nested rules differently
+    (project / ".gitignore").write_text("*.cache\n")  # and applies negations in set order
+    build_digest(project, tmp_path / "native.txt")
+    cmd = ["gitingest", str(project), "--output", str(tmp_path / "gitingest.txt")]
+    for pattern in CTX_EXCLUDES:
+        cmd += ["-e", pattern]
+    subprocess.run(cmd, check=True, capture_output=True, timeout=120)
+    assert (tmp_path / "native.txt").read_bytes() == (tmp_path / "gitingest.txt").read_bytes()
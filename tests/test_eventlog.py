@@ -0,0 +1,68 @@
+"""
+Hook Event Log Tests
+"""
+
+import json
+import pathlib
+
+from ctxflow.claude.hooks.utils.eventlog import (
+    EventLog,
+    append_event,
+    close_logs,
+    iter_events,
+    iter_hook_events,
+    migrate_legacy_log,
+    migrate_log_dir,
+)
+
+
+def test_append_and_stream(tmp_path: pathlib.Path) -> None:
+    """
+    Test that appended events stream back in order, one per line
+    """
+    with EventLog(tmp_path / "pre_tool_use.jsonl") as log:
+        for i in range(3):
+            log.append({"i": i, "text": "héllo\nworld"})
+    lines = (tmp_path / "pre_tool_use.jsonl").read_bytes().splitlines()
+    assert len(lines) == 3
+    assert [event["i"] for event in iter_events(tmp_path / "pre_tool_use.jsonl")] == [0, 1, 2]
+
+
+def test_torn_line_is_skipped(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a partially written line does not break the reader
+    """
+    path = tmp_path / "stop.jsonl"
+    path.write_text('{"a": 1}\n{"a": \n{"a": 2}\n')
+    assert [event["a"] for event in iter_events(path)] == [1, 2]
+
+
+def test_migrate_legacy_array(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a legacy JSON array log is migrated into a segment ahead of
+    newer events, leaving the live log untouched
+    """
+    legacy = tmp_path / "notification.json"
+    legacy.write_text(json.dumps([{"n": 0}, {"n": 1}], indent=2))
+    live = tmp_path / "notification.jsonl"
+    live.write_text('{"n": 2}\n')
+    inode = live.stat().st_ino
+
+    assert migrate_legacy_log(legacy) == 2
+    assert not legacy.exists()
+    assert (tmp_path / "notification.json.migrated").exists()
+    assert live.stat().st_ino == inode and live.read_text() == '{"n": 2}\n'
+    assert [e["n"] for e in iter_hook_events("notification", tmp_path)] == [0, 1, 2]
+    # second run is a no-op
+    assert migrate_legacy_log(legacy) == 0
+
+
+def test_append_event_migrates_first(tmp_path: pathlib.Path) -> None:
+    """
+    Test that the first append for a hook migrates its legacy log
+    """
+    (tmp_path / "post_tool_use.json").write_text(json.dumps([{"n": 0}]))
+    append_event("post_tool_use", {"n": 1}, tmp_path)
+    close_logs()
+    assert [e["n"] for e in iter_hook_events("post_tool_use", tmp_path)] == [0, 1]
+    assert migrate_log_dir(tmp_path) == {}
@@ -0,0 +1,79 @@
+"""
+Hook Daemon Tests
+"""
+
+import json
+import pathlib
+import socket
+import threading
+from typing import Iterator
+
+import pytest
+
+from ctxflow.claude.hooks.utils import hookd
+
+HOOKS_DIR = pathlib.Path(__file__).parent.parent / "ctxflow" / "claude" / "hooks"
+
+
+@pytest.fixture
+def server(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[hookd.HookServer]:
+    """
+    Run a hook daemon for a throwaway project on a background thread
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    path = hookd.socket_path(str(tmp_path))
+    path.parent.mkdir(parents=True)
+    srv = hookd.HookServer(path, HOOKS_DIR)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_no_daemon_falls_back(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the client reports no daemon so the hook runs in-process
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert hookd.send_request("pre_tool_use", b"{}", project_dir=str(tmp_path)) is None
+    assert not hookd.is_running(str(tmp_path))
+
+
+def test_daemon_serves_hooks(server: hookd.HookServer, tmp_path: pathlib.Path) -> None:
+    """
+    Test that the daemon blocks, allows and logs like the hook scripts
+    """
+    project = str(tmp_path)
+    assert hookd.is_running(project)
+
+    blocked = json.dumps({"tool_name": "Bash", "tool_input": {"command": "rm -rf /"}})
+    code, _, stderr = hookd.send_request("pre_tool_use", blocked.encode(), project_dir=project)
+    assert code == 2
+    assert "BLOCKED" in stderr
+
+    allowed = json.dumps({"tool_name": "Bash", "tool_input": {"command": "ls"}})
+    code, _, stderr = hookd.send_request("pre_tool_use", allowed.encode(), project_dir=project)
+    assert (code, stderr) == (0, "")
+    assert (tmp_path / "logs" / "pre_tool_use.jsonl").read_text().count("\n") == 1
+
+    code, _, _ = hookd.send_request("stop", b"{}", project_dir=project)
+    assert code == 1
+
+
+def test_hooks_with_arguments_run_in_the_client(server: hookd.HookServer, tmp_path: pathlib.Path) -> None:
+    """
+    Test that a hook with arguments is left to the client rather than run
+    by the daemon without them, and that the daemon refuses one sent anyway
+    """
+    project = str(tmp_path)
+    assert hookd.send_request("pre_tool_use", b"{}", ["--audit"], project_dir=project) is None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(hookd.socket_path(project)))
+        sock.sendall(json.dumps({"hook": "pre_tool_use", "argv": ["--audit"]}).encode() + b"\n{}")
+        sock.shutdown(socket.SHUT_WR)
+        response = json.loads(sock.makefile("rb").read())
+    assert response["code"] == 1 and "arguments" in response["stderr"]
+    assert not (tmp_path / "logs" / "pre_tool_use.jsonl").exists()
@@ -0,0 +1,124 @@
+"""
+Hook Environment Tests
+"""
+
+import json
+import os
+import pathlib
+import shutil
+import sys
+
+import pytest
+
+from ctxflow.claude.hooks.utils import hookenv
+
+SCRIPT = """#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = [{deps}]
+# ///
+print("hook")
+"""
+
+
+class FakeUv:
+    """ Stands in for uv: records calls, `venv` links the test interpreter. """
+
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def __call__(self, cmd: list, **kwargs) -> None:
+        self.calls.append(cmd[1:])
+        if cmd[1] == "venv":
+            bin_dir = pathlib.Path(cmd[2]) / "bin"
+            bin_dir.mkdir(parents=True)
+            os.symlink(sys.executable, bin_dir / "python")
+        elif cmd[1:3] == ["pip", "compile"]:
+            (kwargs["cwd"] / "requirements.lock").write_text("locked\n")
+
+    def venvs(self) -> int:
+        return sum(call[0] == "venv" for call in self.calls)
+
+
+@pytest.fixture
+def project(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    root = tmp_path / "project"
+    hooks = root / ".claude" / "hooks"
+    hooks.mkdir(parents=True)
+    (hooks / "stop.py").write_text(SCRIPT.format(deps=""))
+    (hooks / "notification.py").write_text(SCRIPT.format(deps=""))
+    (hooks / "hook_client.py").write_text("print('client')\n")
+    settings = {"hooks": {
+        "Stop": [{"hooks": [{"type": "command", "command": "uv run .claude/hooks/stop.py --chat"}]}],
+        "Notification": [{"hooks": [{"type": "command", "command": "uv run .claude/hooks/notification.py"}]}],
+        "PreToolUse": [{"matcher": "", "hooks": [
+            {"type": "command", "command": "python3 .claude/hooks/hook_client.py pre_tool_use"}]}],
+        "SubagentStop": [{"hooks": [{"type": "command", "command": "echo done"}]}],
+    }}
+    (root / ".claude" / "settings.json").write_text(json.dumps(settings))
+    return root
+
+
+def commands(root: pathlib.Path) -> dict:
+    settings = json.loads((root / ".claude" / "settings.json").read_text())
+    return {event: groups[0]["hooks"][0]["command"] for event, groups in settings["hooks"].items()}
+
+
+def test_warm_rewrites_commands_to_prebuilt_interpreters(project: pathlib.Path) -> None:
+    """
+    Test that hooks with the same metadata share one environment, that the
+    commands run its interpreter with the original arguments, and that
+    commands that aren't hook scripts are left alone
+    """
+    uv = FakeUv()
+    report = hookenv.warm_project(project, run=uv)
+
+    assert len(report.built) == 2 and report.rewritten == 3
+    assert report.skipped == ["echo done"]
+    shared = hookenv.env_python(hookenv.read_spec(project / ".claude" / "hooks" / "stop.py"))
+    warmed = commands(project)
+    assert warmed["Stop"] == f"{shared} .claude/hooks/stop.py --chat"
+    assert warmed["Notification"] == f"{shared} .claude/hooks/notification.py"
+    assert warmed["PreToolUse"].endswith(" .claude/hooks/hook_client.py pre_tool_use")
+    assert warmed["SubagentStop"] == "echo done"
+    assert shutil.which(warmed["PreToolUse"].split()[0])
+
+
+def test_rebuilds_only_when_dependencies_change(project: pathlib.Path) -> None:
+    """
+    Test that warming again reuses built environments, that a half built
+    environment or a dependency change rebuilds, and that the lock step runs
+    for scripts with dependencies
+    """
+    uv = FakeUv()
+    hookenv.warm_project(project, run=uv)
+    assert uv.venvs() == 2
+
+    report = hookenv.warm_project(project, run=uv)
+    assert uv.venvs() == 2 and len(report.reused) == 2 and report.rewritten == 0
+
+    stop = project / ".claude" / "hooks" / "stop.py"
+    (hookenv.env_dir(hookenv.read_spec(stop)) / hookenv.MARKER).unlink()
+    hookenv.warm_project(project, run=uv)
+    assert uv.venvs() == 3
+
+    stop.write_text(SCRIPT.format(deps='"requests"'))
+    report = hookenv.warm_project(project, run=uv)
+    assert uv.venvs() == 4 and report.rewritten == 1
+    assert [call[:2] for call in uv.calls[-2:]] == [["pip", "compile"], ["pip", "sync"]]
+    assert commands(project)["Stop"].startswith(str(hookenv.env_python(hookenv.read_spec(stop))))
+
+
+def test_unwarm_restores_original_commands(project: pathlib.Path) -> None:
+    """
+    Test that undoing restores the commands from before warming, even after
+    warming twice
+    """
+    before = commands(project)
+    hookenv.warm_project(project, run=FakeUv())
+    hookenv.warm_project(project, run=FakeUv())
+
+    assert hookenv.unwarm_project(project) == 3
+    assert commands(project) == before
+    assert hookenv.unwarm_project(project) == 0
@@ -0,0 +1,123 @@
+"""
+Session Index Tests
+"""
+
+import json
+import os
+import pathlib
+
+from ctxflow.claude.hooks.utils.eventlog import EventLog
+from ctxflow.claude.hooks.utils.index import SessionIndex
+
+
+def _log(log_dir: pathlib.Path, hook: str, *events: dict) -> None:
+    with EventLog(log_dir / f"{hook}.jsonl") as log:
+        for event in events:
+            log.append(event)
+
+
+def test_incremental_log_ingest(tmp_path: pathlib.Path) -> None:
+    """
+    Test that hook logs are ingested once and filtered by session and tool
+    """
+    logs = tmp_path / "logs"
+    _log(logs, "pre_tool_use",
+         {"session_id": "s1", "tool_name": "Bash", "cwd": "/p", "logged_at": 1.0},
+         {"session_id": "s1", "tool_name": "Read", "cwd": "/p", "logged_at": 2.0},
+         {"session_id": "s2", "tool_name": "Read", "cwd": "/q", "logged_at": 3.0})
+
+    with SessionIndex(tmp_path / "sessions.db") as index:
+        assert index.ingest_log_dir(logs) == 3
+        assert index.ingest_log_dir(logs) == 0
+        _log(logs, "pre_tool_use", {"session_id": "s2", "tool_name": "Bash", "logged_at": 4.0})
+        assert index.ingest_log_dir(logs) == 1
+
+        assert [r["session_id"] for r in index.list_sessions()] == ["s2", "s1"]
+        assert [r["session_id"] for r in index.list_sessions(cwd="/p")] == ["s1"]
+        assert [r["session_id"] for r in index.list_sessions(since=2.5)] == ["s2"]
+        assert [r["tool_name"] for r in index.get_events("s1")] == ["Bash", "Read"]
+        assert len(index.get_events("s2", tool_name="Bash")) == 1
+        assert index.resolve_session("s") is None
+        assert index.resolve_session("s1") == "s1"
+
+
+def test_replaced_log_is_ingested_again(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a log replaced under the same name takes the place of the
+    events ingested from it, rather than adding to them
+    """
+    logs = tmp_path / "logs"
+    _log(logs, "stop", *({"session_id": "s1", "n": i, "logged_at": float(i)} for i in range(3)))
+    with SessionIndex(tmp_path / "sessions.db") as index:
+        assert index.ingest_log_dir(logs) == 3
+        segment = (logs / "stop.jsonl").resolve()
+        replacement = segment.with_name("replacement")
+        replacement.write_text(json.dumps({"session_id": "s1", "n": 9, "logged_at": 9.0}) + "\n")
+        os.replace(replacement, segment)
+
+        assert index.ingest_log_dir(logs) == 1
+        assert [json.loads(r["payload"])["n"] for r in index.get_events("s1")] == [9]
+        assert index.list_sessions()[0]["event_count"] == 1
+
+
+def test_bad_timestamps_do_not_stop_the_ingest(tmp_path: pathlib.Path) -> None:
+    """
+    Test that an event with a non-numeric `logged_at` is indexed at the
+    time of the ingest instead of aborting it
+    """
+    logs = tmp_path / "logs"
+    _log(logs, "notification",
+         {"session_id": "s1", "logged_at": "yesterday"},
+         {"session_id": "s1", "logged_at": {"at": 1}},
+         {"session_id": "s1", "logged_at": 10 ** 400},
+         {"session_id": "s1", "logged_at": 5.0})
+    with SessionIndex(tmp_path / "sessions.db") as index:
+        assert index.ingest_log_dir(logs) == 4
+        assert sorted(r["ts"] for r in index.get_events("s1"))[0] == 5.0
+
+
+def test_incremental_transcript_ingest(tmp_path: pathlib.Path) -> None:
+    """
+    Test that transcript lines are ingested incrementally
+    """
+    transcript = tmp_path / "t.jsonl"
+    transcript.write_text(json.dumps({"type": "user"}) + "\n")
+    with SessionIndex(tmp_path / "sessions.db") as index:
+        assert index.ingest_transcript("s1", transcript) == 1
+        with open(transcript, "a") as f:
+            f.write(json.dumps({"type": "assistant"}) + "\n")
+        assert index.ingest_transcript("s1", transcript) == 1
+        assert [r["type"] for r in index.get_transcript("s1")] == ["user", "assistant"]
+        assert [r["line_no"] for r in index.get_transcript("s1", "assistant")] == [1]
+
+
+def test_stop_events_lead_to_their_transcript(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a transcript is found through the Stop event that names it
+    and ingested on demand for that session only
+    """
+    logs = tmp_path / "logs"
+    for session in ("s1", "s2"):
+        (tmp_path / f"{session}.jsonl").write_text(json.dumps({"type": "user"}) + "\n")
+        _log(logs, "stop", {"session_id": session, "transcript_path": str(tmp_path / f"{session}.jsonl"),
+                            "logged_at": 1.0})
+    with SessionIndex(tmp_path / "sessions.db") as index:
+        index.ingest_log_dir(logs)
+        assert index.ingest_transcripts("s1") == 1
+        assert len(list(index.get_transcript("s2"))) == 0
+        assert index.ingest_transcripts() == 1
+
+
+def test_queries_use_indexes(tmp_path: pathlib.Path) -> None:
+    """
+    Test that the session and event queries are served by indexes
+    """
+    with SessionIndex(tmp_path / "sessions.db") as index:
+        plans = [
+            "SELECT * FROM sessions ORDER BY last_seen DESC LIMIT 20",
+            "SELECT * FROM events WHERE session_id = 'x' ORDER BY ts",
+            "SELECT * FROM events WHERE tool_name = 'Bash' AND ts > 0",
+        ]
+        for sql in plans:
+            detail = " ".join(row[-1] for row in index.conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            assert "USING INDEX" in detail or "USING COVERING INDEX" in detail, detail
@@ -0,0 +1,147 @@
+"""
+LLM Provider Tests
+"""
+
+import http.client
+import http.server
+import json
+import threading
+import time
+
+from ctxflow.claude.hooks.utils.llm.prompts import parse_lines
+from ctxflow.claude.hooks.utils.llm.providers import (AnthropicProvider, LLMClient, LLMRules,
+                                                      StubProvider)
+
+
+def client(*providers: StubProvider, **rules) -> LLMClient:
+    return LLMClient(list(providers), LLMRules(order=[p.name for p in providers], **rules))
+
+
+def test_hedge_and_failover() -> None:
+    """
+    Test that a slow provider is hedged by the next one after the threshold,
+    that a failing one hands over at once, and that the deadline bounds the
+    call when nobody answers
+    """
+    slow = StubProvider("slow answer", delay=1.0, name="slow")
+    fast = StubProvider("fast answer", name="fast")
+    started = time.monotonic()
+    assert client(slow, fast, hedge_after=0.05).complete("hi") == "fast answer"
+    assert time.monotonic() - started < 0.5
+    assert (slow.calls, fast.calls) == (1, 1)
+
+    broken = StubProvider(fail=True, name="broken")
+    started = time.monotonic()
+    assert client(broken, StubProvider("backup", name="backup"), hedge_after=5).complete("hi") == "backup"
+    assert time.monotonic() - started < 0.5
+
+    started = time.monotonic()
+    stuck = client(StubProvider(delay=2, name="a"), StubProvider(delay=2, name="b"), hedge_after=0.01)
+    assert stuck.complete("hi", deadline=0.2) is None
+    assert time.monotonic() - started < 0.5
+
+
+def test_circuit_breaker() -> None:
+    """
+    Test that a provider is skipped after repeated failures and gets one
+    trial request once the cooldown has passed
+    """
+    flaky = StubProvider(fail=True, name="flaky")
+    backup = StubProvider("backup", name="backup")
+    llm = client(flaky, backup, breaker_failures=2, breaker_cooldown=0.1)
+    for _ in range(4):
+        assert llm.complete("hi") == "backup"
+    assert flaky.calls == 2
+    assert llm.breakers["flaky"].state == "open"
+
+    time.sleep(0.15)
+    flaky.fail, flaky.reply = False, "recovered"
+    assert llm.complete("hi") == "recovered"
+    assert llm.breakers["flaky"].state == "closed"
+
+
+def test_http_provider_reuses_connection() -> None:
+    """
+    Test that consecutive requests go over one kept-alive connection and
+    that list markers are stripped from batched answers
+    """
+    peers = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            peers.append(self.client_address)
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            assert self.headers["x-api-key"] == "test"
+            body = json.dumps({"content": [{"text": f"1. {request['messages'][0]['content']}\n- Done!"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    class LocalAnthropic(AnthropicProvider):
+        host = f"127.0.0.1:{server.server_address[1]}"
+        connection_class = http.client.HTTPConnection
+
+    try:
+        provider = LocalAnthropic(api_key="test")
+        llm = LLMClient([provider], LLMRules(order=["anthropic"]))
+        assert parse_lines(llm.complete("first")) == ["first", "Done!"]
+        assert parse_lines(llm.complete("second")) == ["second", "Done!"]
+        assert len(peers) == 2 and peers[0] == peers[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_stale_keepalive_connection_is_retried() -> None:
+    """
+    Test that a kept-alive connection the server dropped while it sat idle
+    is replaced by a fresh one without failing the call or counting
+    against the circuit breaker
+    """
+    peers = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            peers.append(self.client_address)
+            self.rfile.read(int(self.headers["Content-Length"]))
+            body = json.dumps({"content": [{"text": "Done!"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            # hang up without announcing it, as an idle timeout does
+            self.close_connection = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    class LocalAnthropic(AnthropicProvider):
+        host = f"127.0.0.1:{server.server_address[1]}"
+        connection_class = http.client.HTTPConnection
+
+    try:
+        provider = LocalAnthropic(api_key="test")
+        llm = LLMClient([provider], LLMRules(order=["anthropic"], breaker_failures=1))
+        for _ in range(3):
+            assert llm.complete("again") == "Done!"
+            time.sleep(0.05)
+        assert len(peers) == 3 and len(set(peers)) == 3
+        assert llm.breakers["anthropic"].state == "closed"
+        assert llm.breakers["anthropic"].consecutive == 0
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,82 @@
+"""
+Hook Matcher Tests
+"""
+
+import copy
+import json
+import pathlib
+
+import pytest
+
+from ctxflow.claude.hooks.utils import matchers, settings
+
+HOOKS_DIR = pathlib.Path(__file__).parent.parent / "ctxflow" / "claude" / "hooks"
+SHIPPED = json.loads((HOOKS_DIR.parent / "settings.json").read_text())
+
+
+@pytest.fixture
+def audit_home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    def configure(mode: str, sample: float = 0.0) -> None:
+        (tmp_path / ".ctxflow").mkdir(exist_ok=True)
+        (tmp_path / ".ctxflow" / "settings.json").write_text(
+            json.dumps({"hooks": {"audit": mode, "audit_sample": sample}}))
+        settings.load_settings(reload=True)
+
+    yield configure
+    settings.load_settings(reload=True)
+
+
+def test_shipped_matchers_are_scoped_and_cover_the_policy() -> None:
+    """
+    Test that the shipped settings already carry the generated matchers and
+    that the pre tool use hook declares every tool a policy rule applies to
+    """
+    generated = copy.deepcopy(SHIPPED)
+    assert matchers.apply_matchers(generated, HOOKS_DIR, audit="off") == 0
+    assert generated == SHIPPED
+
+    declared = matchers.hook_tools(HOOKS_DIR / "pre_tool_use.py")
+    rules = json.loads((HOOKS_DIR / "policy_rules.json").read_text())["rules"]
+    assert {tool for rule in rules for tool in rule["tools"]} <= set(declared)
+    # the post tool use log keeps every tool call
+    assert matchers.hook_tools(HOOKS_DIR / "post_tool_use.py") is None
+    assert SHIPPED["hooks"]["PostToolUse"][0]["matcher"] == ""
+
+
+def test_matchers_follow_warmed_commands_and_audit_mode() -> None:
+    """
+    Test that warmed commands are still traced to their hook, that auditing
+    widens the tool matchers to every tool and leaves other events alone
+    """
+    project = copy.deepcopy(SHIPPED)
+    for group in project["hooks"]["PreToolUse"]:
+        group["matcher"] = ""
+        group["hooks"][0]["command"] = "/envs/abc/bin/python .claude/hooks/pre_tool_use.py"
+    assert matchers.apply_matchers(project, HOOKS_DIR, audit="off") == 1
+    assert project["hooks"]["PreToolUse"][0]["matcher"] == "Read|Edit|MultiEdit|Write|Bash"
+
+    assert matchers.apply_matchers(project, HOOKS_DIR, audit="sampled") == 1
+    assert all(project["hooks"][event][0]["matcher"] == "" for event in matchers.TOOL_EVENTS)
+    assert project["hooks"]["Stop"] == SHIPPED["hooks"]["Stop"]
+
+
+def test_undeclared_tools_are_sampled(audit_home) -> None:
+    """
+    Test that declared tools are always handled and other tools only as the
+    audit mode allows
+    """
+    tools = ("Bash",)
+    audit_home("off")
+    assert matchers.should_audit("Bash", tools)
+    assert not matchers.should_audit("Glob", tools)
+    assert matchers.should_audit("Glob", None)
+
+    audit_home("sampled", 0.0)
+    assert not any(matchers.should_audit("Glob", tools) for _ in range(100))
+    audit_home("sampled", 1.0)
+    assert all(matchers.should_audit("Glob", tools) for _ in range(100))
+
+    audit_home("full")
+    assert matchers.should_audit("Glob", tools)
@@ -0,0 +1,64 @@
+"""
+Message Pool Tests
+"""
+
+import pathlib
+
+import pytest
+
+from ctxflow.claude.hooks.utils import message_pool, settings
+
+
+@pytest.fixture
+def pool_home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> list:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("ENGINEER_NAME", raising=False)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    settings.load_settings(reload=True)
+    spawned: list = []
+    monkeypatch.setattr(message_pool, "spawn_module", lambda *args: spawned.append(args))
+    yield spawned
+    settings.load_settings(reload=True)
+
+
+def test_one_request_fills_the_pool(pool_home: list) -> None:
+    """
+    Test that a refill makes one batched request, drops duplicates and
+    overlong lines, and that messages are then served without any request
+    """
+    requests = []
+
+    def generate(count: int) -> list:
+        requests.append(count)
+        return [f"Task {i} is done!" for i in range(count)] + ["Task 0 is done!", "word " * 40]
+
+    assert message_pool.refill(generate) == 40
+    assert requests == [40]
+    assert message_pool.refill(generate) == 0
+
+    served = {message_pool.take_message() for _ in range(30)}
+    assert len(served) == 30 and requests == [40]
+    assert pool_home == []
+
+    message_pool.take_message()
+    assert pool_home == [("message_pool", "refill")]
+
+
+def test_pool_follows_engineer_name(pool_home: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that an empty pool returns None and asks for a refill (only with
+    an LLM configured), and that a pool written for another name is not
+    served
+    """
+    assert message_pool.take_message() is None
+    assert pool_home == [("message_pool", "refill")]
+    monkeypatch.delenv("ANTHROPIC_API_KEY")
+    message_pool.take_message()
+    assert len(pool_home) == 1
+
+    monkeypatch.setenv("ENGINEER_NAME", "Ada")
+    message_pool.refill(lambda count: ["Ada, your agent is all set!"], force=True)
+    assert message_pool.load_pool()["messages"] == ["Ada, your agent is all set!"]
+
+    monkeypatch.setenv("ENGINEER_NAME", "Grace")
+    assert message_pool.take_message() is None
@@ -0,0 +1,62 @@
+"""
+Hook Metrics Tests
+"""
+
+import pathlib
+import time
+
+import pytest
+
+from ctxflow.claude.hooks.utils.eventlog import EventLog, iter_events
+from ctxflow.claude.hooks.utils.metrics import HookTimer, percentile, phase, summarize
+
+
+def test_timer_records_phases_and_exit_code(tmp_path: pathlib.Path) -> None:
+    """
+    Test that phases are recorded inside a timer, ignored outside of one,
+    and that the exit code is taken from SystemExit
+    """
+    with phase("ignored"):
+        pass
+    sink = EventLog(tmp_path / "hooks.jsonl")
+    with pytest.raises(SystemExit):
+        with HookTimer("pre_tool_use", sink=sink):
+            with phase("parse"):
+                pass
+            with phase("policy"):
+                pass
+            raise SystemExit(2)
+
+    (record,) = list(iter_events(tmp_path / "hooks.jsonl"))
+    assert record["hook"] == "pre_tool_use" and record["code"] == 2
+    assert set(record["phases"]) == {"parse", "policy"}
+    assert record["total_ms"] >= sum(record["phases"].values())
+
+
+def test_timer_counts_imports_from_the_start_time(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a timer given the time the hook started loading counts its
+    total from then and records the time before the timer as "import"
+    """
+    sink = EventLog(tmp_path / "hooks.jsonl")
+    started_ns = time.perf_counter_ns() - 50_000_000
+    with HookTimer("stop", sink=sink, started_ns=started_ns):
+        pass
+
+    (record,) = list(iter_events(tmp_path / "hooks.jsonl"))
+    assert record["phases"]["import"] >= 50
+    assert record["total_ms"] >= record["phases"]["import"]
+
+
+def test_summarize_percentiles() -> None:
+    """
+    Test percentiles per hook and per phase
+    """
+    records = [{"hook": "stop", "via": "process", "total_ms": float(ms),
+                "phases": {"tts": float(ms) - 1}} for ms in range(1, 101)]
+    rows = {row["phase"]: row for row in summarize(records)}
+    assert rows["total"]["count"] == 100
+    assert rows["total"]["p50"] == pytest.approx(50.5)
+    assert rows["total"]["p99"] == pytest.approx(99.01)
+    assert rows["tts"]["max"] == 99
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,41 @@
+"""
+Phrases Tests
+"""
+
+import pathlib
+
+from ctxflow.claude.hooks.utils.tts.audio_cache import AudioCache
+from ctxflow.claude.hooks.utils.tts.phrases import (CRASH_MESSAGE, NOTIFICATION_MESSAGE, personalize,
+                                                    segments, static_phrases)
+from ctxflow.claude.hooks.utils.tts.prefetch import FakeBackend, prefetch
+
+
+def test_segments() -> None:
+    """
+    Test that personalized messages split into a name clip and the phrase
+    clip around it, and that other messages are left whole
+    """
+    assert personalize(CRASH_MESSAGE, "Ada") == "Ada, looks like your agent crashed"
+    assert personalize(CRASH_MESSAGE, "") == CRASH_MESSAGE
+    assert segments("Ada, looks like your agent crashed", "Ada") == ["Ada", "looks like your agent crashed"]
+    assert segments("Your agent is ready for you, ada!", "Ada") == ["Your agent is ready for you", "ada"]
+    assert segments("Adam is done", "Ada") == ["Adam is done"]
+    assert segments("Ada, done", None) == ["Ada, done"]
+
+
+def test_personalized_messages_hit_cache(tmp_path: pathlib.Path, monkeypatch) -> None:
+    """
+    Test that after prefetching, every segment of a personalized message is
+    cached
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("ENGINEER_NAME", "Ada")
+    backend = FakeBackend()
+    with AudioCache(tmp_path / "cache.db", tmp_path / "audio") as cache:
+        prefetch(cache, backend)
+        assert "Ada" in static_phrases("Ada")
+        for message in (personalize(NOTIFICATION_MESSAGE, "Ada"), personalize(CRASH_MESSAGE, "Ada")):
+            for part in segments(message, "Ada"):
+                clip = cache.get(part, **backend.voice)
+                assert clip is not None, part
+        assert cache.stats()["misses"] == 0
@@ -0,0 +1,105 @@
+"""
+Player Tests
+"""
+
+import pathlib
+import sys
+
+import pytest
+
+from ctxflow.claude.hooks.utils.tts.audio_cache import AudioCache
+from ctxflow.claude.hooks.utils.tts.phrases import CRASH_MESSAGE, personalize
+from ctxflow.claude.hooks.utils.tts.player import FfplayPlayer, FileSinkPlayer, Player, open_player, speak
+from ctxflow.claude.hooks.utils.tts.prefetch import FakeBackend
+
+
+class SlowBackend(FakeBackend):
+    """ Yields its first chunk right away and the rest after a pause. """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.ticks = []
+
+    def synthesize(self, text: str):
+        chunks = super().synthesize(text)
+        yield chunks[0]
+        self.ticks.append("first chunk out")
+        yield from chunks[1:]
+
+
+def test_stream_plays_and_caches(tmp_path: pathlib.Path) -> None:
+    """
+    Test that audio reaches the player while synthesis is still running,
+    that the clip is cached once the stream ends, and that a second play
+    comes from the cache with the same bytes
+    """
+    sink = tmp_path / "out.mp3"
+    backend = SlowBackend()
+    with AudioCache(tmp_path / "cache.db", tmp_path / "audio") as cache:
+        class Watching(FileSinkPlayer):
+            def feed(self, chunk: bytes) -> None:
+                # the first chunk is fed before the backend produced the rest
+                if not self.bytes_played:
+                    assert backend.ticks == []
+                    assert not cache.contains("Job complete!", **backend.voice)
+                super().feed(chunk)
+
+        with Watching(str(sink)) as player:
+            first = speak(cache, backend, "Job complete!", player, name="")
+        assert first is not None and first < 1.0
+        assert cache.contains("Job complete!", **backend.voice)
+        played = sink.read_bytes()
+
+        with FileSinkPlayer(str(tmp_path / "again.mp3")) as player:
+            speak(cache, backend, "Job complete!", player, name="")
+        assert (tmp_path / "again.mp3").read_bytes() == played
+        assert backend.calls == ["Job complete!"]
+
+
+def test_segments_play_back_to_back(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a personalized message is played as its segments in order
+    through one player
+    """
+    backend = FakeBackend()
+    with AudioCache(tmp_path / "cache.db", tmp_path / "audio") as cache:
+        player = Player()
+        speak(cache, backend, personalize(CRASH_MESSAGE, "Ada"), player, name="Ada")
+        assert backend.calls == ["Ada", "looks like your agent crashed"]
+        assert player.clips == 2
+        assert player.bytes_played == sum(len(b"".join(backend.synthesize(t))) for t in ("Ada", CRASH_MESSAGE))
+
+
+def test_open_player(tmp_path: pathlib.Path) -> None:
+    """
+    Test that players are chosen by spec string
+    """
+    assert type(open_player("null")) is Player
+    with open_player(f"file:{tmp_path / 'sink.mp3'}") as player:
+        assert isinstance(player, FileSinkPlayer)
+    with pytest.raises(ValueError):
+        open_player("speakers")
+
+
+def test_wav_clips_get_a_player_of_their_own(tmp_path: pathlib.Path) -> None:
+    """
+    Test that MP3 clips share one ffplay while a WAV clip in the same queue
+    is played whole by its own, after the clips queued before it
+    """
+    heard = tmp_path / "heard"
+    heard.mkdir()
+
+    class Recording(FfplayPlayer):
+        # stands in for ffplay: records everything one process was fed
+        command = [sys.executable, "-c",
+                   "import os, sys, time; data = sys.stdin.buffer.read(); "
+                   f"open(os.path.join({str(heard)!r}, str(time.time_ns())), 'wb').write(data)"]
+
+    with Recording() as player:
+        player.play([b"ID3one"])
+        player.play([b"ID3two"])
+        player.play([b"RIFF", b"wave"])
+        player.play([b"ID3three"])
+    played = [path.read_bytes() for path in sorted(heard.iterdir(), key=lambda p: int(p.name))]
+    assert played == [b"ID3oneID3two", b"RIFFwave", b"ID3three"]
+    assert player.clips == 4
@@ -0,0 +1,153 @@
+"""
+Pre Tool Use Policy Engine Tests
+"""
+
+import json
+import pathlib
+
+import pytest
+
+from ctxflow.claude.hooks.utils.policy import RULES_FILE, load_policy, split_commands
+
+POLICY = load_policy()
+
+
+def _bash(command: str) -> str:
+    violation = POLICY.check("Bash", {"command": command})
+    return violation.rule_id if violation else ""
+
+
+def test_rules_file_is_the_default() -> None:
+    """
+    Test that the engine loads the shipped rules file by default
+    """
+    rules = json.loads(RULES_FILE.read_text())["rules"]
+    assert [rule.id for rule in POLICY.rules] == [rule["id"] for rule in rules]
+
+
+@pytest.mark.parametrize("text", [None, "{not json", '{"rules": [{"id": "x", "type": "nope"}]}', "[]"])
+def test_unloadable_rules_fail_closed(tmp_path: pathlib.Path, text: str) -> None:
+    """
+    Test that a missing or invalid rules file blocks every guarded tool
+    """
+    path = tmp_path / "policy_rules.json"
+    if text is not None:
+        path.write_text(text)
+    policy = load_policy(path)
+    for tool_name, tool_input in [("Bash", {"command": "ls"}), ("Read", {"file_path": "README.md"})]:
+        violation = policy.check(tool_name, tool_input)
+        assert violation is not None and violation.rule_id == "policy-unavailable"
+    assert policy.check("Glob", {"pattern": "*"}) is None
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "rm -rf /",
+        "rm -fr build",
+        "rm -R dist",
+        "rm --recursive --force node_modules",
+        "ls && rm -r tmp",
+        "echo hi; sudo -u root rm -rf ~",
+        "find . -name x | xargs rm -rf",
+        "(cd /tmp && /bin/rm -rf foo)",
+        'echo "$(rm -rf ~)"',
+        "if true; then rm -rf x; fi",
+        "FOO=1 rm -r bar",
+        'bash -c "rm -rf /"',
+        "sh -c 'rm -rf ~'",
+        "bash -lc 'cd /tmp; rm -r x'",
+        'eval "rm -rf /"',
+        "find . -exec rm -rf {} \\;",
+        "find . -type d -execdir rm -r {} +",
+        "timeout 5 rm -rf /",
+        "timeout -s KILL 5 rm -rf /",
+        "stdbuf -o0 rm -rf /",
+        "ionice rm -rf x",
+        "chroot /mnt rm -rf /",
+        "setsid rm -rf x",
+        "flock /tmp/lock rm -rf x",
+        "flock /tmp/lock -c 'rm -rf x'",
+        "watch -n 1 rm -rf x",
+        "sudo bash -c 'eval \"rm -rf /\"'",
+        "ls # it's fine\nrm -rf /",
+        "echo '#' && rm -rf /",
+    ],
+)
+def test_dangerous_rm_blocked(command: str) -> None:
+    """
+    Test that recursive rm is blocked wherever it appears in a command
+    """
+    assert _bash(command) == "dangerous-rm"
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "rm file.txt",
+        "rm -f file.txt",
+        "git rm --cached foo-bar",
+        "echo 'rm -rf /'",
+        "grep -r 'rm -rf' .",
+        "cat <<'EOF'\nrm -rf /\ncat .env\nEOF",
+        "bash -c 'rm -f x'",
+        "bash script.sh -c 'rm -rf /'",
+        "find . -name '*.pyc' -exec rm -f {} \\;",
+        "timeout 5 ls -R",
+        "case $x in a) ls ;; esac",
+        "echo hi # don't worry",
+        "git commit -m 'fix' # it's fine",
+        "ls # rm -rf /\npwd",
+        "echo a#b 'c'",
+    ],
+)
+def test_safe_commands_allowed(command: str) -> None:
+    """
+    Test that quoted text, comments, heredoc bodies and non-recursive rm
+    pass
+    """
+    assert _bash(command) == ""
+
+
+@pytest.mark.parametrize(
+    "command",
+    ["cat .env", "cp .env.sample .env", "echo X=1 >> .env.local", "source config/prod.env"],
+)
+def test_env_file_bash_blocked(command: str) -> None:
+    """
+    Test that Bash access to .env files is blocked
+    """
+    assert _bash(command) == "env-file-access"
+
+
+@pytest.mark.parametrize(
+    "command",
+    ["echo 'rm -rf /", 'bash -c "rm -rf /', "echo $(rm -rf /", "echo `ls", "sh -c 'echo \"'"],
+)
+def test_unparseable_command_blocked(command: str) -> None:
+    """
+    Test that a command the engine cannot tokenize is blocked
+    """
+    assert _bash(command) == "unparseable-command"
+
+
+def test_env_file_tools() -> None:
+    """
+    Test that file tools are blocked on .env but allowed on .env.sample
+    """
+    assert POLICY.check("Read", {"file_path": "/repo/.env"}) is not None
+    assert POLICY.check("Edit", {"file_path": "/repo/.env.production"}) is not None
+    assert POLICY.check("Write", {"file_path": "/repo/.env.sample"}) is None
+    assert POLICY.check("Read", {"file_path": "/repo/README.md"}) is None
+    assert POLICY.check("Glob", {"pattern": ".env"}) is None
+    assert _bash("cat .env.sample") == ""
+
+
+def test_split_commands_skips_heredoc() -> None:
+    """
+    Test that heredoc bodies are skipped and the command after them is seen
+    """
+    body = "x\n" * 10_000
+    commands = split_commands(f"cat <<EOF > out.txt\n{body}EOF\nls -la")
+    assert [c.words for c in commands] == [["cat"], ["ls", "-la"]]
+    assert commands[0].redirects == ["out.txt"]
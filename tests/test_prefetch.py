@@ -0,0 +1,62 @@
+"""
+Prefetch Tests
+"""
+
+import pathlib
+import threading
+
+import pytest
+
+from ctxflow.claude.hooks.utils.tts.audio_cache import AudioCache
+from ctxflow.claude.hooks.utils.tts.phrases import static_phrases
+from ctxflow.claude.hooks.utils.tts.prefetch import FakeBackend, prefetch
+
+
+@pytest.fixture
+def cache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("ENGINEER_NAME", raising=False)
+    with AudioCache(tmp_path / "cache.db", tmp_path / "audio") as audio_cache:
+        yield audio_cache
+
+
+def test_prefetch_fills_cache_once(cache: AudioCache) -> None:
+    """
+    Test that every static phrase is synthesized once and a second run is
+    served entirely from the cache
+    """
+    backend = FakeBackend()
+    report = prefetch(cache, backend)
+    phrases = static_phrases()
+    assert (report.total, report.synthesized, report.cached, report.failed) == (len(phrases), len(phrases), 0, {})
+    assert all(cache.contains(text, **backend.voice) for text in phrases)
+    assert cache.stats()["hits"] == 0
+
+    again = prefetch(cache, FakeBackend())
+    assert (again.cached, again.synthesized) == (len(phrases), 0)
+
+
+def test_prefetch_bounds_concurrency(cache: AudioCache) -> None:
+    """
+    Test that no more than `concurrency` phrases are synthesized at once and
+    that failures are reported per phrase
+    """
+    active, peak, lock = [0], [0], threading.Lock()
+
+    class Counting(FakeBackend):
+        def synthesize(self, text: str):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                if text == "boom":
+                    raise RuntimeError("quota exceeded")
+                return super().synthesize(text)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+    report = prefetch(cache, Counting(delay=0.02), [f"phrase {i}" for i in range(12)] + ["boom"], concurrency=3)
+    assert peak[0] <= 3
+    assert report.synthesized == 12
+    assert report.failed == {"boom": "quota exceeded"}
@@ -0,0 +1,80 @@
+"""
+Preflight Tests
+"""
+
+import os
+import pathlib
+import shutil
+import time
+
+import pytest
+
+from ctxflow import preflight
+
+VERSIONS = {"opencode": "0.5.1", "claude": "1.0.80 (Claude Code)", "browsr": "browsr, version 1.21.0",
+            "ffmpeg": "ffmpeg version 6.1.1 Copyright (c) 2000-2023"}
+
+
+@pytest.fixture
+def toolchain(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """ Fake tools that take half a second to answer and count how often they are asked. """
+    sleep = shutil.which("sleep")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in VERSIONS:
+        script = bin_dir / name
+        script.write_text(f"#!/bin/sh\necho x >> {tmp_path / name}.calls\n{sleep} 0.5\n"
+                          f"echo '{VERSIONS[name]}'\n")
+        script.chmod(0o755)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("PATH", str(bin_dir))
+    return tmp_path
+
+
+def _calls(home: pathlib.Path, name: str) -> int:
+    path = home / f"{name}.calls"
+    return len(path.read_text().splitlines()) if path.exists() else 0
+
+
+def test_tools_are_probed_concurrently_then_cached(toolchain: pathlib.Path) -> None:
+    """
+    Test that the first check asks every tool at once and parses its
+    version, and that the next one answers from the cache without running
+    any of them
+    """
+    start = time.perf_counter()
+    statuses = preflight.check()
+    assert time.perf_counter() - start < 1.5
+    assert all(status.ok and not status.cached for status in statuses.values())
+    assert {name: status.version for name, status in statuses.items()} == {
+        "opencode": "0.5.1", "claude": "1.0.80", "browsr": "1.21.0", "ffmpeg": "6.1.1"}
+
+    start = time.perf_counter()
+    again = preflight.check()
+    assert time.perf_counter() - start < 0.2
+    assert all(status.cached for status in again.values())
+    assert {name: status.version for name, status in again.items()} == \
+        {name: status.version for name, status in statuses.items()}
+    assert all(_calls(toolchain, name) == 1 for name in VERSIONS)
+
+
+def test_changed_and_missing_binaries(toolchain: pathlib.Path) -> None:
+    """
+    Test that upgrading a binary re-probes only that one, that a missing
+    tool is reported rather than raised, and that a failing probe is not
+    cached
+    """
+    preflight.check()
+    claude = toolchain / "bin" / "claude"
+    claude.write_text("#!/bin/sh\necho x >> " + str(toolchain / "claude.calls") + "\necho 'claude 2.0.0'\n")
+    os.utime(claude, ns=(time.time_ns(), time.time_ns() + 10**9))
+    (toolchain / "bin" / "browsr").unlink()
+    (toolchain / "bin" / "ffmpeg").write_text("#!/bin/sh\nexit 3\n")
+
+    statuses = preflight.check()
+    assert statuses["claude"].version == "2.0.0" and not statuses["claude"].cached
+    assert statuses["opencode"].cached and _calls(toolchain, "opencode") == 1
+    assert not statuses["browsr"].found and statuses["browsr"].error == "not found on PATH"
+    assert statuses["ffmpeg"].found and not statuses["ffmpeg"].ok
+    assert "ffmpeg" not in preflight.load_cache()
+    assert list(preflight.check(["claude"])) == ["claude"]
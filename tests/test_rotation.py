@@ -0,0 +1,114 @@
+"""
+Hook Event Log Rotation Tests
+"""
+
+import pathlib
+import threading
+
+from ctxflow.claude.hooks.utils.eventlog import (
+    EventLog,
+    RotationPolicy,
+    active_segment,
+    iter_hook_events,
+    list_segments,
+    maintain_segments,
+)
+from ctxflow.claude.hooks.utils.index import SessionIndex
+
+
+def _fill(path: pathlib.Path, count: int, policy: RotationPolicy) -> None:
+    log = EventLog(path, policy)
+    log._spawn_maintenance = lambda: None  # type: ignore[method-assign]
+    with log:
+        for i in range(count):
+            log.append({"session_id": "s1", "i": i, "pad": "x" * 100})
+
+
+def test_rotates_by_size(tmp_path: pathlib.Path) -> None:
+    """
+    Test that the active segment is sealed at the size limit and that the
+    reader chains every segment in order
+    """
+    path = tmp_path / "post_tool_use.jsonl"
+    _fill(path, 50, RotationPolicy(max_bytes=1024, compress=False))
+
+    segments = list_segments("post_tool_use", tmp_path)
+    assert len(segments) > 5
+    assert path.is_symlink() and active_segment("post_tool_use", tmp_path) == segments[-1].resolve()
+    assert all(s.stat().st_size <= 1024 for s in segments)
+    assert [e["i"] for e in iter_hook_events("post_tool_use", tmp_path)] == list(range(50))
+
+
+def test_plain_log_is_adopted(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a log written before rotation existed becomes the first segment
+    """
+    path = tmp_path / "stop.jsonl"
+    path.write_text('{"i": -1}\n')
+    _fill(path, 2, RotationPolicy(max_bytes=1 << 20))
+
+    assert path.is_symlink()
+    assert len(list_segments("stop", tmp_path)) == 2
+    assert [e["i"] for e in iter_hook_events("stop", tmp_path)] == [-1, 0, 1]
+
+
+def test_compressed_segments_are_read_and_indexed_once(tmp_path: pathlib.Path) -> None:
+    """
+    Test that gzipped segments stream back transparently and that the index
+    neither loses nor duplicates events when a segment is compressed
+    """
+    path = tmp_path / "pre_tool_use.jsonl"
+    policy = RotationPolicy(max_bytes=1024, compress=True)
+    _fill(path, 20, policy)
+
+    index = SessionIndex(tmp_path / "sessions.db")
+    first = index.ingest_log_dir(tmp_path)
+    maintain_segments("pre_tool_use", tmp_path, policy, grace=0)
+    segments = list_segments("pre_tool_use", tmp_path)
+    assert all(s.name.endswith(".gz") for s in segments[:-1])
+    assert [e["i"] for e in iter_hook_events("pre_tool_use", tmp_path)] == list(range(20))
+
+    _fill(path, 3, policy)
+    second = index.ingest_log_dir(tmp_path)
+    assert (first, second) == (20, 3)
+    assert index.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 23
+    index.close()
+
+
+def test_threads_rotate_while_appending(tmp_path: pathlib.Path) -> None:
+    """
+    Test that threads sharing one log lose no event while they rotate it
+    and another thread keeps closing its descriptor
+    """
+    log = EventLog(tmp_path / "post_tool_use.jsonl", RotationPolicy(max_bytes=2048, compress=False))
+    log._spawn_maintenance = lambda: None  # type: ignore[method-assign]
+    errors = []
+    done = threading.Event()
+
+    def writer(t: int) -> None:
+        try:
+            for i in range(200):
+                log.append({"t": t, "i": i, "pad": "x" * 50})
+        except Exception as e:
+            errors.append(e)
+
+    def closer() -> None:
+        while not done.is_set():
+            log.close()
+
+    writers = [threading.Thread(target=writer, args=(t,)) for t in range(4)]
+    churn = threading.Thread(target=closer)
+    churn.start()
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    churn.join()
+    log.close()
+
+    assert errors == []
+    events = list(iter_hook_events("post_tool_use", tmp_path))
+    assert len(list_segments("post_tool_use", tmp_path)) > 10
+    for t in range(4):
+        assert [e["i"] for e in events if e["t"] == t] == list(range(200))
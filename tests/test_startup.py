@@ -0,0 +1,74 @@
+"""
+CLI Startup Tests
+"""
+
+import os
+import pathlib
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+pytest.importorskip("click")
+pytest.importorskip("rich_click")
+
+REPO = pathlib.Path(__file__).parent.parent
+
+HEAVY = ("fitz", "PIL", "InquirerPy", "rich_pixels", "textual_universal_directorytree", "ctxflow.runner")
+
+
+def _import_times(stderr: str) -> Dict[str, int]:
+    """ Cumulative microseconds per module from `-X importtime` output. """
+    times: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_help_imports_no_subcommand(tmp_path: pathlib.Path) -> None:
+    """
+    Test that `ctx --help` lists every subcommand without importing them,
+    their heavy dependencies or probing `opencode --version`, and that the
+    cli module loads within its import time budget
+    """
+    marker = tmp_path / "probed"
+    fake = tmp_path / "bin" / "opencode"
+    fake.parent.mkdir()
+    fake.write_text(f"#!/bin/sh\ntouch {marker}\necho 0.0.0\n")
+    fake.chmod(0o755)
+    env = {**os.environ, "PATH": f"{fake.parent}{os.pathsep}{os.environ.get('PATH', '')}",
+           "PYTHONPATH": str(REPO)}
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "ctxflow", "--help"],
+                            capture_output=True, text=True, env=env, cwd=tmp_path, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert not marker.exists()
+
+    from ctxflow.cli import COMMANDS
+
+    assert all(name in result.stdout for name in COMMANDS)
+    times = _import_times(result.stderr)
+    assert not [name for name in times if name.split(".")[0] in HEAVY or name in HEAVY]
+    assert not [name for name in times if name.startswith("ctxflow.commands.")]
+    assert times["ctxflow.cli"] < 150_000
+
+
+def test_registry_help_matches_commands() -> None:
+    """
+    Test that the one line help `ctx` lists for a subcommand is the help of
+    the command it loads
+    """
+    import click
+
+    from ctxflow.cli import COMMANDS, ctx
+
+    with click.Context(ctx) as cli_ctx:
+        for name, (_, short_help) in COMMANDS.items():
+            command = ctx.get_command(cli_ctx, name)
+            assert command is not None and command.name == name
+            assert (command.help or "").split("\f")[0].strip().splitlines()[0] == short_help
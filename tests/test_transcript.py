@@ -0,0 +1,64 @@
+"""
+Incremental Transcript Export Tests
+"""
+
+import json
+import pathlib
+
+from ctxflow.claude.hooks.utils.transcript import TranscriptExporter, iter_export
+
+
+def _write(path: pathlib.Path, *messages: str, newline: bool = True) -> None:
+    with open(path, "a") as f:
+        for i, message in enumerate(messages):
+            f.write(json.dumps({"message": message}))
+            if newline or i < len(messages) - 1:
+                f.write("\n")
+
+
+def test_only_new_lines_are_exported(tmp_path: pathlib.Path) -> None:
+    """
+    Test that each export only appends lines written since the last one
+    """
+    transcript = tmp_path / "session.jsonl"
+    exporter = TranscriptExporter(tmp_path / "logs")
+
+    _write(transcript, "a", "b")
+    assert exporter.export("s1", transcript) == 2
+    assert exporter.export("s1", transcript) == 0
+
+    _write(transcript, "c")
+    assert exporter.export("s1", transcript) == 1
+    assert [e["message"] for e in iter_export("s1", tmp_path / "logs")] == ["a", "b", "c"]
+
+    checkpoint = exporter.load_checkpoint("s1")
+    assert checkpoint.lines == 3
+    assert checkpoint.offset == transcript.stat().st_size
+
+
+def test_partial_line_waits(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a line still being written is picked up by the next export
+    """
+    transcript = tmp_path / "session.jsonl"
+    exporter = TranscriptExporter(tmp_path / "logs")
+    _write(transcript, "a", "b", newline=False)
+    assert exporter.export("s1", transcript) == 1
+    with open(transcript, "a") as f:
+        f.write("\n")
+    assert exporter.export("s1", transcript) == 1
+
+
+def test_replaced_transcript_restarts(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a truncated transcript re-exports from the beginning
+    """
+    transcript = tmp_path / "session.jsonl"
+    exporter = TranscriptExporter(tmp_path / "logs")
+    _write(transcript, "a", "b", "c")
+    exporter.export("s1", transcript)
+
+    transcript.write_text("")
+    _write(transcript, "x")
+    assert exporter.export("s1", transcript) == 1
+    assert [e["message"] for e in iter_export("s1", tmp_path / "logs")] == ["x"]